@@ -0,0 +1,411 @@
+"""
+Load test of the FastAPI server.
+Drives /puuid, /recent-matches, /match-details, /match-timeline and /player-summary at a fixed concurrency and
+reports the p50/p95/p99 latency, throughput and server memory of each endpoint. Every endpoint is measured twice:
+a cold run requesting each path of the corpus once, then a warm run of --requests requests over the same paths.
+
+By default the app is served by uvicorn in a subprocess and this process only generates the load, so the requests
+are really concurrent and the memory is the server's own: its resident set after each run and its peak during the
+run, read from /proc (Linux only) with the peak reset before every run. The server reads a corpus of recorded
+payloads (data_source's fixture layout, synthetic by default) through either:
+    - "fixture": the fixture data source, which measures the server and the extraction alone,
+    - "stub": the live data source and Riot clients against a stub Riot API answering from the corpus
+      (bench_stub_app), optionally with an added upstream latency, which also measures the client layers.
+The memo, the on-disk cache (a new temporary file) and the rate limiter are off unless --memo, --disk-cache or
+--rate-limit is given, so the warm run still goes through the layers below the memo. With the memo on, the cold run
+measures the layers below it and the warm run the memo hits. The warehouse and the prefetch worker are always off.
+
+--in-process serves the app from this process through httpx.ASGITransport instead: no uvicorn is needed, but the
+load generator shares the app's event loop and no memory is reported. --url drives an already running server,
+whose memory is reported when its process ID is given with --server-pid.
+
+Results can be written as JSON with the commit and settings, and compared with a baseline run of another commit.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.python_legacy.bench_server_load [--backend fixture|stub] [--concurrency 16] [--requests 500]
+    python -m backend.benchmarks.python_legacy.bench_server_load --backend stub --upstream-latency 50 --memo --disk-cache
+    python -m backend.benchmarks.python_legacy.bench_server_load --output new.json --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+import httpx
+
+ENDPOINTS = ("puuid", "recent-matches", "match-details", "match-timeline", "player-summary")
+PERCENTILES = (50, 95, 99)
+RUNS = ("cold", "warm")
+
+def build_corpus(directory: str, matches: int, minutes: int):
+    """
+    Writes a synthetic corpus of `matches` matches, their timelines and the accounts and match IDs of their players.
+    """
+    from backend.benchmarks.python_legacy.fixtures import make_matchDetails, make_matchTimeline, make_puuids
+    from backend.python_legacy.data_source import write_fixture
+
+    match_ids = {}
+    for seed in range(matches):
+        match_id = f"BENCH_{seed + 1}"
+        write_fixture(directory, "matches", match_id, make_matchDetails(match_id, seed, minutes))
+        write_fixture(directory, "timelines", match_id, make_matchTimeline(match_id, seed, minutes))
+        for puuid in make_puuids(seed):
+            match_ids.setdefault(puuid, []).append(match_id)
+
+    for puuid, ids in match_ids.items():
+        write_fixture(directory, "accounts", f"{puuid}#BENCH", {"puuid": puuid})
+        # newest first, like match-v5
+        write_fixture(directory, "match-ids", puuid, ids[::-1])
+
+def _read(path: Path):
+    with (gzip.open(path, "rb") if path.name.endswith(".gz") else open(path, "rb")) as file:
+        return json.load(file)
+
+def corpus_paths(directory: str) -> dict[str, list[str]]:
+    """
+    Returns the request paths of every endpoint that the corpus can answer, in a fixed order.
+    """
+    root = Path(directory)
+    stems = lambda kind: sorted(path.name.split(".json")[0] for path in (root / kind).glob("*.json*"))
+
+    accounts = [stem.split("#", 1) for stem in stems("accounts")]
+    players = stems("match-ids")
+    timelines = set(stems("timelines"))
+    match_ids = [match_id for match_id in stems("matches") if match_id in timelines]
+    details = {path.name.split(".json")[0]: path for path in (root / "matches").glob("*.json*")}
+    summaries = [
+        (puuid, match_id)
+        for match_id in match_ids
+        for puuid in _read(details[match_id])["metadata"]["participants"][:2]
+    ]
+
+    return {
+        "puuid": [f"/puuid/{quote(gameName)}/{quote(tagLine)}" for gameName, tagLine in accounts],
+        "recent-matches": [f"/recent-matches/{puuid}?count=5" for puuid in players],
+        "match-details": [f"/match-details/{match_id}" for match_id in match_ids],
+        "match-timeline": [f"/match-timeline/{match_id}" for match_id in match_ids],
+        "player-summary": [f"/player-summary/{puuid}/{match_id}" for puuid, match_id in summaries],
+    }
+
+def server_environment(args: argparse.Namespace, corpus: str, scratch: str) -> dict[str, str]:
+    """
+    Returns the settings of the served app: its data source and which layers of the request path are on.
+    """
+    environment = {
+        "RIOT_MEMO_ENABLED": str(args.memo).lower(),
+        "RIOT_CACHE_ENABLED": str(args.disk_cache).lower(),
+        # a new cache file, so the cold run starts cold and the real cache is left alone
+        "RIOT_CACHE_PATH": os.path.join(scratch, "riot_cache.sqlite3"),
+        "RIOT_RATE_LIMIT_ENABLED": str(args.rate_limit).lower(),
+        "MATCH_WAREHOUSE_ENABLED": "false",
+        "LLM_INSIGHTS_CACHE_ENABLED": "false",
+        "PREFETCH_ENABLED": "false",
+    }
+    if args.backend == "fixture":
+        environment.update({"DATA_SOURCE": "fixture", "DATA_SOURCE_FIXTURE_DIR": corpus})
+    else:
+        environment.update({
+            "DATA_SOURCE": "live",
+            "BENCH_STUB_CORPUS": corpus,
+            "BENCH_UPSTREAM_LATENCY_MS": str(args.upstream_latency),
+        })
+
+    return environment
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def start_server(backend: str, environment: dict[str, str], timeout: float = 60.0) -> tuple[subprocess.Popen, str]:
+    """
+    Starts the app under uvicorn in a subprocess and waits until it answers.
+
+    Returns:
+        tuple: The server process and its base URL.
+    """
+    app = "backend.benchmarks.python_legacy.bench_stub_app:app" if backend == "stub" else "backend.python_legacy.server:app"
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **environment}
+    )
+    url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"the server exited with code {process.returncode}")
+        try:
+            httpx.get(f"{url}/", timeout=1)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+
+    stop_server(process)
+    raise SystemExit(f"the server did not answer within {timeout:.0f} seconds")
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+class ServerMemory:
+    """
+    Reads the resident memory of the server process from /proc (Linux only).
+    Its peak (VmHWM) is reset before every run by writing 5 to clear_refs, so it covers that run alone.
+
+    Args:
+        pid (int | None): The server process ID, None when the server is not observed.
+    """
+    def __init__(self, pid: int | None):
+        self.pid = pid
+
+    def reset_peak(self) -> bool:
+        if self.pid is None:
+            return False
+        try:
+            with open(f"/proc/{self.pid}/clear_refs", "w") as file:
+                file.write("5")
+            return True
+        except OSError:
+            return False
+
+    def read(self, peak_reset: bool) -> dict:
+        """
+        Returns "rss_mb" and "peak_rss_mb" of the server, None when they cannot be read. Without a reset, the peak
+        would be the one since the server started and is not reported.
+        """
+        fields = {}
+        if self.pid is not None:
+            try:
+                with open(f"/proc/{self.pid}/status") as file:
+                    for line in file:
+                        name, _, value = line.partition(":")
+                        if name in ("VmRSS", "VmHWM"):
+                            fields[name] = round(int(value.split()[0]) / 1e3, 1)
+            except OSError:
+                pass
+
+        return {"rss_mb": fields.get("VmRSS"), "peak_rss_mb": fields.get("VmHWM") if peak_reset else None}
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0))]
+
+async def drive(client: httpx.AsyncClient, paths: list[str], requests: int, concurrency: int) -> dict:
+    """
+    Sends `requests` requests cycling over `paths` from `concurrency` concurrent workers.
+
+    Returns:
+        dict: "requests", "errors", "seconds", "throughput" (requests per second) and the latency percentiles in ms.
+    """
+    latencies = []
+    errors = 0
+    indexes = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (index := next(indexes)) < requests:
+            start = time.perf_counter()
+            try:
+                response = await client.get(paths[index % len(paths)])
+                failed = response.status_code != 200
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(seconds, 4),
+        "throughput": round(requests / seconds, 2) if seconds > 0 else 0.0,
+        **{f"p{percent}_ms": round(percentile(latencies, percent) * 1000, 3) for percent in PERCENTILES},
+    }
+
+async def run_benchmark(client: httpx.AsyncClient, paths: dict[str, list[str]], endpoints: list[str], requests: int,
+                        concurrency: int, memory: ServerMemory) -> dict:
+    """
+    Runs the cold then the warm run of every endpoint, one endpoint after the other.
+    """
+    results = {}
+    for endpoint in endpoints:
+        if not paths[endpoint]:
+            raise SystemExit(f"the corpus has no data for /{endpoint}")
+
+        results[endpoint] = {}
+        for run, count in (("cold", len(paths[endpoint])), ("warm", requests)):
+            peak_reset = memory.reset_peak()
+            results[endpoint][run] = await drive(client, paths[endpoint], count, concurrency)
+            results[endpoint][run].update(memory.read(peak_reset))
+
+    return results
+
+async def run_inProcess(args: argparse.Namespace, corpus: str, paths: dict[str, list[str]], endpoints: list[str]) -> dict:
+    """
+    Serves the app from this event loop through ASGITransport. The server settings must be in os.environ first.
+    """
+    if args.backend == "stub":
+        from backend.benchmarks.python_legacy.bench_stub_app import install_stub
+        install_stub(corpus, args.upstream_latency / 1000)
+    from backend.python_legacy import async_riot_client
+    from backend.python_legacy.server import app
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None)
+    try:
+        return await run_benchmark(client, paths, endpoints, args.requests, args.concurrency, ServerMemory(None))
+    finally:
+        await client.aclose()
+        await async_riot_client.close_client()
+
+async def run_remote(url: str, pid: int | None, args: argparse.Namespace, paths: dict[str, list[str]],
+                     endpoints: list[str]) -> dict:
+    """
+    Drives the server at `url` over HTTP, reading the memory of its process `pid` when given.
+    """
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=None, limits=limits) as client:
+        return await run_benchmark(client, paths, endpoints, args.requests, args.concurrency, ServerMemory(pid))
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results: dict, baseline: dict | None):
+    columns = ("throughput", *(f"p{percent}_ms" for percent in PERCENTILES))
+    megabytes = lambda value: f"{value:8.1f}" if value is not None else f"{'n/a':>8s}"
+
+    print(f"{'endpoint':21s} {'req/s':>10s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'errors':>7s} {'RSS MB':>8s} {'peak MB':>8s}")
+    for endpoint, runs in results["endpoints"].items():
+        for run in RUNS:
+            result = runs[run]
+            print(
+                f"{endpoint + ' ' + run:21s} " + " ".join(f"{result[column]:10.2f}" for column in columns) +
+                f" {result['errors']:7d} {megabytes(result['rss_mb'])} {megabytes(result['peak_rss_mb'])}"
+            )
+            previous = (baseline or {}).get("endpoints", {}).get(endpoint, {}).get(run)
+            if previous:
+                changes = [
+                    f"{(result[column] - previous[column]) / previous[column] * 100:+9.1f}%" if previous[column] else f"{'n/a':>10s}"
+                    for column in columns
+                ]
+                print(f"{'  vs baseline':21s} " + " ".join(changes))
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the FastAPI server endpoints.")
+    parser.add_argument("--backend", choices=("fixture", "stub"), default="fixture", help="how the server reads the corpus")
+    parser.add_argument("--corpus", help="fixture corpus directory, built with synthetic matches if empty (default: a temporary one)")
+    parser.add_argument("--matches", type=int, default=20, help="synthetic matches in a new corpus")
+    parser.add_argument("--minutes", type=int, default=32, help="game length of the synthetic matches")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma separated endpoints to drive")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at the same time")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint in the warm run")
+    parser.add_argument("--upstream-latency", type=float, default=0.0, help="milliseconds the stub Riot API waits per request")
+    parser.add_argument("--memo", action="store_true", help="turn on the in-memory memo of the Riot clients")
+    parser.add_argument("--disk-cache", action="store_true", help="turn on the on-disk cache, in a new temporary file")
+    parser.add_argument("--rate-limit", action="store_true", help="turn on the client-side rate limiter")
+    parser.add_argument("--in-process", action="store_true", help="serve the app from this process instead of a uvicorn subprocess")
+    parser.add_argument("--url", help="drive a running server at this URL instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="process ID of the server at --url, to report its memory")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--compare", help="JSON results of a baseline run to compare with")
+    args = parser.parse_args()
+
+    endpoints = [endpoint.strip() for endpoint in args.endpoints.split(",") if endpoint.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    # the clients log every upstream request at INFO, which would dominate the measurements
+    logging.getLogger("backend.python_legacy").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as temporary:
+        corpus = args.corpus or os.path.join(temporary, "corpus")
+        environment = server_environment(args, corpus, temporary)
+        # set before the backend is first imported, so this process never opens the real caches either
+        os.environ.update(environment)
+
+        if not Path(corpus, "matches").is_dir():
+            build_corpus(corpus, args.matches, args.minutes)
+        paths = corpus_paths(corpus)
+
+        if args.url is not None:
+            mode = "remote"
+            results = asyncio.run(run_remote(args.url, args.server_pid, args, paths, endpoints))
+        elif args.in_process:
+            mode = "in-process"
+            results = asyncio.run(run_inProcess(args, corpus, paths, endpoints))
+        else:
+            mode = "uvicorn"
+            process, url = start_server(args.backend, environment)
+            try:
+                results = asyncio.run(run_remote(url, process.pid, args, paths, endpoints))
+            finally:
+                stop_server(process)
+
+    report = {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {
+            "server": mode,
+            "backend": None if args.url else args.backend,
+            "corpus": args.corpus or f"synthetic:{args.matches}x{args.minutes}min",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "upstream_latency_ms": args.upstream_latency if args.backend == "stub" and not args.url else None,
+            # a running server has its own settings
+            "memo": None if args.url else args.memo,
+            "disk_cache": None if args.url else args.disk_cache,
+            "rate_limit": None if args.url else args.rate_limit,
+        },
+        "endpoints": results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline.get("settings") != report["settings"]:
+            print(f"warning: the baseline ({baseline.get('commit')}) was run with different settings: {baseline.get('settings')}")
+
+    print(f"commit {report['commit']}, settings {report['settings']}")
+    print_results(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
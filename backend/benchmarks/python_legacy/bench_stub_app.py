@@ -0,0 +1,125 @@
+"""
+The FastAPI app of backend.python_legacy.server with the Riot API replaced by a stub answering from a fixture corpus.
+bench_server_load serves it with uvicorn for its "stub" backend: the live data source and the whole client stack
+(memo, on-disk cache, rate limiter, connection pools) run as in production, only the round trip to Riot is
+simulated by waiting BENCH_UPSTREAM_LATENCY_MS before every answer.
+
+Environment:
+    BENCH_STUB_CORPUS           fixture corpus directory (data_source's layout) the stub answers from
+    BENCH_UPSTREAM_LATENCY_MS   milliseconds the stub waits per request (default 0)
+
+Usage (from the repository root):
+    BENCH_STUB_CORPUS=./bench_corpus uvicorn backend.benchmarks.python_legacy.bench_stub_app:app
+"""
+
+import asyncio
+import gzip
+import io
+import json
+import os
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+def _read(path: Path):
+    with (gzip.open(path, "rb") if path.name.endswith(".gz") else open(path, "rb")) as file:
+        return json.load(file)
+
+class StubRiotAPI:
+    """
+    Answers the match-v5 and account-v1 requests of the Riot clients from a fixture corpus.
+    The payloads are read into memory first, so the stub adds no disk reads to the measurements.
+
+    Args:
+        directory (str): The fixture corpus directory.
+        latency (float): Seconds waited before every answer.
+    """
+    def __init__(self, directory: str, latency: float = 0.0):
+        root = Path(directory)
+        self.latency = latency
+        self.payloads = {
+            (path.parent.name, path.name.split(".json")[0]): json.dumps(_read(path)).encode("utf-8")
+            for kind in ("accounts", "matches", "timelines") for path in (root / kind).glob("*.json*")
+        }
+        self.match_ids = {path.name.split(".json")[0]: _read(path) for path in (root / "match-ids").glob("*.json*")}
+
+    def answer(self, path: str, query: str) -> tuple[int, bytes]:
+        """
+        Returns the status code and body of a request to the Riot API.
+        """
+        parts = path.strip("/").split("/")
+        if parts[:4] == ["riot", "account", "v1", "accounts"]:
+            body = self.payloads.get(("accounts", f"{parts[-2]}#{parts[-1]}"))
+        elif parts[-1] == "ids":
+            params = parse_qs(query)
+            start, count = int(params.get("start", ["0"])[0]), int(params.get("count", ["20"])[0])
+            ids = self.match_ids.get(parts[-2])
+            body = json.dumps(ids[start:start + count]).encode("utf-8") if ids is not None else None
+        elif parts[-1] == "timeline":
+            body = self.payloads.get(("timelines", parts[-2]))
+        else:
+            body = self.payloads.get(("matches", parts[-1]))
+
+        if body is None:
+            return 404, json.dumps({"status": {"message": "Data not found", "status_code": 404}}).encode("utf-8")
+        return 200, body
+
+    def transport(self) -> httpx.MockTransport:
+        """
+        Returns an httpx transport for the async client.
+        """
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            status, body = self.answer(request.url.path, request.url.query.decode())
+            return httpx.Response(status, content=body, headers={"Content-Type": "application/json"})
+
+        return httpx.MockTransport(handler)
+
+    def adapter(self) -> BaseAdapter:
+        """
+        Returns a requests adapter for the sync session (ex: the streamed timelines of player summaries).
+        """
+        stub = self
+
+        class StubAdapter(BaseAdapter):
+            def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                url = urlsplit(request.url)
+                status, body = stub.answer(url.path, url.query)
+
+                response = requests.Response()
+                response.status_code = status
+                response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+                response.raw = io.BytesIO(body)
+                response.url = request.url
+                response.request = request
+                response.encoding = "utf-8"
+                return response
+
+            def close(self):
+                pass
+
+        return StubAdapter()
+
+def install_stub(directory: str, latency: float = 0.0):
+    """
+    Points the sync and async Riot clients at a StubRiotAPI of the corpus.
+    """
+    from backend.python_legacy import async_riot_client, riot_client
+
+    stub = StubRiotAPI(directory, latency)
+    create_client = async_riot_client.create_client
+    async_riot_client.create_client = lambda transport=None: create_client(transport=stub.transport())
+    riot_client.session.mount("https://", stub.adapter())
+
+# only when served, bench_server_load also imports this module for an in-process run
+if "BENCH_STUB_CORPUS" in os.environ:
+    install_stub(os.environ["BENCH_STUB_CORPUS"], float(os.getenv("BENCH_UPSTREAM_LATENCY_MS", "0")) / 1000)
+    from backend.python_legacy.server import app
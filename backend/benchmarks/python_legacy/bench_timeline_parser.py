@@ -0,0 +1,71 @@
+"""
+Benchmark of the timeline extraction paths of player_summary.
+Compares loading the whole timeline JSON before extracting one player (json.loads + extract_playerTimeline),
+the indexed path a player summary takes when nothing caches the index (json.loads + build_timelineIndex +
+extract_playerTimeline_indexed) and the streaming parser that replaces it (extract_playerTimeline_stream),
+reporting parse time and peak traced memory.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.python_legacy.bench_timeline_parser [--minutes 32] [--repeat 5]
+"""
+
+import argparse
+import io
+import json
+import time
+import tracemalloc
+
+from backend.benchmarks.python_legacy.fixtures import make_matchTimeline
+from backend.python_legacy.player_summary import build_timelineIndex, extract_playerTimeline, extract_playerTimeline_indexed
+from backend.python_legacy.player_summary import extract_playerTimeline_stream
+
+def run_full_load(payload: bytes, puuid: str) -> list[dict]:
+    return extract_playerTimeline(puuid, json.loads(payload))
+
+def run_uncached_index(payload: bytes, puuid: str) -> list[dict]:
+    return extract_playerTimeline_indexed(puuid, build_timelineIndex(json.loads(payload)))
+
+def run_stream(payload: bytes, puuid: str) -> list[dict]:
+    return extract_playerTimeline_stream(puuid, io.BytesIO(payload))
+
+def measure(function, payload: bytes, puuid: str, repeat: int) -> dict:
+    """
+    Returns the best wall time over `repeat` runs and the peak memory of one traced run.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(payload, puuid)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(payload, puuid)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"best_seconds": min(timings), "peak_bytes": peak}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the timeline extraction paths.")
+    parser.add_argument("--minutes", type=int, default=32, help="game length of the synthetic timeline")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per path")
+    args = parser.parse_args()
+
+    timeline = make_matchTimeline("BENCH_1", minutes=args.minutes)
+    puuid = timeline["metadata"]["participants"][0]
+    payload = json.dumps(timeline).encode("utf-8")
+    del timeline
+
+    assert run_full_load(payload, puuid) == run_uncached_index(payload, puuid) == run_stream(payload, puuid)
+
+    print(f"timeline payload: {len(payload) / 1e6:.2f} MB, {args.minutes} minutes")
+    results = {
+        "json.loads + extract_playerTimeline": measure(run_full_load, payload, puuid, args.repeat),
+        "json.loads + index (uncached summary)": measure(run_uncached_index, payload, puuid, args.repeat),
+        "extract_playerTimeline_stream": measure(run_stream, payload, puuid, args.repeat),
+    }
+    for name, result in results.items():
+        print(f"{name:40s} {result['best_seconds'] * 1000:9.1f} ms   peak {result['peak_bytes'] / 1e6:8.2f} MB")
+
+if __name__ == "__main__":
+    main()
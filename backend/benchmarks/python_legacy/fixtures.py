@@ -0,0 +1,133 @@
+"""
+Synthetic Riot match payloads for the python_legacy benchmarks.
+The shapes follow match-v5 (metadata first, info.frames before info.participants) and the sizes are close
+to a real ranked game, so parse time and memory numbers are representative without calling the Riot API.
+"""
+
+import random
+
+CHALLENGE_KEYS = [
+    "kda", "damagePerMinute", "teamDamagePercentage", "killParticipation", "goldPerMinute", "visionScorePerMinute",
+    "soloKills", "turretTakedowns", "controlWardsPlaced", "laneMinionsFirst10Minutes", "abilityUses", "skillshotsHit",
+]
+CHAMPIONS = ["Ahri", "Jinx", "Thresh", "LeeSin", "Garen", "Lux", "Yasuo", "Ezreal", "Leona", "Darius"]
+ROLES = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+def make_puuids(match_seed: int) -> list[str]:
+    return [f"bench-puuid-{(match_seed + index) % 50}" for index in range(10)]
+
+def make_matchDetails(match_id: str, match_seed: int = 0, minutes: int = 32) -> dict:
+    """
+    Returns a match-v5 match payload with ten participants.
+    """
+    rng = random.Random(match_seed)
+    puuids = make_puuids(match_seed)
+    participants = []
+
+    for index, puuid in enumerate(puuids):
+        participants.append({
+            "participantId": index + 1,
+            "puuid": puuid,
+            "teamId": 100 if index < 5 else 200,
+            "championName": CHAMPIONS[(index + match_seed) % len(CHAMPIONS)],
+            "teamPosition": ROLES[index % 5],
+            "champLevel": rng.randint(11, 18),
+            "kills": rng.randint(0, 15),
+            "deaths": rng.randint(0, 12),
+            "assists": rng.randint(0, 20),
+            "goldEarned": rng.randint(7000, 18000),
+            "totalDamageDealtToChampions": rng.randint(5000, 45000),
+            "visionScore": rng.randint(5, 90),
+            "wardsPlaced": rng.randint(2, 40),
+            "detectorWardsPlaced": rng.randint(0, 8),
+            "totalMinionsKilled": rng.randint(20, 280),
+            "neutralMinionsKilled": rng.randint(0, 180),
+            "perks": {"statPerks": {"defense": 5001, "flex": 5008, "offense": 5005}, "styles": []},
+            "challenges": {key: round(rng.random() * 10, 3) for key in CHALLENGE_KEYS},
+            "win": (index < 5) == (match_seed % 2 == 0),
+        })
+
+    return {
+        "metadata": {"dataVersion": "2", "matchId": match_id, "participants": puuids},
+        "info": {
+            "gameDuration": minutes * 60,
+            "gameMode": "CLASSIC",
+            "gameVersion": "14.20.628.1234",
+            "queueId": 420,
+            "participants": participants,
+        }
+    }
+
+def make_matchTimeline(match_id: str, match_seed: int = 0, minutes: int = 32, events_per_frame: int = 120) -> dict:
+    """
+    Returns a match-v5 timeline payload (about 1 MB once serialized for the default sizes).
+    """
+    rng = random.Random(match_seed)
+    puuids = make_puuids(match_seed)
+    frames = []
+
+    for minute in range(minutes + 1):
+        events = []
+        for event_index in range(events_per_frame if minute else 1):
+            timestamp = minute * 60000 + event_index
+            roll = rng.random()
+            if roll < 0.1:
+                killer = rng.randint(1, 10)
+                events.append({
+                    "type": "CHAMPION_KILL", "timestamp": timestamp, "killerId": killer,
+                    "victimId": rng.randint(1, 10), "assistingParticipantIds": rng.sample(range(1, 11), 2),
+                    "bounty": 300, "shutdownBounty": 0, "killStreakLength": rng.randint(0, 4),
+                    "position": {"x": rng.randint(0, 15000), "y": rng.randint(0, 15000)},
+                    "victimDamageDealt": [{"basic": False, "magicDamage": rng.randint(0, 900), "name": "Ahri", "participantId": killer}] * 4,
+                    "victimDamageReceived": [{"basic": True, "physicalDamage": rng.randint(0, 900), "name": "Jinx", "participantId": killer}] * 4,
+                })
+            elif roll < 0.13:
+                events.append({"type": "BUILDING_KILL", "timestamp": timestamp, "killerId": rng.randint(1, 10), "buildingType": "TOWER_BUILDING", "laneType": "MID_LANE", "teamId": 200})
+            elif roll < 0.16:
+                events.append({"type": "TURRET_PLATE_DESTROYED", "timestamp": timestamp, "killerId": rng.randint(1, 10), "laneType": "TOP_LANE", "teamId": 100})
+            elif roll < 0.18:
+                events.append({"type": "ELITE_MONSTER_KILL", "timestamp": timestamp, "killerId": rng.randint(1, 10), "killerTeamId": 100, "monsterType": "DRAGON", "monsterSubType": "FIRE_DRAGON"})
+            elif roll < 0.5:
+                events.append({"type": "ITEM_PURCHASED", "timestamp": timestamp, "itemId": rng.randint(1001, 6700), "participantId": rng.randint(1, 10)})
+            elif roll < 0.8:
+                events.append({"type": "WARD_PLACED", "timestamp": timestamp, "creatorId": rng.randint(1, 10), "wardType": "YELLOW_TRINKET"})
+            else:
+                events.append({"type": "SKILL_LEVEL_UP", "timestamp": timestamp, "participantId": rng.randint(1, 10), "skillSlot": rng.randint(1, 4), "levelUpType": "NORMAL"})
+
+        participant_frames = {}
+        for participant in range(1, 11):
+            participant_frames[str(participant)] = {
+                "participantId": participant,
+                "championStats": {key: rng.randint(0, 500) for key in (
+                    "abilityHaste", "abilityPower", "armor", "armorPen", "attackDamage", "attackSpeed", "bonusArmorPenPercent",
+                    "ccReduction", "health", "healthMax", "healthRegen", "lifesteal", "magicPen", "magicResist",
+                    "movementSpeed", "omnivamp", "physicalVamp", "power", "powerMax", "powerRegen", "spellVamp",
+                )},
+                "damageStats": {key: rng.randint(0, 40000) for key in (
+                    "magicDamageDone", "magicDamageDoneToChampions", "magicDamageTaken", "physicalDamageDone",
+                    "physicalDamageDoneToChampions", "physicalDamageTaken", "totalDamageDone", "totalDamageDoneToChampions",
+                    "totalDamageTaken", "trueDamageDone", "trueDamageDoneToChampions", "trueDamageTaken",
+                )},
+                "currentGold": rng.randint(0, 3000),
+                "goldPerSecond": 0,
+                "jungleMinionsKilled": minute * rng.randint(0, 5),
+                "level": min(1 + minute // 2, 18),
+                "minionsKilled": minute * rng.randint(0, 9),
+                "position": {"x": rng.randint(0, 15000), "y": rng.randint(0, 15000)},
+                "timeEnemySpentControlled": rng.randint(0, 90000),
+                "totalGold": 500 + minute * rng.randint(250, 450),
+                "xp": minute * rng.randint(300, 500),
+            }
+
+        frames.append({"timestamp": minute * 60000, "events": events, "participantFrames": participant_frames})
+
+    return {
+        "metadata": {"dataVersion": "2", "matchId": match_id, "participants": puuids},
+        "info": {
+            "endOfGameResult": "GameComplete",
+            "frameInterval": 60000,
+            "frames": frames,
+            "gameId": 1000000 + match_seed,
+            "participants": [{"participantId": index + 1, "puuid": puuid} for index, puuid in enumerate(puuids)],
+        }
+    }
@@ -0,0 +1,309 @@
+"""
+Asynchronous Riot API Client for League of Legends
+This module mirrors riot_client (get_PUUID, get_recentMatches, get_matchIds, get_matchDetails, get_matchTimeline) on top of httpx,
+so one event loop can keep thousands of upstream requests in flight without holding a worker thread each.
+It shares the in-memory memo and the on-disk cache of riot_client and raises the same RiotAPIError.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable
+import httpx
+from backend.python_legacy import riot_client
+from backend.python_legacy.config import (
+    REGION, HEADERS, RECENT_MATCHES_TTL, PUUID_TTL,
+    RIOT_ASYNC_MAX_CONNECTIONS, RIOT_POOL_SIZE, RIOT_CONNECT_TIMEOUT, RIOT_READ_TIMEOUT, RIOT_MAX_RETRIES,
+    RIOT_RETRY_BACKOFF, RIOT_RATE_LIMIT_MAX_RETRIES
+)
+from backend.python_legacy.riot_client import RiotAPIError, matchIds_query
+
+logger = logging.getLogger(__name__)
+
+# transient upstream errors retried with backoff, like the sync session's status_forcelist
+RETRIED_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+_client = None
+_client_loop = None
+
+def create_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """
+    Creates an async HTTP client with a keep-alive connection pool to the Riot API.
+
+    Args:
+        transport (httpx.AsyncBaseTransport | None): A custom transport, e.g. httpx.MockTransport in tests.
+
+    Returns:
+        httpx.AsyncClient: The configured client.
+    """
+    limits = httpx.Limits(max_connections=RIOT_ASYNC_MAX_CONNECTIONS, max_keepalive_connections=RIOT_POOL_SIZE)
+    if transport is None:
+        # retries here cover connection failures only, like the sync session's connect retries
+        transport = httpx.AsyncHTTPTransport(limits=limits, retries=RIOT_MAX_RETRIES)
+
+    return httpx.AsyncClient(
+        # httpx rejects None header values, so drop the token when no key is configured
+        headers={key: value for key, value in HEADERS.items() if value is not None},
+        timeout=httpx.Timeout(RIOT_READ_TIMEOUT, connect=RIOT_CONNECT_TIMEOUT),
+        transport=transport
+    )
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client of the running event loop, creating it on first use.
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = create_client()
+        _client_loop = loop
+
+    return _client
+
+async def close_client():
+    """
+    Closes the shared client and its pooled connections.
+    """
+    global _client, _client_loop
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+async def send_request(url: str):
+    """
+    Helper function to make an async GET request and handle errors.
+
+    Args:
+        url (str): The URL to send the GET request to.
+
+    Returns:
+        dict: The JSON response from the API.
+    """
+    try:
+        response = await _rate_limited_get(url)
+        response.raise_for_status()  # This will raise an HTTPStatusError for 4xx/5xx responses
+
+        # a timeline is several MB of JSON, parse it off the event loop
+        return await asyncio.to_thread(json.loads, response.content)
+
+    except httpx.HTTPStatusError as error:
+        logger.error(f"API request with HTTP status code {error.response.status_code}")
+
+        raise RiotAPIError(
+            f"API request failed: {error.response.status_code} - {error.response.text}",
+            status_code=error.response.status_code,
+            response_text=error.response.text
+        ) from error
+
+    except httpx.HTTPError as error:
+        logger.error(f"Network error occurred while accessing {url}: {error}")
+
+        raise RiotAPIError(f"Network error occurred: {str(error)}") from error
+
+async def _rate_limited_get(url: str) -> httpx.Response:
+    """
+    Sends the GET request once the shared rate limiter allows it, queueing it again after a 429 with Retry-After.
+    Transient 5xx responses are retried with exponential backoff, each retry paced by the rate limiter like the sync
+    session's retries.
+    """
+    rate_limiter = riot_client.rate_limiter
+    rate_limit_retries = 0
+    status_retries = 0
+    while True:
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async(url)
+        response = await get_client().get(url)
+        if rate_limiter is not None:
+            rate_limiter.update(url, response.headers)
+
+        if (
+            response.status_code == 429 and rate_limiter is not None and
+            rate_limit_retries < RIOT_RATE_LIMIT_MAX_RETRIES and rate_limiter.backoff(url, response.headers)
+            ):
+            rate_limit_retries += 1
+            continue
+
+        if response.status_code in RETRIED_STATUS_CODES and status_retries < RIOT_MAX_RETRIES:
+            logger.warning(f"Retrying {url} after HTTP status code {response.status_code}")
+            await asyncio.sleep(RIOT_RETRY_BACKOFF * 2 ** status_retries)
+            status_retries += 1
+            continue
+
+        return response
+
+async def cached_request(url: str, cache_key: str, ttl: float | None = None):
+    """
+    Async helper that serves a request from the in-memory memo or the on-disk cache when possible.
+    Concurrent identical lookups share a single call to the layers below.
+
+    Args:
+        url (str): The URL to send the GET request to on a cache miss.
+        cache_key (str): The key the response is stored under.
+        ttl (float | None): Seconds the response stays fresh, None if it never changes.
+
+    Returns:
+        dict: The JSON response from the cache or the API.
+    """
+    return await cached_call(cache_key, lambda: send_request(url), ttl)
+
+async def cached_call(cache_key: str, loader: Callable[[], Awaitable[Any]], ttl: float | None = None):
+    """
+    Async version of riot_client.cached_call for coroutine loaders.
+
+    Args:
+        cache_key (str): The key the value is stored under.
+        loader (Callable): Coroutine function that produces the value on a cache miss.
+        ttl (float | None): Seconds the value stays fresh, None if it never changes.
+
+    Returns:
+        Any: The cached or freshly loaded value.
+    """
+    memo_cache = riot_client.memo_cache
+    if memo_cache is None:
+        return await _load_cached(cache_key, loader, ttl)
+
+    return await memo_cache.get_or_load_async(cache_key, lambda: _load_cached(cache_key, loader, ttl), ttl)
+
+async def cached_lookup(cache_key: str):
+    """
+    Returns a value from the in-memory memo or the on-disk cache without loading it on a miss.
+
+    Args:
+        cache_key (str): The key the value is stored under.
+
+    Returns:
+        Any: The cached value, or None on a miss.
+    """
+    memo_cache = riot_client.memo_cache
+    if memo_cache is not None:
+        value = memo_cache.get(cache_key)
+        if value is not None:
+            return value
+
+    match_cache = riot_client.match_cache
+    if match_cache is None:
+        return None
+
+    return await asyncio.to_thread(match_cache.get, cache_key)
+
+async def _load_cached(cache_key: str, loader: Callable[[], Awaitable[Any]], ttl: float | None):
+    """
+    Serves a value from the on-disk cache, falling back to the loader on a miss.
+    SQLite calls run in a worker thread so they never block the event loop.
+    """
+    match_cache = riot_client.match_cache
+    if match_cache is None:
+        return await loader()
+
+    cached = await asyncio.to_thread(match_cache.get, cache_key)
+    if cached is not None:
+        logger.info(f"Cache hit for {cache_key}")
+        return cached
+
+    data = await loader()
+    await asyncio.to_thread(match_cache.set, cache_key, data, ttl)
+
+    return data
+
+
+async def get_PUUID(gameName:str, tagLine:str) -> str:
+    """
+    Fetches the PUUID (Player Unique ID) for a given game name and tag line.
+
+    Args:
+        game_name (str): The player's in-game name (ex: GNR nomsy).
+        tag_line (str): The player's tag line (ex: #stuck).
+
+    Returns:
+        str: The PUUID of the player.
+
+    Raises:
+        RiotAPIError: If the API request fails or returns an error.
+    """
+    url = f"https://{REGION}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}"
+    logger.info(f"Fetching PUUID for {gameName}#{tagLine} from {url}")
+
+    return (await cached_request(url, f"puuid:{gameName}#{tagLine}", PUUID_TTL)).get("puuid")
+
+async def get_recentMatches(puuid:str, count:int = 5) -> list[str]:
+    """
+    Fetches recent match IDs for a given PUUID.
+
+    Args:
+        puuid (str): The PUUID of the player.
+        count (int): The number of recent matches to fetch (default is 5).
+
+    Returns:
+        list: A list of recent match IDs.
+
+    Raises:
+        RiotAPIError: If the API request fails or returns an error.
+    """
+    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids?count={count}"
+    logger.info(f"Fetching recent matches for PUUID {puuid} from {url}")
+
+    return await cached_request(url, f"recent-matches:{puuid}:{count}", RECENT_MATCHES_TTL)
+
+async def get_matchIds(puuid:str, start:int = 0, count:int = 100, queue:int | None = None,
+                 startTime:int | None = None, endTime:int | None = None) -> list[str]:
+    """
+    Fetches one page of a player's match IDs, newest first.
+
+    Args:
+        puuid (str): The PUUID of the player.
+        start (int): The index of the first match ID of the page (default is 0).
+        count (int): The number of match IDs of the page, at most 100 (default is 100).
+        queue (int | None): Only matches of this queue ID (ex: 420 for ranked solo).
+        startTime (int | None): Only matches played after this epoch timestamp in seconds.
+        endTime (int | None): Only matches played before this epoch timestamp in seconds.
+
+    Returns:
+        list: The match IDs of the page, fewer than count on the last page.
+
+    Raises:
+        RiotAPIError: If the API request fails or returns an error.
+    """
+    query = matchIds_query(start, count, queue, startTime, endTime)
+    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids?{query}"
+    logger.info(f"Fetching match IDs for PUUID {puuid} from {url}")
+
+    return await cached_request(url, f"match-ids:{puuid}:{query}", RECENT_MATCHES_TTL)
+
+async def get_matchDetails(match_id:str) -> dict[str, Any]:
+    """
+    Fetches detailed information about a specific match using its match ID.
+
+    Args:
+        match_id (str): The ID of the match to fetch details for.
+
+    Returns:
+        dict: A dictionary containing match details.
+
+    Raises:
+        RiotAPIError: If the API request fails or returns an error.
+    """
+    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/{match_id}"
+    logger.info(f"Fetching match details for match ID {match_id} from {url}")
+
+    return await cached_request(url, f"match-details:{match_id}")
+
+async def get_matchTimeline(match_id:str) -> dict[str, Any]:
+    """
+    Fetches the timeline information about a specific match using its match ID.
+
+    Args:
+        match_id (str): The ID of the match to fetch timeline for.
+
+    Returns:
+        dict: A dictionary containing match timeline.
+
+    Raises:
+        RiotAPIError: If the API request fails or returns an error.
+    """
+    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/{match_id}/timeline"
+    logger.info(f"Fetching match timeline for match ID {match_id} from {url}")
+
+    return await cached_request(url, f"match-timeline:{match_id}")
@@ -0,0 +1,169 @@
+"""
+Offline bulk ingestion of saved match dumps.
+Reads a directory of match-v5 match and timeline JSON files (optionally gzipped), extracts the summary of every
+participant with the same code as the API (match_extraction) in a process pool, and writes one compact record per
+match to a gzipped JSON lines file or a match warehouse database. The workers also serialize and compress the
+records, so the parent process only appends them. Nothing is fetched, riot_client is never imported.
+
+Files are paired by name: "<match_id>.json" holds the match details and "<match_id>_timeline.json" (or
+".timeline.json") its timeline. A match without a timeline file is ingested with stats only.
+
+Usage (from the repository root):
+    python -m backend.python_legacy.bulk_ingest DUMP_DIR --output summaries.jsonl.gz [--workers 8]
+    python -m backend.python_legacy.bulk_ingest DUMP_DIR --warehouse warehouse.sqlite3
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from backend.python_legacy.match_extraction import build_timelineIndex, extract_matchSummary
+from backend.python_legacy.warehouse_rows import build_rows
+from backend.python_legacy.warehouse_store import MatchWarehouse
+
+_TIMELINE_SUFFIXES = ("_timeline", ".timeline", "-timeline")
+# match details kept in a record next to the summaries
+_INFO_KEYS = ("gameVersion", "queueId", "gameCreation", "gameDuration")
+
+def find_dumps(directory: str) -> list[tuple[str, str, str | None]]:
+    """
+    Pairs the match and timeline files of a directory and its subdirectories.
+
+    Returns:
+        list: (match_id, details path, timeline path or None) tuples, sorted by match ID.
+    """
+    details, timelines = {}, {}
+    for path in Path(directory).rglob("*"):
+        name = path.name
+        if name.endswith(".json.gz"):
+            stem = name[:-len(".json.gz")]
+        elif name.endswith(".json"):
+            stem = name[:-len(".json")]
+        else:
+            continue
+
+        suffix = next((suffix for suffix in _TIMELINE_SUFFIXES if stem.endswith(suffix)), None)
+        if suffix is None:
+            details[stem] = str(path)
+        else:
+            timelines[stem[:-len(suffix)]] = str(path)
+
+    return [(match_id, details[match_id], timelines.get(match_id)) for match_id in sorted(details)]
+
+def _load_json(path: str):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as file:
+        return json.load(file)
+
+def extract_record(dump: tuple[str, str, str | None]) -> dict:
+    """
+    Extracts the record of one match from its dump files.
+
+    Returns:
+        dict: "match_id", "info" (game version, queue and times) and "match_summary" (the entries of extract_matchSummary).
+    """
+    match_id, details_path, timeline_path = dump
+    match_details = _load_json(details_path)
+    timeline_index = build_timelineIndex(_load_json(timeline_path)) if timeline_path else None
+    info = match_details.get("info") or {}
+
+    return {
+        "match_id": match_details.get("metadata", {}).get("matchId") or match_id,
+        "info": {key: info.get(key) for key in _INFO_KEYS},
+        "match_summary": extract_matchSummary(match_details, timeline_index)
+    }
+
+def encode_jsonl(record: dict) -> bytes:
+    """
+    Encodes a record as one gzip member holding one JSON line. Concatenated members form a valid gzip file.
+    """
+    return gzip.compress((json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8"), compresslevel=6)
+
+def encode_warehouseRows(record: dict) -> list[tuple]:
+    """
+    Encodes a record as the rows of MatchWarehouse.insert_rows.
+    """
+    return build_rows({"metadata": {"matchId": record["match_id"]}, "info": record["info"]}, record["match_summary"])
+
+def process_dump(dump: tuple[str, str, str | None], encode) -> tuple[str, object, str | None]:
+    """
+    Extracts and encodes one match. Runs in the worker processes, so the parent process only writes.
+
+    Returns:
+        tuple: (match ID, encoded record or None, error message or None).
+    """
+    try:
+        return dump[0], encode(extract_record(dump)), None
+    except Exception as error:
+        return dump[0], None, f"{type(error).__name__}: {error}"
+
+def ingest_dumps(dumps: list[tuple[str, str, str | None]], encode, write, workers: int | None = None, chunksize: int = 4) -> dict:
+    """
+    Extracts and encodes every dump in a process pool and passes each encoded record to `write` in the order of the dumps.
+
+    Args:
+        dumps (list): The tuples of find_dumps.
+        encode (Callable): Module-level function run in the workers on each record (ex: encode_jsonl).
+        write (Callable): Called in this process with each encoded record.
+        workers (int | None): The number of worker processes, None for one per CPU.
+        chunksize (int): The number of dumps sent to a worker at a time.
+
+    Returns:
+        dict: "matches" (records written), "failed" (match ID -> error), "seconds" and "matches_per_second".
+    """
+    start = time.perf_counter()
+    written = 0
+    failed = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for match_id, encoded, error in executor.map(partial(process_dump, encode=encode), dumps, chunksize=max(chunksize, 1)):
+            if error is not None:
+                failed[match_id] = error
+                continue
+            write(encoded)
+            written += 1
+
+    seconds = time.perf_counter() - start
+    return {
+        "matches": written,
+        "failed": failed,
+        "seconds": seconds,
+        "matches_per_second": written / seconds if seconds > 0 else 0.0
+    }
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Extract player summaries from a directory of saved match dumps.")
+    parser.add_argument("directory", help="directory of match and timeline JSON files")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--output", help="gzipped JSON lines file written with one record per match")
+    output.add_argument("--warehouse", help="match warehouse database the records are added to")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunksize", type=int, default=4, help="dumps sent to a worker at a time")
+    args = parser.parse_args(argv)
+
+    dumps = find_dumps(args.directory)
+    print(f"found {len(dumps)} matches ({sum(1 for dump in dumps if dump[2])} with timelines) in {args.directory}")
+
+    if args.output:
+        with open(args.output, "wb") as file:
+            stats = ingest_dumps(dumps, encode_jsonl, file.write, args.workers, args.chunksize)
+    else:
+        warehouse = MatchWarehouse(args.warehouse)
+        stats = ingest_dumps(dumps, encode_warehouseRows, warehouse.insert_rows, args.workers, args.chunksize)
+
+    for match_id, error in stats["failed"].items():
+        print(f"failed {match_id}: {error}", file=sys.stderr)
+    destination = args.output or args.warehouse
+    print(
+        f"ingested {stats['matches']} matches ({len(stats['failed'])} failed) in {stats['seconds']:.2f} s: "
+        f"{stats['matches_per_second']:.1f} matches/sec, {os.path.getsize(destination) / 1e6:.2f} MB written to {destination}"
+    )
+
+if __name__ == "__main__":
+    main()
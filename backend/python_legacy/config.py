@@ -14,4 +14,91 @@ HEADERS = {
     "X-Riot-Token": RIOT_API_KEY
 }
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+# number of LLM completions in flight at the same time, per process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+# maximum tokens of the match summary in a coaching prompt, the least informative events are dropped first
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "1200"))
+# maximum tokens of all the match summaries of a multi-match coaching prompt, split evenly between the matches
+LLM_BATCH_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_PROMPT_TOKEN_BUDGET", "3000"))
+# seconds before cached insights are generated again
+LLM_INSIGHTS_TTL = int(os.getenv("LLM_INSIGHTS_TTL", str(7 * 86400)))
+# on-disk cache of the generated insights, separate from the Riot payloads so it has its own switch and size budget
+LLM_INSIGHTS_CACHE_ENABLED = os.getenv("LLM_INSIGHTS_CACHE_ENABLED", "true").lower() == "true"
+LLM_INSIGHTS_CACHE_PATH = os.getenv("LLM_INSIGHTS_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "llm_insights.sqlite3"))
+LLM_INSIGHTS_CACHE_MAX_BYTES = int(os.getenv("LLM_INSIGHTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# insights kept in memory, identical concurrent requests share one completion even with 0
+LLM_INSIGHTS_MEMO_ENTRIES = int(os.getenv("LLM_INSIGHTS_MEMO_ENTRIES", "256"))
+
+# number of threads used to fetch a match's details and timeline side by side
+MATCH_BUNDLE_WORKERS = int(os.getenv("MATCH_BUNDLE_WORKERS", "8"))
+# parse the timeline frame by frame while it is read, keeping only the player's data, instead of loading and indexing
+# the whole timeline (slower, but only one frame is held in memory):
+# "auto" streams when neither the memo nor the on-disk cache is on (the index would be rebuilt for every summary)
+TIMELINE_STREAM = os.getenv("TIMELINE_STREAM", "auto").lower()
+# number of matches summarized at the same time by the batch endpoints
+PLAYER_SUMMARIES_CONCURRENCY = int(os.getenv("PLAYER_SUMMARIES_CONCURRENCY", "5"))
+# number of match details fetched at the same time for multi-match aggregates
+PLAYER_AGGREGATE_CONCURRENCY = int(os.getenv("PLAYER_AGGREGATE_CONCURRENCY", "10"))
+# number of players whose running aggregates are kept in memory when the on-disk cache is turned off
+PLAYER_AGGREGATE_STATE_ENTRIES = int(os.getenv("PLAYER_AGGREGATE_STATE_ENTRIES", "1024"))
+# number of match details fetched at the same time while crawling a player's match history
+MATCH_HISTORY_CONCURRENCY = int(os.getenv("MATCH_HISTORY_CONCURRENCY", "10"))
+# largest number of matches one /match-history request may crawl
+MATCH_HISTORY_MAX_LIMIT = int(os.getenv("MATCH_HISTORY_MAX_LIMIT", "1000"))
+
+# persistent on-disk cache for Riot API payloads
+RIOT_CACHE_ENABLED = os.getenv("RIOT_CACHE_ENABLED", "true").lower() == "true"
+RIOT_CACHE_PATH = os.getenv("RIOT_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "riot_cache.sqlite3"))
+RIOT_CACHE_MAX_BYTES = int(os.getenv("RIOT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# seconds before a cache hit refreshes the entry's last access time, so most hits do not write
+RIOT_CACHE_ACCESS_REFRESH = float(os.getenv("RIOT_CACHE_ACCESS_REFRESH", "60"))
+# seconds before short-lived data is fetched again (completed matches never expire)
+RECENT_MATCHES_TTL = int(os.getenv("RECENT_MATCHES_TTL", "60"))
+PUUID_TTL = int(os.getenv("PUUID_TTL", "86400"))
+
+# local warehouse of normalized match rows, indexed by player, champion, role, patch and queue
+MATCH_WAREHOUSE_ENABLED = os.getenv("MATCH_WAREHOUSE_ENABLED", "true").lower() == "true"
+MATCH_WAREHOUSE_PATH = os.getenv("MATCH_WAREHOUSE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "match_warehouse.sqlite3"))
+
+# where match data is read from: "live" (Riot API), "cached" (memo and on-disk cache only, a miss is a 404)
+# or "fixture" (a local corpus of recorded payloads, for load tests)
+DATA_SOURCE = os.getenv("DATA_SOURCE", "live").lower()
+DATA_SOURCE_FIXTURE_DIR = os.getenv("DATA_SOURCE_FIXTURE_DIR", "")
+# parsed fixture payloads kept in memory
+DATA_SOURCE_FIXTURE_MEMO_ENTRIES = int(os.getenv("DATA_SOURCE_FIXTURE_MEMO_ENTRIES", "1024"))
+
+# in-process memo for Riot API payloads, concurrent identical lookups share one upstream call
+RIOT_MEMO_ENABLED = os.getenv("RIOT_MEMO_ENABLED", "true").lower() == "true"
+RIOT_MEMO_MAX_ENTRIES = int(os.getenv("RIOT_MEMO_MAX_ENTRIES", "256"))
+# estimated JSON size of the memoized payloads (a 32 minute timeline is about 1 MB and takes about 3 MB once parsed)
+RIOT_MEMO_MAX_BYTES = int(os.getenv("RIOT_MEMO_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# pooled HTTP session used for every Riot API request
+RIOT_POOL_SIZE = int(os.getenv("RIOT_POOL_SIZE", "20"))
+RIOT_CONNECT_TIMEOUT = float(os.getenv("RIOT_CONNECT_TIMEOUT", "3.05"))
+RIOT_READ_TIMEOUT = float(os.getenv("RIOT_READ_TIMEOUT", "10"))
+RIOT_MAX_RETRIES = int(os.getenv("RIOT_MAX_RETRIES", "2"))
+RIOT_RETRY_BACKOFF = float(os.getenv("RIOT_RETRY_BACKOFF", "0.5"))
+# upper bound of concurrent connections of the async client
+RIOT_ASYNC_MAX_CONNECTIONS = int(os.getenv("RIOT_ASYNC_MAX_CONNECTIONS", "1000"))
+
+# client-side pacing under the API key's rate limits, replaced by the limits Riot reports in response headers
+RIOT_RATE_LIMIT_ENABLED = os.getenv("RIOT_RATE_LIMIT_ENABLED", "true").lower() == "true"
+RIOT_APP_RATE_LIMIT = os.getenv("RIOT_APP_RATE_LIMIT", "20:1,100:120")
+RIOT_METHOD_RATE_LIMIT = os.getenv("RIOT_METHOD_RATE_LIMIT", "")
+RIOT_RATE_LIMIT_PAD = float(os.getenv("RIOT_RATE_LIMIT_PAD", "0.1"))
+RIOT_RATE_LIMIT_MAX_RETRIES = int(os.getenv("RIOT_RATE_LIMIT_MAX_RETRIES", "3"))
+
+# background prefetch of the recent matches of tracked players (ex: team rosters) into the caches
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+# comma separated PUUIDs of the tracked players
+PREFETCH_PUUIDS = [puuid.strip() for puuid in os.getenv("PREFETCH_PUUIDS", "").split(",") if puuid.strip()]
+# seconds between two polls of the tracked players' recent matches
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", "300"))
+PREFETCH_MATCH_COUNT = int(os.getenv("PREFETCH_MATCH_COUNT", "10"))
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "2"))
+# fraction of every rate limit window the prefetch may use, the rest is kept for foreground requests
+PREFETCH_RATE_SHARE = float(os.getenv("PREFETCH_RATE_SHARE", "0.5"))
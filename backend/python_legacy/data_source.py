@@ -0,0 +1,332 @@
+"""
+Pluggable sources of Riot match data.
+The analysis modules and the server fetch through data_source.source instead of calling the Riot clients directly,
+so the same code paths can run against:
+    - "live": the Riot API through riot_client and async_riot_client (rate limiter, memo and on-disk cache),
+    - "cached": the memo and the on-disk cache only, a miss is a 404 and nothing is sent to Riot,
+    - "fixture": a local corpus of recorded payloads, for load tests and capacity planning without Riot.
+The source is selected with DATA_SOURCE in config.py. Only the live source writes to the shared on-disk cache and the
+match warehouse, so fixture and cache-only runs never add their payloads to the production databases.
+
+A fixture corpus is a directory laid out like this (every .json file may also be gzipped as .json.gz):
+    accounts/<gameName>#<tagLine>.json   {"puuid": ...}
+    match-ids/<puuid>.json               every match ID of the player, newest first
+    matches/<match_id>.json              match-v5 match payload
+    timelines/<match_id>.json            match-v5 timeline payload
+
+Usage (from the repository root), to record a corpus from the live API:
+    python -m backend.python_legacy.data_source record FIXTURE_DIR GAME_NAME TAG_LINE [--count 20]
+"""
+
+import abc
+import argparse
+import asyncio
+import gzip
+import io
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable
+
+from backend.python_legacy import async_riot_client, match_warehouse, riot_client
+from backend.python_legacy.config import DATA_SOURCE, DATA_SOURCE_FIXTURE_DIR, DATA_SOURCE_FIXTURE_MEMO_ENTRIES
+from backend.python_legacy.memo_cache import MemoCache
+from backend.python_legacy.riot_client import RiotAPIError
+
+class DataSource(abc.ABC):
+    """
+    Interface of the data sources. The async methods run the sync ones in a worker thread unless a source
+    has a native async implementation. Returned payloads may be shared and must be treated as read-only.
+    """
+    # whether the payloads of this source may be written to the shared on-disk cache and the match warehouse
+    live = False
+
+    @abc.abstractmethod
+    def get_PUUID(self, gameName:str, tagLine:str) -> str:
+        ...
+
+    @abc.abstractmethod
+    def get_recentMatches(self, puuid:str, count:int = 5) -> list[str]:
+        ...
+
+    @abc.abstractmethod
+    def get_matchIds(self, puuid:str, start:int = 0, count:int = 100, queue:int | None = None,
+                     startTime:int | None = None, endTime:int | None = None) -> list[str]:
+        ...
+
+    @abc.abstractmethod
+    def get_matchDetails(self, match_id:str) -> dict[str, Any]:
+        ...
+
+    @abc.abstractmethod
+    def get_matchTimeline(self, match_id:str) -> dict[str, Any]:
+        ...
+
+    def cached_call(self, cache_key:str, loader:Callable[[], Any]) -> Any:
+        """
+        Serves a value derived from the payloads of this source (ex: a timeline index).
+        By default it is built on every call and never written to the shared caches.
+        """
+        return loader()
+
+    async def cached_call_async(self, cache_key:str, loader:Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of cached_call for coroutine loaders.
+        """
+        return await loader()
+
+    @contextmanager
+    def open_matchTimeline(self, match_id:str):
+        """
+        Opens the timeline of a match as a binary stream. By default the loaded payload is serialized again.
+        """
+        yield io.BytesIO(json.dumps(self.get_matchTimeline(match_id)).encode("utf-8"))
+
+    async def get_PUUID_async(self, gameName:str, tagLine:str) -> str:
+        return await asyncio.to_thread(self.get_PUUID, gameName, tagLine)
+
+    async def get_recentMatches_async(self, puuid:str, count:int = 5) -> list[str]:
+        return await asyncio.to_thread(self.get_recentMatches, puuid, count)
+
+    async def get_matchIds_async(self, puuid:str, start:int = 0, count:int = 100, queue:int | None = None,
+                                 startTime:int | None = None, endTime:int | None = None) -> list[str]:
+        return await asyncio.to_thread(self.get_matchIds, puuid, start, count, queue, startTime, endTime)
+
+    async def get_matchDetails_async(self, match_id:str) -> dict[str, Any]:
+        return await asyncio.to_thread(self.get_matchDetails, match_id)
+
+    async def get_matchTimeline_async(self, match_id:str) -> dict[str, Any]:
+        return await asyncio.to_thread(self.get_matchTimeline, match_id)
+
+class LiveDataSource(DataSource):
+    """
+    The Riot API. The client functions are looked up on every call, so patching them in tests still applies.
+    """
+    live = True
+
+    def get_PUUID(self, gameName, tagLine):
+        return riot_client.get_PUUID(gameName, tagLine)
+
+    def get_recentMatches(self, puuid, count = 5):
+        return riot_client.get_recentMatches(puuid, count)
+
+    def get_matchIds(self, puuid, start = 0, count = 100, queue = None, startTime = None, endTime = None):
+        return riot_client.get_matchIds(puuid, start, count, queue, startTime, endTime)
+
+    def get_matchDetails(self, match_id):
+        return riot_client.get_matchDetails(match_id)
+
+    def get_matchTimeline(self, match_id):
+        return riot_client.get_matchTimeline(match_id)
+
+    def open_matchTimeline(self, match_id):
+        return riot_client.open_matchTimeline(match_id)
+
+    def cached_call(self, cache_key, loader):
+        return riot_client.cached_call(cache_key, loader)
+
+    async def cached_call_async(self, cache_key, loader):
+        return await async_riot_client.cached_call(cache_key, loader)
+
+    async def get_PUUID_async(self, gameName, tagLine):
+        return await async_riot_client.get_PUUID(gameName, tagLine)
+
+    async def get_recentMatches_async(self, puuid, count = 5):
+        return await async_riot_client.get_recentMatches(puuid, count)
+
+    async def get_matchIds_async(self, puuid, start = 0, count = 100, queue = None, startTime = None, endTime = None):
+        return await async_riot_client.get_matchIds(puuid, start, count, queue, startTime, endTime)
+
+    async def get_matchDetails_async(self, match_id):
+        return await async_riot_client.get_matchDetails(match_id)
+
+    async def get_matchTimeline_async(self, match_id):
+        return await async_riot_client.get_matchTimeline(match_id)
+
+class CachedDataSource(DataSource):
+    """
+    The in-memory memo and the on-disk cache of riot_client, under the same keys as the live source.
+    A payload that is not cached raises a RiotAPIError with status code 404.
+    """
+    def _lookup(self, cache_key:str):
+        memo_cache = riot_client.memo_cache
+        value = memo_cache.get(cache_key) if memo_cache is not None else None
+        if value is None and riot_client.match_cache is not None:
+            value = riot_client.match_cache.get(cache_key)
+        if value is None:
+            raise RiotAPIError(f"Data not found in cache: {cache_key}", status_code=404)
+        return value
+
+    def get_PUUID(self, gameName, tagLine):
+        return self._lookup(f"puuid:{gameName}#{tagLine}").get("puuid")
+
+    def get_recentMatches(self, puuid, count = 5):
+        return self._lookup(f"recent-matches:{puuid}:{count}")
+
+    def get_matchIds(self, puuid, start = 0, count = 100, queue = None, startTime = None, endTime = None):
+        query = riot_client.matchIds_query(start, count, queue, startTime, endTime)
+        return self._lookup(f"match-ids:{puuid}:{query}")
+
+    def get_matchDetails(self, match_id):
+        return self._lookup(f"match-details:{match_id}")
+
+    def get_matchTimeline(self, match_id):
+        return self._lookup(f"match-timeline:{match_id}")
+
+    def cached_call(self, cache_key, loader):
+        # values missing from the caches are built from the cached payloads but not written back
+        try:
+            return self._lookup(cache_key)
+        except RiotAPIError:
+            return loader()
+
+    async def cached_call_async(self, cache_key, loader):
+        cached = await async_riot_client.cached_lookup(cache_key)
+        return cached if cached is not None else await loader()
+
+class FixtureDataSource(DataSource):
+    """
+    A local corpus of recorded payloads (see the module docstring for the layout).
+    Parsed payloads are memoized, so replaying the same matches at high request rates does not parse them again.
+
+    Args:
+        directory (str): The root directory of the corpus.
+        memo_entries (int): The maximum number of parsed payloads kept in memory.
+    """
+    def __init__(self, directory:str, memo_entries:int = DATA_SOURCE_FIXTURE_MEMO_ENTRIES):
+        self.directory = directory
+        self._memo = MemoCache(memo_entries)
+
+    def _path(self, kind:str, key:str) -> str | None:
+        base = os.path.join(self.directory, kind, key)
+        for path in (f"{base}.json", f"{base}.json.gz"):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _open(self, kind:str, key:str):
+        path = self._path(kind, key)
+        if path is None:
+            raise RiotAPIError(f"Data not found in fixtures: {kind}/{key}", status_code=404)
+        return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+    def _load(self, kind:str, key:str):
+        def load():
+            with self._open(kind, key) as file:
+                return json.load(file)
+
+        return self._memo.get_or_load(f"{kind}/{key}", load)
+
+    def get_PUUID(self, gameName, tagLine):
+        return self._load("accounts", f"{gameName}#{tagLine}").get("puuid")
+
+    def get_recentMatches(self, puuid, count = 5):
+        return self._load("match-ids", puuid)[:count]
+
+    def get_matchIds(self, puuid, start = 0, count = 100, queue = None, startTime = None, endTime = None):
+        match_ids = self._load("match-ids", puuid)
+        if queue is not None or startTime is not None or endTime is not None:
+            match_ids = [match_id for match_id in match_ids if self._matches_filters(match_id, queue, startTime, endTime)]
+        return match_ids[start:start + count]
+
+    def _matches_filters(self, match_id:str, queue:int | None, startTime:int | None, endTime:int | None) -> bool:
+        info = self.get_matchDetails(match_id).get("info", {})
+        # gameCreation is in milliseconds, the filters in seconds like the match-v5 endpoint
+        created = (info.get("gameCreation") or 0) / 1000
+        return (
+            (queue is None or info.get("queueId") == queue) and
+            (startTime is None or created >= startTime) and
+            (endTime is None or created <= endTime)
+        )
+
+    def get_matchDetails(self, match_id):
+        return self._load("matches", match_id)
+
+    def get_matchTimeline(self, match_id):
+        return self._load("timelines", match_id)
+
+    @contextmanager
+    def open_matchTimeline(self, match_id):
+        with self._open("timelines", match_id) as file:
+            yield file
+
+    def cached_call(self, cache_key, loader):
+        # derived values are memoized next to the parsed payloads
+        return self._memo.get_or_load(cache_key, loader)
+
+    async def cached_call_async(self, cache_key, loader):
+        return await self._memo.get_or_load_async(cache_key, loader)
+
+def write_fixture(directory:str, kind:str, key:str, payload:Any, compress:bool = False):
+    """
+    Writes one payload of a fixture corpus (ex: kind "matches" and the match ID as key).
+    """
+    os.makedirs(os.path.join(directory, kind), exist_ok=True)
+    path = os.path.join(directory, kind, f"{key}.json")
+    if compress:
+        with gzip.open(f"{path}.gz", "wt", encoding="utf-8") as file:
+            json.dump(payload, file)
+    else:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(payload, file)
+
+def record_fixtures(directory:str, gameName:str, tagLine:str, count:int = 20, source:DataSource | None = None) -> int:
+    """
+    Records the account, match IDs, matches and timelines of a player's recent matches into a fixture corpus.
+
+    Returns:
+        int: The number of matches recorded.
+    """
+    source = source or LiveDataSource()
+    puuid = source.get_PUUID(gameName, tagLine)
+    match_ids = source.get_recentMatches(puuid, count)
+
+    write_fixture(directory, "accounts", f"{gameName}#{tagLine}", {"puuid": puuid})
+    write_fixture(directory, "match-ids", puuid, match_ids)
+    for match_id in match_ids:
+        write_fixture(directory, "matches", match_id, source.get_matchDetails(match_id))
+        write_fixture(directory, "timelines", match_id, source.get_matchTimeline(match_id), compress=True)
+
+    return len(match_ids)
+
+def create_source(name:str, fixture_dir:str | None = None) -> DataSource:
+    """
+    Creates the data source named in DATA_SOURCE.
+
+    Raises:
+        ValueError: If the name is unknown, or the fixture source has no directory.
+    """
+    if name == "live":
+        return LiveDataSource()
+    if name == "cached":
+        return CachedDataSource()
+    if name == "fixture":
+        if not fixture_dir:
+            raise ValueError("DATA_SOURCE_FIXTURE_DIR must be set for the fixture data source")
+        return FixtureDataSource(fixture_dir)
+    raise ValueError(f"Unknown data source: {name}")
+
+# shared source used by the analysis modules and the server
+source = create_source(DATA_SOURCE, DATA_SOURCE_FIXTURE_DIR)
+
+def writable_warehouse() -> match_warehouse.MatchWarehouse | None:
+    """
+    Returns the match warehouse fetched matches are added to: None when it is turned off or the source is not live.
+    """
+    return match_warehouse.warehouse if source.live else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a fixture corpus from the live Riot API.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record = subparsers.add_parser("record", help="record a player's recent matches")
+    record.add_argument("directory", help="root directory of the fixture corpus")
+    record.add_argument("gameName")
+    record.add_argument("tagLine")
+    record.add_argument("--count", type=int, default=20, help="number of recent matches")
+    args = parser.parse_args()
+
+    recorded = record_fixtures(args.directory, args.gameName, args.tagLine, args.count)
+    print(f"recorded {recorded} matches of {args.gameName}#{args.tagLine} in {args.directory}")
+
+if __name__ == "__main__":
+    main()
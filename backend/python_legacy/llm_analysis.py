@@ -1,17 +1,202 @@
-from openai import OpenAI
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable
 
-from backend.python_legacy.config import OPENAI_API_KEY
+from openai import AsyncOpenAI, OpenAI
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+from backend.python_legacy.config import (
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TIMEOUT, LLM_MAX_CONCURRENCY, LLM_INSIGHTS_TTL, LLM_PROMPT_TOKEN_BUDGET,
+    LLM_BATCH_PROMPT_TOKEN_BUDGET, LLM_INSIGHTS_CACHE_ENABLED, LLM_INSIGHTS_CACHE_PATH, LLM_INSIGHTS_CACHE_MAX_BYTES,
+    LLM_INSIGHTS_MEMO_ENTRIES
+)
+from backend.python_legacy.match_cache import MatchCache
+from backend.python_legacy.memo_cache import MemoCache
+from backend.python_legacy.prompt_compaction import compact_playerSummary, count_tokens
 
-def generate_insights(player_summary):
+logger = logging.getLogger(__name__)
+
+# bump when the prompt changes, so insights cached for the old prompt are not served
+PROMPT_VERSION = "2"
+SYSTEM_PROMPT = "You are an expert League of Legends coach."
+
+_client = None
+_async_client = None
+_async_client_loop = None
+
+class CompletionSlots:
     """
-    Uses LLM to generate insights based on player stats and game timeline.
+    Caps the completions in flight across the sync callers (worker threads) and the async ones (event loops),
+    so both kinds of endpoints share one limit. A released slot goes to the longest waiting async caller first.
+
+    Args:
+        limit (int): The maximum number of completions in flight.
+    """
+    def __init__(self, limit:int):
+        self.limit = max(limit, 1)
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._waiters = deque()     # (loop, future) of the waiting async callers
+
+    def acquire(self):
+        with self._released:
+            while self.in_use >= self.limit or self._waiters:
+                self._released.wait()
+            self.in_use += 1
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                    future = None
+            # a slot handed over before the cancellation is given back
+            if future is not None and future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            # hand the slot over to an async caller, in_use stays the same
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:
+                    # the waiter's loop is closed
+                    continue
+            self.in_use -= 1
+            self._released.notify()
+
+    def _grant(self, future:asyncio.Future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+# caps the completions in flight, so a burst of requests does not hold every worker on the LLM
+_completion_slots = CompletionSlots(LLM_MAX_CONCURRENCY)
+
+# generated insights are cached apart from the Riot payloads, the memo also coalesces identical concurrent requests
+insights_cache = MatchCache(LLM_INSIGHTS_CACHE_PATH, LLM_INSIGHTS_CACHE_MAX_BYTES) if LLM_INSIGHTS_CACHE_ENABLED else None
+insights_memo = MemoCache(LLM_INSIGHTS_MEMO_ENTRIES)
+
+def get_client() -> OpenAI:
+    """
+    Returns the shared OpenAI client, creating it on first use.
+    """
+    global _client
+
+    if _client is None:
+        _client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
+    return _client
+
+def get_async_client() -> AsyncOpenAI:
+    """
+    Returns the shared async OpenAI client of the running event loop, creating it on first use.
+    """
+    global _async_client, _async_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
+        _async_client_loop = loop
+    return _async_client
+
+def cached_insights(cache_key:str, loader:Callable[[], Any]) -> Any:
+    """
+    Serves insights from the insights memo or cache, calling the loader on a miss.
+    Identical concurrent requests share one call of the loader.
+    """
+    def load():
+        if insights_cache is not None:
+            cached = insights_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        value = loader()
+        if insights_cache is not None:
+            insights_cache.set(cache_key, value, LLM_INSIGHTS_TTL)
+        return value
+
+    return insights_memo.get_or_load(cache_key, load)
+
+async def cached_insights_async(cache_key:str, loader:Callable[[], Awaitable[Any]]) -> Any:
     """
+    Async version of cached_insights for coroutine loaders. SQLite calls run in a worker thread.
+    """
+    async def load():
+        if insights_cache is not None:
+            cached = await asyncio.to_thread(insights_cache.get, cache_key)
+            if cached is not None:
+                return cached
+
+        value = await loader()
+        if insights_cache is not None:
+            await asyncio.to_thread(insights_cache.set, cache_key, value, LLM_INSIGHTS_TTL)
+        return value
+
+    return await insights_memo.get_or_load_async(cache_key, load)
+
+async def lookup_insights_async(cache_key:str) -> Any:
+    """
+    Returns cached insights without generating them, None on a miss.
+    """
+    value = insights_memo.get(cache_key)
+    if value is None and insights_cache is not None:
+        value = await asyncio.to_thread(insights_cache.get, cache_key)
+    return value
+
+PROMPT_TEMPLATE = """
+    You are a League of Legends AI coach. Analyze this player's match.
+    The first line has the player's end-of-game stats. Each other line is "m<minute> <event>" from the player's
+    point of view, where numbers are participant IDs (1-5 blue team, 6-10 red team) and "xN" merges N repeats.
+
+    {summary}
 
-    prompt = f"""
+    Instructions:
+    1. Identify misplays or suboptimal decisions.
+    2. Suggest actionable improvements.
+    3. Summarize overall strengths and weaknesses.
+    Provide concise, coaching-style feedback.
+    """
+
+def build_rawPrompt(player_summary:dict) -> str:
+    """
+    Builds the prompt with the whole summary as Python reprs, as it was before compaction (used to report the savings).
+    """
+    return f"""
     You are a League of Legends AI coach. Analyze this player's match:
-    
+
     Following is the player stats: {player_summary['player_stats']}
     Following is the match's major timeline events: {player_summary['player_timeline']}
 
@@ -22,12 +207,316 @@ def generate_insights(player_summary):
     Provide concise, coaching-style feedback.
     """
 
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are an expert League of Legends coach."},
-            {"role": "user", "content": prompt}
-        ]
+def prepare_prompt(player_summary:dict, token_budget:int = LLM_PROMPT_TOKEN_BUDGET) -> dict:
+    """
+    Builds the coaching prompt of a player summary, compacted to the token budget.
+
+    return: a dictionary with "prompt", "tokens_before" (tokens of the uncompacted prompt), "tokens_after",
+        "lines_total" and "lines_kept" (timeline lines before and after the budget).
+    """
+    compacted = compact_playerSummary(player_summary, token_budget)
+    prompt = PROMPT_TEMPLATE.format(summary=compacted["text"])
+
+    return {
+        "prompt": prompt,
+        "tokens_before": count_tokens(build_rawPrompt(player_summary)),
+        "tokens_after": count_tokens(prompt),
+        "lines_total": compacted["lines_total"],
+        "lines_kept": compacted["lines_kept"]
+    }
+
+def build_prompt(player_summary:dict) -> str:
+    """
+    Builds the coaching prompt of a player summary and logs the tokens saved by the compaction.
+    """
+    prepared = prepare_prompt(player_summary)
+    logger.info(
+        f"Prompt compacted from {prepared['tokens_before']} to {prepared['tokens_after']} tokens "
+        f"({prepared['lines_kept']}/{prepared['lines_total']} timeline lines kept)"
     )
 
-    return response.choices[0].message.content
+    return prepared["prompt"]
+
+MULTI_PROMPT_TEMPLATE = """
+    You are a League of Legends AI coach. Review these {count} matches of the same player.
+    Each match starts with "## <match ID>". Its first line has the player's end-of-game stats. Each other line is
+    "m<minute> <event>" from the player's point of view, where numbers are participant IDs (1-5 blue team, 6-10 red team)
+    and "xN" merges N repeats.
+
+    {summaries}
+
+    Instructions:
+    1. For each match, identify misplays and suggest actionable improvements in a few sentences.
+    2. Across all matches, point out recurring strengths, weaknesses and the habits to work on first.
+    Reply with a JSON object: {{"matches": {{"<match ID>": "<feedback>", ...}}, "overall": "<cross-match feedback>"}}
+    """
+
+def prepare_multiPrompt(player_summaries:dict[str, dict], token_budget:int = LLM_BATCH_PROMPT_TOKEN_BUDGET) -> dict:
+    """
+    Builds one coaching prompt for several matches, each summary compacted to an even share of the token budget.
+
+    Args:
+        player_summaries (dict): match ID -> the summary built by player_summary.get_playerSummary.
+        token_budget (int): The maximum number of tokens of all the compacted summaries.
+
+    Returns:
+        dict: "prompt", "tokens_before" (tokens of one uncompacted prompt per match) and "tokens_after".
+    """
+    share = token_budget // max(len(player_summaries), 1)
+    sections = []
+    tokens_before = 0
+    for match_id, player_summary in player_summaries.items():
+        sections.append(f"## {match_id}\n" + compact_playerSummary(player_summary, share)["text"])
+        tokens_before += count_tokens(build_rawPrompt(player_summary))
+
+    prompt = MULTI_PROMPT_TEMPLATE.format(count=len(player_summaries), summaries="\n\n".join(sections))
+
+    return {
+        "prompt": prompt,
+        "tokens_before": tokens_before,
+        "tokens_after": count_tokens(prompt)
+    }
+
+def parse_multiInsights(content:str, match_ids:list[str]) -> dict:
+    """
+    Reads the JSON reply of a multi-match prompt. A reply that is not the expected JSON is kept as the overall feedback.
+
+    return: a dictionary with "matches" (a list in the order of match_ids, each with "match_id" and "feedback",
+        None when the model skipped the match) and "overall".
+    """
+    try:
+        reply = json.loads(content)
+        per_match = reply.get("matches") or {}
+        overall = reply.get("overall")
+        if not isinstance(per_match, dict):
+            raise ValueError("matches is not an object")
+    except (ValueError, AttributeError):
+        logger.warning("Multi-match insights are not the expected JSON, returning them as overall feedback")
+        per_match, overall = {}, content
+
+    return {
+        "matches": [{"match_id": match_id, "feedback": per_match.get(match_id)} for match_id in match_ids],
+        "overall": overall
+    }
+
+def build_messages(prompt:str) -> list[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def insights_cacheKey(player_summary:dict, model:str = OPENAI_MODEL) -> str:
+    """
+    Returns the cache key of the insights of a summary: a hash of the summary with sorted keys and no whitespace,
+    the model, the prompt version and the prompt token budget. Summaries that only differ in key order share the same insights.
+    """
+    return f"llm-insights:{_digest(player_summary, model, LLM_PROMPT_TOKEN_BUDGET)}"
+
+def multiInsights_cacheKey(player_summaries:dict[str, dict], model:str = OPENAI_MODEL) -> str:
+    """
+    Returns the cache key of the insights of several matches, built like insights_cacheKey.
+    """
+    return f"llm-multi-insights:{_digest(player_summaries, model, LLM_BATCH_PROMPT_TOKEN_BUDGET)}"
+
+def _digest(payload, model:str, token_budget:int) -> str:
+    normalized = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{model}\n{PROMPT_VERSION}\n{token_budget}\n{normalized}".encode("utf-8")).hexdigest()
+
+def generate_insights(player_summary:dict, model:str = OPENAI_MODEL, client = None) -> str:
+    """
+    Uses LLM to generate insights based on player stats and game timeline.
+    Insights are cached apart from the Riot payloads, and identical concurrent requests share one completion.
+
+    Args:
+        player_summary (dict): The summary built by player_summary.get_playerSummary.
+        model (str): The chat model to use.
+        client: An OpenAI compatible client (ex: a local stub in tests), the shared OpenAI client if None.
+
+    Returns:
+        str: The coaching feedback.
+    """
+    def load() -> str:
+        with _completion_slots:
+            response = (client or get_client()).chat.completions.create(
+                model=model,
+                messages=build_messages(build_prompt(player_summary)),
+            )
+        return response.choices[0].message.content
+
+    return cached_insights(insights_cacheKey(player_summary, model), load)
+
+async def generate_insights_async(player_summary:dict, model:str = OPENAI_MODEL, client = None) -> str:
+    """
+    Async version of generate_insights for the async server endpoints.
+
+    Args:
+        player_summary (dict): The summary built by player_summary.get_playerSummary.
+        model (str): The chat model to use.
+        client: An AsyncOpenAI compatible client (ex: a local stub in tests), the shared AsyncOpenAI client if None.
+
+    Returns:
+        str: The coaching feedback.
+    """
+    async def load() -> str:
+        async with _completion_slots:
+            response = await (client or get_async_client()).chat.completions.create(
+                model=model,
+                messages=build_messages(build_prompt(player_summary)),
+            )
+        return response.choices[0].message.content
+
+    return await cached_insights_async(insights_cacheKey(player_summary, model), load)
+
+def generate_multiInsights(player_summaries:dict[str, dict], model:str = OPENAI_MODEL, client = None) -> dict:
+    """
+    Uses LLM to review several matches of a player in one request, with feedback per match and across matches.
+    The system prompt and instructions are sent once instead of once per match, and the reply is cached.
+
+    Args:
+        player_summaries (dict): match ID -> the summary built by player_summary.get_playerSummary.
+        model (str): The chat model to use.
+        client: An OpenAI compatible client (ex: a local stub in tests), the shared OpenAI client if None.
+
+    Returns:
+        dict: "matches" (a list with "match_id" and "feedback" per match) and "overall".
+    """
+    def load() -> dict:
+        prepared = prepare_multiPrompt(player_summaries)
+        logger.info(f"Multi-match prompt of {len(player_summaries)} matches: {prepared['tokens_before']} to {prepared['tokens_after']} tokens")
+        with _completion_slots:
+            response = (client or get_client()).chat.completions.create(
+                model=model,
+                messages=build_messages(prepared["prompt"]),
+                response_format={"type": "json_object"}
+            )
+        return parse_multiInsights(response.choices[0].message.content, list(player_summaries))
+
+    return cached_insights(multiInsights_cacheKey(player_summaries, model), load)
+
+async def generate_multiInsights_async(player_summaries:dict[str, dict], model:str = OPENAI_MODEL, client = None) -> dict:
+    """
+    Async version of generate_multiInsights for the async server endpoints.
+
+    Args:
+        player_summaries (dict): match ID -> the summary built by player_summary.get_playerSummary.
+        model (str): The chat model to use.
+        client: An AsyncOpenAI compatible client (ex: a local stub in tests), the shared AsyncOpenAI client if None.
+
+    Returns:
+        dict: "matches" (a list with "match_id" and "feedback" per match) and "overall".
+    """
+    async def load() -> dict:
+        prepared = prepare_multiPrompt(player_summaries)
+        logger.info(f"Multi-match prompt of {len(player_summaries)} matches: {prepared['tokens_before']} to {prepared['tokens_after']} tokens")
+        async with _completion_slots:
+            response = await (client or get_async_client()).chat.completions.create(
+                model=model,
+                messages=build_messages(prepared["prompt"]),
+                response_format={"type": "json_object"}
+            )
+        return parse_multiInsights(response.choices[0].message.content, list(player_summaries))
+
+    return await cached_insights_async(multiInsights_cacheKey(player_summaries, model), load)
+
+class InsightStream:
+    """
+    A streamed completion in progress. The upstream stream is read by its own task into a buffer, so the completion
+    slot is released as soon as the model is done, however slowly the clients read. Every request of the same prompt
+    follows the same buffer from its first chunk.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.task = None
+        self._changed = asyncio.Condition()
+
+    async def _append(self, text:str | None = None, done:bool = False, error:BaseException | None = None):
+        async with self._changed:
+            if text:
+                self.chunks.append(text)
+            if error is not None:
+                self.error = error
+            self.done = self.done or done
+            self._changed.notify_all()
+
+    async def produce(self, cache_key:str, messages:list[dict], model:str, client):
+        """
+        Reads the upstream stream while holding a completion slot and caches the full insights.
+        """
+        try:
+            async with _completion_slots:
+                stream = await client.chat.completions.create(model=model, messages=messages, stream=True)
+                async for chunk in stream:
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if text:
+                        await self._append(text)
+            await store_insights_async(cache_key, "".join(self.chunks))
+            await self._append(done=True)
+        except BaseException as error:
+            await self._append(done=True, error=error)
+            if not isinstance(error, Exception):
+                raise
+        finally:
+            if _insight_streams.get(cache_key) is self:
+                del _insight_streams[cache_key]
+
+    async def follow(self):
+        """
+        Yields the buffered chunks, then the next ones as they arrive. Raises the upstream error, if any.
+        """
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.chunks) > position or self.done)
+                chunks, done, error = self.chunks[position:], self.done, self.error
+            position += len(chunks)
+            for text in chunks:
+                yield text
+            if done and position == len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+# streamed completions in progress, by insights cache key
+_insight_streams = {}
+
+async def store_insights_async(cache_key:str, insights:Any):
+    """
+    Caches insights generated outside of cached_insights_async (ex: a streamed completion).
+    """
+    insights_memo.set(cache_key, insights, LLM_INSIGHTS_TTL)
+    if insights_cache is not None:
+        await asyncio.to_thread(insights_cache.set, cache_key, insights, LLM_INSIGHTS_TTL)
+
+async def stream_insights_async(player_summary:dict, model:str = OPENAI_MODEL, client = None):
+    """
+    Yields the insights of a summary as text chunks while the model generates them.
+    Cached insights are yielded in one chunk. Identical concurrent requests follow one completion (see InsightStream),
+    which is cached once it is fully received, even if every client dropped the stream early.
+
+    Args:
+        player_summary (dict): The summary built by player_summary.get_playerSummary.
+        model (str): The chat model to use.
+        client: An AsyncOpenAI compatible client (ex: a local stub in tests), the shared AsyncOpenAI client if None.
+
+    Yields:
+        str: The next piece of the coaching feedback.
+    """
+    cache_key = insights_cacheKey(player_summary, model)
+    cached = await lookup_insights_async(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    loop = asyncio.get_running_loop()
+    insight_stream = _insight_streams.get(cache_key)
+    # a stream left over by a closed event loop is not followed
+    if insight_stream is None or insight_stream.task.get_loop() is not loop:
+        insight_stream = InsightStream()
+        _insight_streams[cache_key] = insight_stream
+        messages = build_messages(build_prompt(player_summary))
+        insight_stream.task = loop.create_task(insight_stream.produce(cache_key, messages, model, client or get_async_client()))
+
+    async for text in insight_stream.follow():
+        yield text
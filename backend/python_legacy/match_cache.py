@@ -0,0 +1,208 @@
+"""
+Persistent on-disk cache for Riot API payloads.
+Payloads are stored zlib-compressed in a SQLite database, so they survive server restarts and
+can be shared by several uvicorn workers. Once the stored payloads go over the byte budget,
+the least recently used entries are evicted first. Access times are only refreshed once they are
+older than a refresh interval, so repeated hits stay reads and do not queue on SQLite's write lock.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+class MatchCache:
+    """
+    SQLite backed key-value cache with optional per-entry TTL and size-bounded LRU eviction.
+
+    Args:
+        path (str): The path of the SQLite database file.
+        max_bytes (int): The maximum total size of the compressed payloads.
+        access_refresh (float): Seconds before a hit updates the entry's last access time again.
+    """
+    def __init__(self, path: str, max_bytes: int, access_refresh: float = 60):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.access_refresh = access_refresh
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connect()
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_last_access ON cache_entries (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Returns the SQLite connection of the current thread, opening it on first use.
+        WAL mode lets readers in other workers proceed while one worker writes.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _record(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Any:
+        """
+        Returns the cached value for the key, or None if it is missing or expired.
+        """
+        try:
+            connection = self._connect()
+            row = connection.execute("SELECT payload, expires_at, last_access FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+
+            if row is None:
+                self._record(hit=False)
+                return None
+
+            payload, expires_at, last_access = row
+            if expires_at is not None and expires_at <= now:
+                connection.execute("DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?", (key, now))
+                self._record(hit=False)
+                return None
+
+            # the eviction order only needs coarse access times, so most hits skip the write
+            if now - last_access >= self.access_refresh:
+                connection.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+            self._record(hit=True)
+            return json.loads(zlib.decompress(payload))
+
+        except sqlite3.Error as error:
+            logger.warning(f"Cache read failed for {key}: {error}")
+            self._record(hit=False)
+            return None
+
+    def cached_keys(self, keys: list[str]) -> set[str]:
+        """
+        Returns the keys that have a fresh entry, without reading their payloads or counting hits and misses.
+        """
+        found = set()
+        try:
+            connection = self._connect()
+            now = time.time()
+            # stay under SQLite's limit of bound parameters per statement
+            for offset in range(0, len(keys), 500):
+                chunk = keys[offset:offset + 500]
+                rows = connection.execute(
+                    f"SELECT key FROM cache_entries WHERE key IN ({','.join('?' * len(chunk))}) AND (expires_at IS NULL OR expires_at > ?)",
+                    (*chunk, now)
+                )
+                found.update(key for key, in rows)
+
+        except sqlite3.Error as error:
+            logger.warning(f"Cache lookup failed for {len(keys)} keys: {error}")
+
+        return found
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        """
+        Stores the value under the key and evicts least recently used entries if over budget.
+
+        Args:
+            key (str): The cache key.
+            value (Any): A JSON serializable value.
+            ttl (float | None): Seconds until the entry expires, None to keep it until evicted.
+        """
+        payload = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        size = len(payload)
+        if size > self.max_bytes:
+            logger.warning(f"Skipping cache write for {key}: {size} bytes is over the cache budget")
+            return
+
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        try:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, payload, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, size, expires_at, now)
+                )
+                self._evict(connection, now)
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+
+        except sqlite3.Error as error:
+            logger.warning(f"Cache write failed for {key}: {error}")
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        """
+        Drops expired entries, then least recently used entries until the cache fits its budget.
+        """
+        connection.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in connection.execute("SELECT key, size FROM cache_entries ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+
+        connection.executemany("DELETE FROM cache_entries WHERE key = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} cache entries to stay under {self.max_bytes} bytes")
+
+    def clear(self):
+        """
+        Removes every entry and resets the hit/miss counters.
+        """
+        self._connect().execute("DELETE FROM cache_entries")
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def metrics(self) -> dict:
+        """
+        Returns the hit/miss counters of this process and the storage used by all processes.
+        """
+        entries, bytes_used = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes_used": bytes_used,
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,437 @@
+"""
+Extraction of player and match data from match-v5 payloads.
+Every function here works on payloads that are already loaded (or on a binary stream of one) and never fetches
+anything, so the same code serves the API through player_summary and offline tools working on saved dumps.
+"""
+
+import io
+import json
+from typing import BinaryIO
+
+import ijson
+
+from backend.python_legacy.frame_series import FrameSeries
+
+# keys to keep in the challenges dictionary
+_CHALLENGES_KEEP_KEYS = {
+    # Core performance
+    "kda",
+    "damagePerMinute",
+    "teamDamagePercentage",
+    "killParticipation",
+    "goldPerMinute",
+    "visionScorePerMinute",
+
+    # Objective & Macro
+    "baronTakedowns",
+    "dragonTakedowns",
+    "riftHeraldTakedowns",
+    "turretTakedowns",
+    "voidMonsterKill",
+
+    # Fighting / Skirmishing
+    "soloKills",
+    "killsNearEnemyTurret",
+    "killsUnderOwnTurret",
+    "outnumberedKills",
+    "immobilizeAndKillWithAlly",
+    "enemyChampionImmobilizations",
+
+    # Laning Phase
+    "laneMinionsFirst10Minutes",
+    "maxCsAdvantageOnLaneOpponent",
+    "maxLevelLeadLaneOpponent",
+
+    # Survivability
+    "damageTakenOnTeamPercentage",
+    "survivedSingleDigitHpCount",
+    "survivedThreeImmobilizesInFight",
+
+    # Vision & Utility
+    "controlWardsPlaced",
+    "stealthWardsPlaced",
+    "wardTakedowns",
+    "visionScoreAdvantageLaneOpponent",
+}
+
+def _extract_playerStats(player:dict) -> dict:
+    """
+    Extracts the relevant stats of one entry of info.participants.
+    """
+    # filter out unnecessary information to reduce size
+    filtered_challenges = {key: value for key, value in player["challenges"].items() if key in _CHALLENGES_KEEP_KEYS}
+
+    # extract relevant stats
+    return {
+        "champion": player.get("championName"),
+        "role": player.get("teamPosition"),
+        "champLevel": player.get("champLevel"),
+        "kills": player.get("kills"),
+        "deaths": player.get("deaths"),
+        "assists": player.get("assists"),
+        "totalGold": player.get("goldEarned"),
+        "totalDamage": player.get("totalDamageDealtToChampions"),
+        "visionScore": player.get("visionScore"),
+        "wardsPlaced": player.get("wardsPlaced"),
+        "detectorWardsPlaced": player.get("detectorWardsPlaced"),
+        "cs": player.get("totalMinionsKilled") + player.get("neutralMinionsKilled"),
+        "runes": player.get("perks"),
+        "challenge": filtered_challenges,
+        "win": player.get("win")
+    }
+
+def extract_playerDetails(puuid:str, match_details:dict) -> dict:
+    """
+    Extracts player-specific stats details from an already fetched match details payload.
+
+    return: the player's stats, or an empty dictionary if the player is not in the match.
+    """
+    player_details = {}
+
+    # check if match_details is valid
+    if match_details and "info" in match_details:
+        players = match_details["info"]["participants"]
+        for player in players:
+            if player.get("puuid") == puuid:
+                player_details = _extract_playerStats(player)
+                break
+
+    return player_details
+
+def extract_playerTimeline(puuid:str, match_events:dict) -> list[dict]:
+    """
+    Extracts player-specific data from an already fetched match timeline payload.
+    The payload is left untouched, so a cached timeline can be shared by several players and threads.
+    
+    return: a list of frames.
+        Each frame contains three keys: "timestamp", "events" and "participantFrames".
+    """
+    return [frame.to_dict() for frame in iter_playerFrames(puuid, match_events)]
+
+def iter_playerFrames(puuid:str, match_events:dict):
+    """
+    Yields the player's relevant frames of a match timeline payload as TimelineFrame records, without modifying it.
+    """
+    # check if match_events is valid
+    if not match_events or "info" not in match_events:
+        return
+
+    # find the participantId for this puuid
+    playerId = None
+    for player in match_events["info"]["participants"]:
+        if player["puuid"] == puuid:
+            playerId = player["participantId"]
+            break
+
+    # a player who is not in the match has no frames, like extract_playerTimeline_indexed
+    if playerId is None:
+        return
+
+    # iterate through each frame in the timeline
+    for frame in match_events["info"]["frames"]:
+        frame_data = _extract_frame(frame, playerId)
+        if frame_data is not None:
+            yield frame_data
+
+class TimelineFrame:
+    """
+    One frame of a player's timeline: the minute, the player's relevant events and the player's in-game stats.
+    The events and stats are new dicts projected from the payload, which is never modified.
+    """
+    __slots__ = ("timestamp", "events", "participantFrames")
+
+    def __init__(self, timestamp:int, events:list[dict], participantFrames:dict):
+        self.timestamp = timestamp
+        self.events = events
+        self.participantFrames = participantFrames
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": self.timestamp,
+            "events": self.events,
+            "participantFrames": self.participantFrames
+        }
+
+# event types kept for every player, and kept only when the player is the killer
+# (the baseline compared against ("A" or "B"), which only ever matched the first type of each pair)
+_SHARED_EVENT_TYPES = ("ELITE_MONSTER_KILL", "FEAT_UPDATE")
+_KILLER_EVENT_TYPES = ("BUILDING_KILL", "TURRET_PLATE_DESTROYED")
+
+# CHAMPION_KILL details removed from the timeline to reduce size
+_DROPPED_KILL_KEYS = ("killStreakLength", "victimDamageDealt", "victimDamageReceived")
+
+# keys left out of the projected events (timestamp is already given per frame)
+_DROPPED_EVENT_KEYS = frozenset({"timestamp"})
+_DROPPED_KILL_EVENT_KEYS = _DROPPED_EVENT_KEYS | frozenset(_DROPPED_KILL_KEYS)
+
+# participantFrames stats removed from the timeline to reduce size
+_DROPPED_FRAME_STATS = frozenset({
+    "damageStats", "goldPerSecond", "minionsKilled", "jungleMinionsKilled", "totalGold", "xp", "timeEnemySpentControlled"
+})
+
+def _project(source:dict, dropped_keys:frozenset) -> dict:
+    """
+    Returns a new dict with the entries of source that are not in dropped_keys.
+    """
+    return {key: value for key, value in source.items() if key not in dropped_keys}
+
+def _extract_frame(frame:dict, playerId:int) -> TimelineFrame | None:
+    """
+    Extracts the player's relevant events and in-game stats from one timeline frame.
+    Only the events that are kept are copied, and the frame itself is not modified.
+
+    return: the frame's data, or None if the frame has no relevant events.
+    """
+    player_events = []
+    for event in frame["events"]:
+        event_type = event["type"]
+
+        # filter events based on criteria:
+        # type = CHAMPION_KILL and involves killerId, assistingParticipantIds or victimId of the player
+        # type = ELITE_MONSTER_KILL (any) with DRAGON_SOUL_GIVEN (any)
+        # type = FEAT_UPDATE (any)
+        # type = BUILDING_KILL and involves killerId of the player
+        # type = TURRET_PLATE_DESTROYED and involves killerId of the player
+        if event_type == "CHAMPION_KILL":
+            if (
+                (event.get("killerId") == playerId) or
+                (event.get("victimId") == playerId) or
+                (playerId in (event.get("assistingParticipantIds") or ()))
+                ):
+                player_events.append(_project(event, _DROPPED_KILL_EVENT_KEYS))
+
+        elif event_type in _SHARED_EVENT_TYPES:
+            player_events.append(_project(event, _DROPPED_EVENT_KEYS))
+
+        elif event_type in _KILLER_EVENT_TYPES:
+            if event.get("killerId") == playerId:
+                player_events.append(_project(event, _DROPPED_EVENT_KEYS))
+
+    # add the player's current in-game stats to this frame (if any relevant events found)
+    if not player_events:
+        return None
+
+    return TimelineFrame(
+        frame["timestamp"] // 60000,    # convert to minutes
+        player_events,
+        _project(frame["participantFrames"][str(playerId)], _DROPPED_FRAME_STATS)
+    )
+
+def extract_playerFrameSeries(puuid:str, match_events:dict) -> FrameSeries | None:
+    """
+    Extracts the player's stats of every frame (gold, level, CS, position, damage) from a match timeline payload.
+    Unlike extract_playerTimeline, every frame is kept and the dropped stats (totalGold, xp, damageStats) are read too.
+
+    return: the FrameSeries of the player, or None if the player is not in the match.
+    """
+    if not match_events or "info" not in match_events:
+        return None
+
+    for player in match_events["info"]["participants"]:
+        if player["puuid"] == puuid:
+            return FrameSeries.from_frames(match_events["info"]["frames"], player["participantId"])
+
+    return None
+
+def build_timelineIndex(match_events:dict) -> dict:
+    """
+    Builds a per-match index of the timeline in one pass over the frames and events, so the timeline of
+    any participant is a direct lookup instead of a rescan. The index is JSON serializable and does not
+    modify the payload, so it can be cached next to the raw match.
+
+    return: a dictionary with
+        "participants": puuid -> participantId,
+        "frames": a list of frames, each with "timestamp", "events" (every relevant event of the frame),
+            "eventsByParticipant" (participantId -> positions in "events") and "participantFrames".
+    """
+    index = {"participants": {}, "frames": []}
+
+    if not match_events or "info" not in match_events:
+        return index
+
+    for player in match_events["info"]["participants"]:
+        index["participants"][player["puuid"]] = player["participantId"]
+    participantIds = [str(participantId) for participantId in index["participants"].values()]
+
+    for frame in match_events["info"]["frames"]:
+        frame_events = []
+        events_by_participant = {participantId: [] for participantId in participantIds}
+
+        for event in frame["events"]:
+            event_type = event["type"]
+
+            # same criteria as _extract_frame, resolved for every participant at once
+            if event_type == "CHAMPION_KILL":
+                involved = {event.get("killerId"), event.get("victimId"), *(event.get("assistingParticipantIds") or ())}
+                dropped_keys = _DROPPED_KILL_EVENT_KEYS
+            elif event_type in _SHARED_EVENT_TYPES:
+                involved = None     # relevant to everyone
+                dropped_keys = _DROPPED_EVENT_KEYS
+            elif event_type in _KILLER_EVENT_TYPES:
+                involved = {event.get("killerId")}
+                dropped_keys = _DROPPED_EVENT_KEYS
+            else:
+                continue
+
+            position = len(frame_events)
+            frame_events.append(_project(event, dropped_keys))
+            for participantId in participantIds:
+                if involved is None or int(participantId) in involved:
+                    events_by_participant[participantId].append(position)
+
+        index["frames"].append({
+            "timestamp": frame["timestamp"] // 60000,  # convert to minutes
+            "events": frame_events,
+            "eventsByParticipant": events_by_participant,
+            "participantFrames": {
+                participantId: _project(stats, _DROPPED_FRAME_STATS)
+                for participantId, stats in frame["participantFrames"].items()
+            }
+        })
+
+    return index
+
+def extract_playerTimeline_indexed(puuid:str, timeline_index:dict) -> list[dict]:
+    """
+    Extracts player-specific data from a timeline index built by build_timelineIndex.
+
+    return: the same list of frames as extract_playerTimeline.
+    """
+    playerId = timeline_index["participants"].get(puuid)
+    if playerId is None:
+        return []
+
+    participantId = str(playerId)
+    player_timeData = []
+    for frame in timeline_index["frames"]:
+        positions = frame["eventsByParticipant"].get(participantId)
+        if positions:
+            player_timeData.append({
+                "timestamp": frame["timestamp"],
+                "events": [frame["events"][position] for position in positions],
+                "participantFrames": frame["participantFrames"][participantId]
+            })
+
+    return player_timeData
+
+def extract_allTimelines_indexed(timeline_index:dict) -> dict[int, list[dict]]:
+    """
+    Extracts the timeline of every participant in one pass over the frames of a timeline index.
+
+    return: participantId -> the same list of frames as extract_playerTimeline_indexed.
+    """
+    all_timeData = {str(playerId): [] for playerId in timeline_index["participants"].values()}
+
+    for frame in timeline_index["frames"]:
+        frame_events = frame["events"]
+        for participantId, positions in frame["eventsByParticipant"].items():
+            if positions and participantId in all_timeData:
+                all_timeData[participantId].append({
+                    "timestamp": frame["timestamp"],
+                    "events": [frame_events[position] for position in positions],
+                    "participantFrames": frame["participantFrames"][participantId]
+                })
+
+    return {int(participantId): timeData for participantId, timeData in all_timeData.items()}
+
+def extract_matchSummary(match_details:dict, timeline_index:dict | None) -> list[dict]:
+    """
+    Builds the summary of every participant of a match from one pass over info.participants
+    and one pass over the indexed frames.
+
+    return: a list in the order of info.participants. Each entry has "puuid", "participantId",
+        "player_stats" (as extract_playerDetails) and "player_timeline" (as extract_playerTimeline_indexed,
+        or None when no timeline index is given).
+    """
+    if not match_details or "info" not in match_details:
+        return []
+
+    all_timelines = extract_allTimelines_indexed(timeline_index) if timeline_index is not None else None
+    match_summary = []
+    for player in match_details["info"]["participants"]:
+        puuid = player.get("puuid")
+        playerId = player.get("participantId")
+        if timeline_index is not None:
+            playerId = timeline_index["participants"].get(puuid, playerId)
+
+        match_summary.append({
+            "puuid": puuid,
+            "participantId": playerId,
+            "player_stats": _extract_playerStats(player),
+            "player_timeline": all_timelines.get(playerId, []) if all_timelines is not None else None
+        })
+
+    return match_summary
+
+class _ReplayStream:
+    """
+    Binary stream wrapper that records what a first parser reads, so a second parser can start over
+    from the beginning while the rest is still read from the original stream.
+    """
+    def __init__(self, stream:BinaryIO):
+        self._stream = stream
+        self._recorded = io.BytesIO()
+        self._replaying = False
+
+    def read(self, size:int = -1) -> bytes:
+        if self._replaying:
+            if size is None or size < 0:
+                # the whole rest, not only the recorded part (ex: json.load)
+                return self._recorded.read() + self._stream.read()
+            data = self._recorded.read(size)
+            if data:
+                return data
+            return self._stream.read(size)
+
+        data = self._stream.read(size)
+        self._recorded.write(data)
+        return data
+
+    def replay(self):
+        self._recorded.seek(0)
+        self._replaying = True
+
+def _find_participantId(stream:_ReplayStream, puuid:str) -> int | None:
+    """
+    Reads the beginning of the timeline for metadata.participants, which Riot lists in participantId order.
+    Stops at the first "info" key, so only the first read chunk of the stream is consumed.
+    """
+    builder = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if prefix == "info" or prefix.startswith("info."):
+            return None
+
+        if prefix == "metadata.participants" and event == "start_array":
+            builder = ijson.ObjectBuilder()
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == "metadata.participants" and event == "end_array":
+                return builder.value.index(puuid) + 1 if puuid in builder.value else None
+
+    return None
+
+def extract_playerTimeline_stream(puuid:str, stream:BinaryIO) -> list[dict]:
+    """
+    Streaming version of extract_playerTimeline that reads the timeline JSON from a binary stream.
+    ijson builds one whole frame at a time (the stats of all ten participants and every event) and the frame
+    is dropped once the player's data is extracted, so only one frame of the payload is in memory rather than
+    the whole timeline. Filtering the player's data out of the parse events instead would build less, but
+    going over the tokens in Python costs more than json.loads of the whole payload.
+
+    return: the same list of frames as extract_playerTimeline.
+    """
+    stream = _ReplayStream(stream)
+    playerId = _find_participantId(stream, puuid)
+    stream.replay()
+
+    if playerId is None:
+        # no metadata before the frames, fall back to the whole payload to read info.participants
+        return extract_playerTimeline(puuid, json.load(stream))
+
+    player_timeData = {"frameData": []}
+    for frame in ijson.items(stream, "info.frames.item", use_float=True):
+        frame_data = _extract_frame(frame, playerId)
+        if frame_data is not None:
+            player_timeData["frameData"].append(frame_data.to_dict())
+
+    return player_timeData["frameData"]
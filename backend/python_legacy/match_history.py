@@ -0,0 +1,145 @@
+"""
+Paginated crawl of a player's match history
+iter_matchIds_async walks the match-by-puuid endpoint page by page, so hundreds of match IDs are read lazily
+instead of being requested in one call. crawl_matchHistory_async fetches the details of the listed matches while
+the next pages are read, with a bounded number of requests in flight, and skips matches already in the cache.
+Crawled matches of the live source are added to the local warehouse without their timelines, so their stats can be
+queried right away.
+"""
+
+import asyncio
+import logging
+
+from backend.python_legacy import data_source, match_warehouse, riot_client
+from backend.python_legacy.config import MATCH_HISTORY_CONCURRENCY
+from backend.python_legacy.match_extraction import extract_matchSummary
+
+logger = logging.getLogger(__name__)
+
+# the most match IDs match-v5 returns in one page
+MATCH_IDS_PAGE_SIZE = 100
+
+async def iter_matchIds_async(puuid:str, start:int = 0, queue:int | None = None, startTime:int | None = None,
+                              endTime:int | None = None, limit:int | None = None, page_size:int = MATCH_IDS_PAGE_SIZE):
+    """
+    Yields a player's match IDs, newest first, requesting the next page only once the previous one is consumed.
+
+    Args:
+        puuid (str): The PUUID of the player.
+        start (int): The index of the first match ID.
+        queue (int | None): Only matches of this queue ID.
+        startTime (int | None): Only matches played after this epoch timestamp in seconds.
+        endTime (int | None): Only matches played before this epoch timestamp in seconds.
+        limit (int | None): The maximum number of match IDs, None for the whole history.
+        page_size (int): The number of match IDs requested per page.
+    """
+    yielded = 0
+    while limit is None or yielded < limit:
+        count = page_size if limit is None else min(page_size, limit - yielded)
+        page = await data_source.source.get_matchIds_async(puuid, start, count, queue, startTime, endTime)
+
+        for match_id in page:
+            yield match_id
+        yielded += len(page)
+
+        # a short page is the last one
+        if len(page) < count:
+            return
+        start += len(page)
+
+async def cached_matchIds(match_ids:list[str]) -> set[str]:
+    """
+    Returns the match IDs whose details are already in the in-memory memo or the on-disk cache.
+    """
+    memo_cache = riot_client.memo_cache
+    cached = {match_id for match_id in match_ids if memo_cache is not None and memo_cache.get(f"match-details:{match_id}") is not None}
+
+    match_cache = riot_client.match_cache
+    if match_cache is not None:
+        keys = [f"match-details:{match_id}" for match_id in match_ids if match_id not in cached]
+        found = await asyncio.to_thread(match_cache.cached_keys, keys)
+        cached.update(key.removeprefix("match-details:") for key in found)
+
+    return cached
+
+def _ingest_matchDetails(warehouse:match_warehouse.MatchWarehouse, match_details:dict):
+    """
+    Adds a crawled match to the warehouse without its timelines. The extraction and the SQLite write are CPU and
+    disk work, so the crawl runs them together in one worker thread.
+    """
+    warehouse.ingest_match(match_details, extract_matchSummary(match_details, None))
+
+async def crawl_matchHistory_async(puuid:str, start:int = 0, queue:int | None = None, startTime:int | None = None,
+                                   endTime:int | None = None, limit:int | None = None,
+                                   concurrency:int = MATCH_HISTORY_CONCURRENCY) -> dict:
+    """
+    Crawls a player's match history into the cache: match IDs are paged lazily and the details of the matches that are
+    not cached yet are fetched while the next pages are read. Paging waits while `concurrency` fetches are in flight.
+
+    Args:
+        puuid (str), start (int), queue (int | None), startTime (int | None), endTime (int | None), limit (int | None):
+            The filters of iter_matchIds_async.
+        concurrency (int): The maximum number of match details fetched at the same time.
+
+    Returns:
+        dict: "match_ids" (every listed match ID, newest first), "fetched" (the number of matches requested from Riot),
+            "skipped" (the number already stored or cached) and "failed_matches" (the IDs that could not be fetched).
+            Every listed match is counted in exactly one of them.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    tasks = set()
+    match_ids = []
+    failed = set()
+    counts = {"fetched": 0, "skipped": 0}
+
+    async def fetch(match_id:str, cached:bool):
+        try:
+            match_details = await data_source.source.get_matchDetails_async(match_id)
+            warehouse = data_source.writable_warehouse()
+            if warehouse is not None:
+                await asyncio.to_thread(_ingest_matchDetails, warehouse, match_details)
+            # a cached match only read back for the warehouse was not requested from Riot
+            counts["skipped" if cached else "fetched"] += 1
+        except Exception as error:
+            logger.warning(f"Failed to crawl match {match_id}: {error}")
+            failed.add(match_id)
+        finally:
+            semaphore.release()
+
+    async def schedule(page:list[str]):
+        # one lookup per page, then a fetch for every match that is not stored once a slot is free
+        warehouse = match_warehouse.warehouse
+        stored = await asyncio.to_thread(warehouse.known_matchIds, page) if warehouse is not None else set()
+        cached = await cached_matchIds([match_id for match_id in page if match_id not in stored])
+        ingesting = data_source.writable_warehouse() is not None
+        for match_id in page:
+            # cached matches missing from the warehouse are read back from the cache to be added to it
+            if match_id in stored or (match_id in cached and not ingesting):
+                counts["skipped"] += 1
+                continue
+            await semaphore.acquire()
+            task = asyncio.create_task(fetch(match_id, match_id in cached))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    page = []
+    try:
+        async for match_id in iter_matchIds_async(puuid, start, queue, startTime, endTime, limit):
+            match_ids.append(match_id)
+            page.append(match_id)
+            if len(page) == MATCH_IDS_PAGE_SIZE:
+                await schedule(page)
+                page = []
+        await schedule(page)
+
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return {
+        "match_ids": match_ids,
+        "fetched": counts["fetched"],
+        "skipped": counts["skipped"],
+        "failed_matches": [match_id for match_id in match_ids if match_id in failed]
+    }
@@ -0,0 +1,14 @@
+"""
+Local warehouse of normalized match rows.
+Every participant of an ingested match is stored as one SQLite row with its champion, role, patch, queue and core
+stats in indexed columns, next to the extracted player stats and the zlib-compressed player timeline. Questions like
+"all my Jinx games this patch" are then answered by an indexed query instead of fetching and scanning match payloads.
+"""
+
+from backend.python_legacy.config import MATCH_WAREHOUSE_ENABLED, MATCH_WAREHOUSE_PATH
+# the rows are built and stored without the shared warehouse, they are re-exported here for the existing callers
+from backend.python_legacy.warehouse_rows import ROW_COLUMNS, build_rows, parse_patch
+from backend.python_legacy.warehouse_store import MatchWarehouse
+
+# shared warehouse, None when disabled
+warehouse = MatchWarehouse(MATCH_WAREHOUSE_PATH) if MATCH_WAREHOUSE_ENABLED else None
@@ -0,0 +1,246 @@
+"""
+In-process memo layer for Riot API lookups.
+Keeps recently used responses in an LRU bounded by entries and, optionally, by their estimated size, and makes
+concurrent lookups of the same key share a single upstream call ("single-flight"), so a burst of identical requests
+costs one fetch. Threads and asyncio tasks share the same LRU and counters.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+_MISSING = object()
+
+def estimate_size(value: Any, samples: int = 8) -> int:
+    """
+    Estimates the JSON size in bytes of a parsed payload without serializing it.
+    Lists and dicts of more than `samples` items are weighed from evenly spaced samples, so a 32 minute timeline
+    (about 0.9 MB of JSON) is weighed in about a millisecond, within about 20%. Numbers and literals count 6 bytes.
+    """
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, dict):
+        count = len(value)
+        keys = list(value)
+        if count > samples:
+            keys = [keys[index * count // samples] for index in range(samples)]
+        return 2 + sum(len(str(key)) + 4 + estimate_size(value[key], samples) for key in keys) * count // max(len(keys), 1)
+    if isinstance(value, (list, tuple)):
+        count = len(value)
+        items = value if count <= samples else [value[index * count // samples] for index in range(samples)]
+        return 2 + sum(1 + estimate_size(item, samples) for item in items) * count // max(len(items), 1)
+    return 6
+
+class _Flight:
+    """
+    An upstream call in progress that other callers of the same key wait on.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class MemoCache:
+    """
+    Thread-safe LRU memo with request coalescing.
+    Values are shared between callers, so they must be treated as read-only.
+
+    Args:
+        max_entries (int): The maximum number of values kept in memory.
+        max_bytes (int): The maximum estimated JSON size of the kept values (see estimate_size), 0 for no size bound.
+            A parsed payload takes a few times its JSON size in memory.
+    """
+    def __init__(self, max_entries: int, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()   # key -> (expires_at, value, size)
+        self._inflight = {}             # key -> _Flight
+        self._async_inflight = {}       # key -> asyncio.Task running the loader
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str) -> Any:
+        """
+        Returns the fresh value for the key or _MISSING. Must be called with the lock held.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+
+        expires_at, value, size = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.bytes_used -= size
+            return _MISSING
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _weigh(self, value: Any) -> int:
+        """
+        Returns the estimated size of a value when the memo is bounded by size, else 0.
+        Called before the lock is taken, weighing a timeline takes about a millisecond.
+        """
+        return estimate_size(value) if self.max_bytes > 0 else 0
+
+    def _store(self, key: str, value: Any, ttl: float | None, size: int = 0):
+        """
+        Stores the value and evicts least recently used keys. Must be called with the lock held.
+        """
+        if self.max_entries <= 0 or (self.max_bytes > 0 and size > self.max_bytes):
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes_used -= previous[2]
+
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires_at, value, size)
+        self.bytes_used += size
+        while len(self._entries) > self.max_entries or (self.max_bytes > 0 and self.bytes_used > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.bytes_used -= evicted_size
+
+    def get(self, key: str) -> Any:
+        """
+        Returns the fresh value for the key, or None when it is not memoized. Never calls a loader.
+        """
+        with self._lock:
+            value = self._lookup(key)
+        return None if value is _MISSING else value
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        """
+        Memoizes a value without a loader, replacing the current one.
+        """
+        size = self._weigh(value)
+        with self._lock:
+            self._store(key, value, ttl, size)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: float | None = None) -> Any:
+        """
+        Returns the memoized value for the key, calling the loader at most once for concurrent misses.
+
+        Args:
+            key (str): The memo key.
+            loader (Callable): Fetches the value on a miss. Its errors are raised to every waiting caller.
+            ttl (float | None): Seconds the value stays fresh, None to keep it until evicted.
+
+        Returns:
+            Any: The memoized or freshly loaded value.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+
+            flight = self._inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        # another caller is already fetching this key, wait for its result
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            size = self._weigh(flight.value)
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._store(key, flight.value, ttl, size)
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+        return flight.value
+
+    async def get_or_load_async(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float | None = None) -> Any:
+        """
+        Asyncio version of get_or_load: concurrent tasks of the same key await a single loader call.
+        The loader runs in its own task, so cancelling the caller that started it does not fail the other callers.
+
+        Args:
+            key (str): The memo key.
+            loader (Callable): Coroutine function that fetches the value on a miss.
+            ttl (float | None): Seconds the value stays fresh, None to keep it until evicted.
+
+        Returns:
+            Any: The memoized or freshly loaded value.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+
+            flight = self._async_inflight.get(key)
+            if flight is None:
+                flight = asyncio.get_running_loop().create_task(self._load_async(key, loader, ttl))
+                # the error is raised to the waiting callers, this only keeps asyncio from logging it when none is left
+                flight.add_done_callback(lambda task: task.cancelled() or task.exception())
+                self._async_inflight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        # a cancelled caller stops waiting, the load goes on for the others and still fills the memo
+        return await asyncio.shield(flight)
+
+    async def _load_async(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float | None) -> Any:
+        """
+        Runs the loader of an async flight and memoizes its value.
+        """
+        try:
+            value = await loader()
+            size = self._weigh(value)
+            with self._lock:
+                self._store(key, value, ttl, size)
+            return value
+        finally:
+            with self._lock:
+                self._async_inflight.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every memoized value and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+            self.hits = 0
+            self.misses = 0
+            self.coalesced = 0
+
+    def metrics(self) -> dict:
+        """
+        Returns the hit, miss and coalesced wait counters of this process.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes
+            }
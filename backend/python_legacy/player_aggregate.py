@@ -0,0 +1,319 @@
+"""
+Multi-match aggregate stats of a player
+This module turns the get_playerDetails stats of a player's last N matches into NumPy columns and computes
+win rates per champion and role, the KDA distribution, per-minute averages and percentiles with vectorized operations.
+Match details are read through the Riot client caches, so repeated aggregates of the same player stay fast.
+"""
+
+import asyncio
+import copy
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.python_legacy import data_source, riot_client
+from backend.python_legacy.config import PLAYER_AGGREGATE_CONCURRENCY, PLAYER_AGGREGATE_STATE_ENTRIES
+from backend.python_legacy.memo_cache import MemoCache
+from backend.python_legacy.player_summary import extract_playerDetails
+from backend.python_legacy.quantile_sketch import QuantileSketch
+from backend.python_legacy.riot_client import RiotAPIError
+
+logger = logging.getLogger(__name__)
+
+# challenge values averaged across matches
+PER_MINUTE_STATS = ("damagePerMinute", "goldPerMinute", "visionScorePerMinute")
+# percentiles reported for every distribution
+PERCENTILES = (10, 25, 50, 75, 90)
+
+def build_statColumns(player_details:list[dict]) -> dict[str, np.ndarray]:
+    """
+    Builds one column per stat from a list of extract_playerDetails results, skipping empty ones.
+    Missing numeric values become NaN so they are ignored by the nan-aware reductions.
+    """
+    player_details = [details for details in player_details if details]
+
+    def numeric(read) -> np.ndarray:
+        return np.fromiter(
+            (np.nan if (value := read(details)) is None else value for details in player_details),
+            dtype=np.float64, count=len(player_details)
+        )
+
+    columns = {
+        "champion": np.array([details.get("champion") or "UNKNOWN" for details in player_details], dtype=object),
+        "role": np.array([details.get("role") or "UNKNOWN" for details in player_details], dtype=object),
+        "win": np.fromiter((bool(details.get("win")) for details in player_details), dtype=bool, count=len(player_details)),
+        "kills": numeric(lambda details: details.get("kills")),
+        "deaths": numeric(lambda details: details.get("deaths")),
+        "assists": numeric(lambda details: details.get("assists")),
+        "cs": numeric(lambda details: details.get("cs")),
+    }
+    for stat in PER_MINUTE_STATS:
+        columns[stat] = numeric(lambda details: (details.get("challenge") or {}).get(stat))
+
+    # same definition as Riot's challenges.kda, with deathless games divided by one
+    columns["kda"] = (columns["kills"] + columns["assists"]) / np.maximum(columns["deaths"], 1)
+
+    return columns
+
+def _distribution(values:np.ndarray) -> dict:
+    """
+    Returns the mean and percentiles of a column, ignoring NaN values.
+    """
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"mean": None, **{f"p{percentile}": None for percentile in PERCENTILES}}
+
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        "mean": float(values.mean()),
+        **{f"p{percentile}": float(value) for percentile, value in zip(PERCENTILES, percentiles)}
+    }
+
+def _group_by(keys:np.ndarray, columns:dict[str, np.ndarray]) -> dict[str, dict]:
+    """
+    Returns matches, wins, win rate and mean KDA for every distinct key, using one bincount per stat.
+    """
+    if not len(keys):
+        return {}
+
+    groups, inverse = np.unique(keys.astype(str), return_inverse=True)
+    matches = np.bincount(inverse, minlength=len(groups))
+    wins = np.bincount(inverse, weights=columns["win"], minlength=len(groups))
+    kda_sum = np.bincount(inverse, weights=columns["kda"], minlength=len(groups))
+
+    return {
+        str(group): {
+            "matches": int(matches[position]),
+            "wins": int(wins[position]),
+            "win_rate": float(wins[position] / matches[position]),
+            "kda": float(kda_sum[position] / matches[position])
+        }
+        for position, group in enumerate(groups)
+    }
+
+def aggregate_playerStats(player_details:list[dict]) -> dict:
+    """
+    Computes the aggregates of a player over several matches from their extract_playerDetails results.
+
+    return: a dictionary with "matches", "wins", "win_rate", "kda" (distribution), "per_minute"
+        (distribution of each PER_MINUTE_STATS entry), "by_champion" and "by_role".
+    """
+    columns = build_statColumns(player_details)
+    matches = len(columns["win"])
+    wins = int(columns["win"].sum())
+
+    return {
+        "matches": matches,
+        "wins": wins,
+        "win_rate": wins / matches if matches else None,
+        "kda": _distribution(columns["kda"]),
+        "per_minute": {stat: _distribution(columns[stat]) for stat in PER_MINUTE_STATS},
+        "by_champion": _group_by(columns["champion"], columns),
+        "by_role": _group_by(columns["role"], columns)
+    }
+
+def get_playerAggregate(puuid:str, count:int = 20) -> dict:
+    """
+    Aggregates the stats of a player over their last `count` matches.
+    Only the match details are fetched, `PLAYER_AGGREGATE_CONCURRENCY` at a time.
+    """
+    match_ids = data_source.source.get_recentMatches(puuid, count)
+    with ThreadPoolExecutor(max_workers=PLAYER_AGGREGATE_CONCURRENCY) as executor:
+        all_details = list(executor.map(data_source.source.get_matchDetails, match_ids))
+
+    return aggregate_playerStats([extract_playerDetails(puuid, match_details) for match_details in all_details])
+
+async def _fetch_matchDetails_async(match_ids:list[str], concurrency:int) -> list[dict | None]:
+    """
+    Fetches the details of several matches with at most `concurrency` requests in flight, None for a failed one.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def fetch(match_id:str) -> dict | None:
+        async with semaphore:
+            try:
+                return await data_source.source.get_matchDetails_async(match_id)
+            except RiotAPIError:
+                return None
+
+    return await asyncio.gather(*(fetch(match_id) for match_id in match_ids))
+
+async def get_playerAggregate_async(puuid:str, count:int = 20, concurrency:int = PLAYER_AGGREGATE_CONCURRENCY) -> dict:
+    """
+    Async version of get_playerAggregate with at most `concurrency` match details requests in flight.
+    A match that cannot be fetched is left out of the aggregates and listed under "failed_matches".
+    """
+    match_ids = await data_source.source.get_recentMatches_async(puuid, count)
+    all_details = await _fetch_matchDetails_async(match_ids, concurrency)
+    aggregate = aggregate_playerStats([extract_playerDetails(puuid, match_details) for match_details in all_details if match_details])
+    aggregate["failed_matches"] = [match_id for match_id, match_details in zip(match_ids, all_details) if match_details is None]
+
+    return aggregate
+
+# running aggregates of the least recently visited players are dropped first, used when the on-disk cache is turned off
+# or the data source is not live
+_aggregate_states = MemoCache(PLAYER_AGGREGATE_STATE_ENTRIES)
+
+def new_aggregateState() -> dict:
+    """
+    Returns empty running aggregates: counts, sums and quantile sketches that can be updated with new matches only.
+    """
+    return {
+        "cursor": None,     # newest match ID already counted
+        "count": 0,         # number of recent matches listed when the aggregates were (re)built
+        "matches": 0,
+        "wins": 0,
+        "sums": {stat: 0.0 for stat in ("kda", *PER_MINUTE_STATS)},
+        "counts": {stat: 0 for stat in ("kda", *PER_MINUTE_STATS)},
+        "sketches": {stat: QuantileSketch().to_dict() for stat in ("kda", *PER_MINUTE_STATS)},
+        "by_champion": {},
+        "by_role": {}
+    }
+
+def update_aggregateState(state:dict, player_details:list[dict]) -> dict:
+    """
+    Adds the extract_playerDetails results of new matches to running aggregates, in place.
+    """
+    columns = build_statColumns(player_details)
+    state["matches"] += len(columns["win"])
+    state["wins"] += int(columns["win"].sum())
+
+    for stat in state["sums"]:
+        values = columns[stat][~np.isnan(columns[stat])]
+        state["sums"][stat] += float(values.sum())
+        state["counts"][stat] += len(values)
+        state["sketches"][stat] = QuantileSketch.from_dict(state["sketches"][stat]).add(values).to_dict()
+
+    for group_key, grouped in (("champion", state["by_champion"]), ("role", state["by_role"])):
+        for group, totals in _group_by(columns[group_key], columns).items():
+            running = grouped.setdefault(group, {"matches": 0, "wins": 0, "kda_sum": 0.0})
+            running["matches"] += totals["matches"]
+            running["wins"] += totals["wins"]
+            running["kda_sum"] += totals["kda"] * totals["matches"]
+
+    return state
+
+def summarize_aggregateState(state:dict) -> dict:
+    """
+    Returns running aggregates in the shape of aggregate_playerStats. Percentiles come from the sketches,
+    so they are within the sketches' relative accuracy (1%) of the exact ones.
+    """
+    def distribution(stat:str) -> dict:
+        sketch = QuantileSketch.from_dict(state["sketches"][stat])
+        count = state["counts"][stat]
+        return {
+            "mean": state["sums"][stat] / count if count else None,
+            **{f"p{percentile}": sketch.quantile(percentile / 100) for percentile in PERCENTILES}
+        }
+
+    def groups(grouped:dict) -> dict:
+        return {
+            group: {
+                "matches": totals["matches"],
+                "wins": totals["wins"],
+                "win_rate": totals["wins"] / totals["matches"],
+                "kda": totals["kda_sum"] / totals["matches"]
+            }
+            for group, totals in sorted(grouped.items())
+        }
+
+    return {
+        "matches": state["matches"],
+        "wins": state["wins"],
+        "win_rate": state["wins"] / state["matches"] if state["matches"] else None,
+        "kda": distribution("kda"),
+        "per_minute": {stat: distribution(stat) for stat in PER_MINUTE_STATS},
+        "by_champion": groups(state["by_champion"]),
+        "by_role": groups(state["by_role"])
+    }
+
+def unseen_matchIds(match_ids:list[str], cursor:str | None) -> list[str] | None:
+    """
+    Returns the match IDs newer than the cursor. Riot lists match IDs newest first, so these are the ones before it.
+    Returns None when the cursor is not in the list: more matches were played since then than were listed,
+    and the ones between the list and the cursor would be missed.
+    """
+    if cursor is None:
+        return list(match_ids)
+    if cursor not in match_ids:
+        return None
+    return match_ids[:match_ids.index(cursor)]
+
+def _in_memory_states() -> bool:
+    # only aggregates of live matches are persisted in the on-disk cache
+    return riot_client.match_cache is None or not data_source.source.live
+
+def load_aggregateState(puuid:str) -> dict:
+    """
+    Returns the persisted running aggregates of a player, or empty ones on a first visit or once they were evicted.
+    """
+    key = f"player-aggregate-state:{puuid}"
+    if _in_memory_states():
+        # memoized values are shared, the running aggregates are updated in place
+        state = copy.deepcopy(_aggregate_states.get(key))
+    else:
+        state = riot_client.match_cache.get(key)
+
+    return state if state is not None else new_aggregateState()
+
+def store_aggregateState(puuid:str, state:dict):
+    """
+    Persists the running aggregates of a player next to the cached match payloads.
+    Both stores evict the least recently used states, so a player can start over from their recent matches.
+    """
+    key = f"player-aggregate-state:{puuid}"
+    if _in_memory_states():
+        _aggregate_states.set(key, state)
+    else:
+        riot_client.match_cache.set(key, state)
+
+async def get_playerAggregate_incremental_async(puuid:str, count:int = 20, concurrency:int = PLAYER_AGGREGATE_CONCURRENCY) -> dict:
+    """
+    Updates the persisted running aggregates of a player with the matches played since the last visit.
+    A repeat visit costs one match ID list call plus the details of the new matches.
+    Matches are applied oldest first and the cursor stops before the first one that fails, so it is retried next time.
+    The aggregates are rebuilt from the last `count` matches when there are none yet (first visit or evicted state),
+    when more matches were played since the last visit than are listed, and when `count` is larger than the one
+    they were built with, so the older matches are backfilled.
+
+    return: the aggregates over every match counted so far (same shape as aggregate_playerStats)
+        with "new_matches" (matches added by this call), "failed_matches" and "rebuilt" (the running
+        aggregates were started over from the listed matches).
+    """
+    state = await asyncio.to_thread(load_aggregateState, puuid)
+    # a smaller count still lists as many matches as the aggregates were built with, so the cursor is found
+    list_count = max(count, state.get("count", 0))
+    match_ids = await data_source.source.get_recentMatches_async(puuid, list_count)
+    new_ids = unseen_matchIds(match_ids, state["cursor"])
+
+    rebuilt = state["cursor"] is None or new_ids is None or count > state.get("count", 0)
+    if rebuilt:
+        if state["cursor"] is not None:
+            logger.info(f"Rebuilding the aggregates of {puuid} from their last {list_count} matches")
+        state = new_aggregateState()
+        new_ids = list(match_ids)
+    state["count"] = list_count
+
+    all_details = await _fetch_matchDetails_async(new_ids, concurrency)
+
+    # apply oldest first, up to the first failure
+    applied_ids, applied_details = [], []
+    for match_id, match_details in reversed(list(zip(new_ids, all_details))):
+        if match_details is None:
+            break
+        applied_ids.append(match_id)
+        applied_details.append(extract_playerDetails(puuid, match_details))
+
+    if applied_ids:
+        update_aggregateState(state, applied_details)
+        state["cursor"] = applied_ids[-1]
+        await asyncio.to_thread(store_aggregateState, puuid, state)
+        logger.info(f"Added {len(applied_ids)} new matches to the aggregates of {puuid}")
+
+    aggregate = summarize_aggregateState(state)
+    aggregate["new_matches"] = len(applied_ids)
+    aggregate["failed_matches"] = [match_id for match_id, match_details in zip(new_ids, all_details) if match_details is None]
+    aggregate["rebuilt"] = rebuilt
+
+    return aggregate
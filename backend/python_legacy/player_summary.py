@@ -1,166 +1,264 @@
-from ..riot_api.riot_client import get_matchDetails, get_matchTimeline
+import asyncio
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
 
-def get_playerDetails(puuid:str, match_id:str) -> dict:
+from backend.python_legacy import data_source, match_warehouse, riot_client
+from backend.python_legacy.frame_series import FrameSeries
+from backend.python_legacy.config import MATCH_BUNDLE_WORKERS, PLAYER_SUMMARIES_CONCURRENCY, TIMELINE_STREAM
+from backend.python_legacy.riot_client import RiotAPIError
+# the extraction itself never fetches, it is re-exported here for the callers of the get_* functions
+from backend.python_legacy.match_extraction import (
+    extract_playerDetails, extract_playerTimeline, iter_playerFrames, TimelineFrame, extract_playerFrameSeries,
+    build_timelineIndex, extract_playerTimeline_indexed, extract_allTimelines_indexed, extract_matchSummary,
+    extract_playerTimeline_stream
+)
+
+# shared pool so the details and timeline requests of a match are sent at the same time
+_bundle_executor = ThreadPoolExecutor(max_workers=MATCH_BUNDLE_WORKERS, thread_name_prefix="match-bundle")
+
+def _submit(function, *args) -> Future:
+    # run in a copy of the caller's context like asyncio.to_thread, so the requests keep its rate_limiter.budget_share
+    return _bundle_executor.submit(contextvars.copy_context().run, function, *args)
+
+def get_matchBundle(match_id:str) -> dict:
     """
-    Extracts player-specific stats details from match details.
+    Fetches the match details and the timeline index of a match concurrently.
+
+    return: a dictionary with the raw details under "match_details" and the index under "timeline_index".
     """
-    match_details = get_matchDetails(match_id)
-
-    # keys to keep in the challenges dictionary
-    chllanges_keep_keys = {
-        # Core performance
-        "kda",
-        "damagePerMinute",
-        "teamDamagePercentage",
-        "killParticipation",
-        "goldPerMinute",
-        "visionScorePerMinute",
-
-        # Objective & Macro
-        "baronTakedowns",
-        "dragonTakedowns",
-        "riftHeraldTakedowns",
-        "turretTakedowns",
-        "voidMonsterKill",
-
-        # Fighting / Skirmishing
-        "soloKills",
-        "killsNearEnemyTurret",
-        "killsUnderOwnTurret",
-        "outnumberedKills",
-        "immobilizeAndKillWithAlly",
-        "enemyChampionImmobilizations",
-
-        # Laning Phase
-        "laneMinionsFirst10Minutes",
-        "maxCsAdvantageOnLaneOpponent",
-        "maxLevelLeadLaneOpponent",
-
-        # Survivability
-        "damageTakenOnTeamPercentage",
-        "survivedSingleDigitHpCount",
-        "survivedThreeImmobilizesInFight",
-
-        # Vision & Utility
-        "controlWardsPlaced",
-        "stealthWardsPlaced",
-        "wardTakedowns",
-        "visionScoreAdvantageLaneOpponent",
+    details_future = _submit(data_source.source.get_matchDetails, match_id)
+    index_future = _submit(get_timelineIndex, match_id)
+
+    return {
+        "match_details": details_future.result(),
+        "timeline_index": index_future.result()
     }
 
-    # check if match_details is valid
-    if match_details and "info" in match_details:
-        players = match_details["info"]["participants"]
-        for player in players:
-            if player.get("puuid") == puuid:
-
-                # filter out unnecessary information to reduce size
-                filtered_challenges = {key: value for key, value in player["challenges"].items() if key in chllanges_keep_keys}
-
-                # extract relevant stats
-                player_details = {
-                    "champion": player.get("championName"),
-                    "role": player.get("teamPosition"),
-                    "champLevel": player.get("champLevel"),
-                    "kills": player.get("kills"),
-                    "deaths": player.get("deaths"),
-                    "assists": player.get("assists"),
-                    "totalGold": player.get("goldEarned"),
-                    "totalDamage": player.get("totalDamageDealtToChampions"),
-                    "visionScore": player.get("visionScore"),
-                    "wardsPlaced": player.get("wardsPlaced"),
-                    "detectorWardsPlaced": player.get("detectorWardsPlaced"),
-                    "cs": player.get("totalMinionsKilled") + player.get("neutralMinionsKilled"),
-                    "runes": player.get("perks"),
-                    "challenge": filtered_challenges,
-                    "win": player.get("win")
-                }
-                break
-
-    return player_details
+async def get_matchBundle_async(match_id:str) -> dict:
+    """
+    Async version of get_matchBundle: both lookups are awaited together on the event loop.
+    """
+    match_details, timeline_index = await asyncio.gather(
+        data_source.source.get_matchDetails_async(match_id),
+        get_timelineIndex_async(match_id)
+    )
+
+    return {
+        "match_details": match_details,
+        "timeline_index": timeline_index
+    }
+
+def _ingest_matchBundle(warehouse:match_warehouse.MatchWarehouse, match_bundle:dict) -> list[dict]:
+    """
+    Extracts the summary of a fetched match and adds the match to the warehouse. Both are CPU and SQLite work,
+    so the async callers run them together in one worker thread.
+
+    return: the match summary, as built by extract_matchSummary.
+    """
+    match_summary = extract_matchSummary(match_bundle["match_details"], match_bundle["timeline_index"])
+    warehouse.ingest_match(match_bundle["match_details"], match_summary)
+
+    return match_summary
+
+def get_playerDetails(puuid:str, match_id:str) -> dict:
+    """
+    Extracts player-specific stats details from match details.
+    """
+    return extract_playerDetails(puuid, data_source.source.get_matchDetails(match_id))
 
 def get_playerTimeline(puuid:str, match_id:str) -> list[dict]:
     """
     Extracts player-specific data from match timeline.
-    
-    return: a dictionary that has one key "frames" which contains a list of frames. 
-        Each frame contains two keys: "events" and "inGameStats".
-    """
-    match_events = get_matchTimeline(match_id)
-    player_timeData = {"frameData": []}
-
-    # check if match_events is valid
-    if match_events and "info" in match_events:
-
-        # find the participantId for this puuid
-        for player in match_events["info"]["participants"]:
-
-            if player["puuid"] == puuid:
-                playerId = player["participantId"]
-                break
-        
-        # iterate through each frame in the timeline
-        for frame in match_events["info"]["frames"]:
-
-            # in-game stats for this player at this frame
-            frame_timestamp = frame["timestamp"] // 60000  # convert to minutes
-
-            # iterate through events after refreshing the frame's events holder
-            player_events = []
-            for event in frame["events"]:
-                event.pop("timestamp", None)  # remove timestamp to reduce size
-
-                # filter events based on criteria:
-                # type = CHAMPION_KILL and involves killerId, assistingParticipantIds or victimId of the player
-                # type = ELITE_MONSTER_KILL (any) with DRAGON_SOUL_GIVEN (any)
-                # type = FEAT_UPDATE (any)
-                # type = BUILDING_KILL and involves killerId of the player
-                # type = TURRET_PLATE_DESTROYED and involves killerId of the player
-                if event["type"] == "CHAMPION_KILL":
-                    if (
-                        (event.get("killerId") == playerId) or
-                        (event.get("assistingParticipantIds") and playerId in event.get("assistingParticipantIds")) or
-                        (event.get("victimId") == playerId)
-                        ):
-                        event.pop("killStreakLength", None)  # remove killStreakLength to reduce size
-                        event.pop("victimDamageDealt", None)  # remove victimDamageDealt to reduce size
-                        event.pop("victimDamageReceived", None)  # remove victimDamageReceived to reduce size
-                        player_events.append(event)
-
-                elif event["type"] == ("ELITE_MONSTER_KILL" or "FEAT_UPDATE"):
-                    player_events.append(event)
-
-                elif event["type"] == ("BUILDING_KILL" or "TURRET_PLATE_DESTROYED"):
-                    if event.get("killerId") == playerId:
-                        player_events.append(event)
-            
-            # add the player's current in-game stats to this event (if any relevant events found)
-            if player_events is not None and len(player_events) > 0:
-                player_data = frame["participantFrames"][str(playerId)]
-                # remove unnecessary information to reduce size  
-                player_data.pop("damageStats", None)   
-                player_data.pop("goldPerSecond", None)
-                player_data.pop("minionsKilled", None)
-                player_data.pop("jungleMinionsKilled", None)
-                player_data.pop("totalGold", None)
-                player_data.pop("xp", None)
-                player_data.pop("timeEnemySpentControlled", None)
-
-                # append both to result
-                player_timeData["frameData"].append({
-                    "timestamp": frame_timestamp,
-                    "events": player_events,
-                    "participantFrames": player_data
-                })
-
-    return player_timeData["frameData"]
+    """
+    return extract_playerTimeline(puuid, data_source.source.get_matchTimeline(match_id))
+
+def get_playerFrameSeries(puuid:str, match_id:str) -> FrameSeries | None:
+    """
+    Extracts the player's per-minute stats of a match as a columnar FrameSeries.
+    """
+    return extract_playerFrameSeries(puuid, data_source.source.get_matchTimeline(match_id))
+
+async def get_playerFrameSeries_async(puuid:str, match_id:str) -> FrameSeries | None:
+    """
+    Async version of get_playerFrameSeries for the async server endpoints.
+    """
+    return await asyncio.to_thread(extract_playerFrameSeries, puuid, await data_source.source.get_matchTimeline_async(match_id))
+
+def get_timelineIndex(match_id:str) -> dict:
+    """
+    Returns the timeline index of a match, cached by the data source next to the raw match payloads.
+    """
+    source = data_source.source
+
+    return source.cached_call(f"match-timeline-index:{match_id}", lambda: build_timelineIndex(source.get_matchTimeline(match_id)))
+
+async def get_timelineIndex_async(match_id:str) -> dict:
+    """
+    Async version of get_timelineIndex. The index is built in a worker thread, off the event loop.
+    """
+    source = data_source.source
+
+    async def load() -> dict:
+        return await asyncio.to_thread(build_timelineIndex, await source.get_matchTimeline_async(match_id))
+
+    return await source.cached_call_async(f"match-timeline-index:{match_id}", load)
+
+def get_playerTimeline_stream(puuid:str, match_id:str) -> list[dict]:
+    """
+    Extracts player-specific data from the match timeline while it is downloaded, without caching the payload.
+    """
+    with data_source.source.open_matchTimeline(match_id) as stream:
+        return extract_playerTimeline_stream(puuid, stream)
+
+def stream_timelines() -> bool:
+    """
+    Returns whether player summaries parse the timeline as a stream (see TIMELINE_STREAM in config.py).
+    The stream parser still builds every frame whole, with all ten participants and events, and only keeps the player's
+    part. It is slower than loading and indexing the whole timeline (about 1.5x on a 32 minute game) but only holds one
+    frame instead of the whole payload, peaking at about a third of the memory. That trade is only worth making when no
+    cache keeps the index for the next summary.
+    """
+    if TIMELINE_STREAM == "auto":
+        return riot_client.memo_cache is None and riot_client.match_cache is None
+    return TIMELINE_STREAM == "true"
+
+def _get_playerSummary_stream(puuid:str, match_id:str) -> dict:
+    """
+    Builds a player summary with the streaming timeline parser. The warehouse gets the match stats without timelines.
+    """
+    details_future = _submit(data_source.source.get_matchDetails, match_id)
+    player_timeline = get_playerTimeline_stream(puuid, match_id)
+    match_details = details_future.result()
+
+    warehouse = data_source.writable_warehouse()
+    if warehouse is not None:
+        warehouse.ingest_match(match_details, extract_matchSummary(match_details, None))
+
+    return {
+        "player_stats": extract_playerDetails(puuid, match_details),
+        "player_timeline": player_timeline
+    }
 
 def get_playerSummary(puuid:str, match_id:str) -> dict:
     """
     Combines player-specific match details and timeline data.
+    The match is fetched once and the timeline is read through its cached per-match index, or parsed as a
+    stream when nothing caches the index (see stream_timelines).
+    Matches already in the local warehouse are served from it, and matches fetched from the live source are added to it.
     """
+    warehouse = match_warehouse.warehouse
+    if warehouse is not None:
+        stored = warehouse.get_playerSummary(puuid, match_id)
+        if stored is not None:
+            return stored
+
+    if stream_timelines():
+        return _get_playerSummary_stream(puuid, match_id)
+
+    match_bundle = get_matchBundle(match_id)
+    warehouse = data_source.writable_warehouse()
+    if warehouse is not None:
+        _ingest_matchBundle(warehouse, match_bundle)
+
+    return {
+        "player_stats": extract_playerDetails(puuid, match_bundle["match_details"]),
+        "player_timeline": extract_playerTimeline_indexed(puuid, match_bundle["timeline_index"])
+    }
+
+async def get_playerSummary_async(puuid:str, match_id:str) -> dict:
+    """
+    Async version of get_playerSummary for the async server endpoints.
+    """
+    warehouse = match_warehouse.warehouse
+    if warehouse is not None:
+        stored = await asyncio.to_thread(warehouse.get_playerSummary, puuid, match_id)
+        if stored is not None:
+            return stored
+
+    if stream_timelines():
+        # the stream parser reads a blocking stream, so the whole summary runs in a worker thread
+        return await asyncio.to_thread(_get_playerSummary_stream, puuid, match_id)
+
+    match_bundle = await get_matchBundle_async(match_id)
+    warehouse = data_source.writable_warehouse()
+    if warehouse is not None:
+        await asyncio.to_thread(_ingest_matchBundle, warehouse, match_bundle)
 
     return {
-        "player_stats": get_playerDetails(puuid, match_id),
-        "player_timeline": get_playerTimeline(puuid, match_id)
+        "player_stats": extract_playerDetails(puuid, match_bundle["match_details"]),
+        "player_timeline": extract_playerTimeline_indexed(puuid, match_bundle["timeline_index"])
     }
+
+def get_matchSummary(match_id:str) -> list[dict]:
+    """
+    Combines match details and timeline data for all ten participants of a match.
+    The match is fetched once, like a single get_playerSummary call, unless it is already in the local warehouse.
+    """
+    warehouse = match_warehouse.warehouse
+    if warehouse is not None:
+        stored = warehouse.get_matchSummary(match_id)
+        if stored is not None:
+            return stored
+
+    match_bundle = get_matchBundle(match_id)
+    warehouse = data_source.writable_warehouse()
+    if warehouse is not None:
+        return _ingest_matchBundle(warehouse, match_bundle)
+
+    return extract_matchSummary(match_bundle["match_details"], match_bundle["timeline_index"])
+
+async def get_matchSummary_async(match_id:str) -> list[dict]:
+    """
+    Async version of get_matchSummary for the async server endpoints.
+    """
+    warehouse = match_warehouse.warehouse
+    if warehouse is not None:
+        stored = await asyncio.to_thread(warehouse.get_matchSummary, match_id)
+        if stored is not None:
+            return stored
+
+    match_bundle = await get_matchBundle_async(match_id)
+    warehouse = data_source.writable_warehouse()
+    if warehouse is not None:
+        return await asyncio.to_thread(_ingest_matchBundle, warehouse, match_bundle)
+
+    return await asyncio.to_thread(extract_matchSummary, match_bundle["match_details"], match_bundle["timeline_index"])
+
+async def _summarize_match(puuid:str, match_id:str, semaphore:asyncio.Semaphore) -> dict:
+    """
+    Builds one entry of a batch of player summaries, turning a failure into an "error" entry.
+    """
+    async with semaphore:
+        try:
+            return {"match_id": match_id, "player_summary": await get_playerSummary_async(puuid, match_id)}
+        except RiotAPIError as error:
+            return {"match_id": match_id, "error": {"status_code": error.status_code or 404, "detail": str(error)}}
+        except Exception as error:
+            return {"match_id": match_id, "error": {"status_code": 500, "detail": "Internal Server Error: " + str(error)}}
+
+async def get_playerSummaries_async(puuid:str, match_ids:list[str], concurrency:int = PLAYER_SUMMARIES_CONCURRENCY) -> list[dict]:
+    """
+    Builds the player summaries of several matches concurrently, with at most `concurrency` matches in flight.
+    A failing match is reported in its own entry instead of failing the whole batch.
+
+    return: a list in the order of match_ids. Each entry has "match_id" and either
+        "player_summary" or "error" (with "status_code" and "detail").
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    return await asyncio.gather(*(_summarize_match(puuid, match_id, semaphore) for match_id in match_ids))
+
+async def iter_playerSummaries_async(puuid:str, match_ids:list[str], concurrency:int = PLAYER_SUMMARIES_CONCURRENCY):
+    """
+    Yields the entries of get_playerSummaries_async as soon as each match is ready, fastest first.
+    Only the matches in flight are held in memory; the rest are cancelled if the consumer stops early.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    tasks = [asyncio.create_task(_summarize_match(puuid, match_id, semaphore)) for match_id in match_ids]
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,126 @@
+"""
+Background prefetch of the matches of tracked players
+A PrefetchWorker polls the recent matches of a fixed list of players (ex: team rosters) on an interval and builds the
+player summary of every new match, which leaves the match details and the timeline index in the memo and on-disk
+caches. Dashboard loads for these players are then served from warm data.
+The worker's requests run under rate_limiter.budget_share, so they only fill part of each rate limit window.
+The memo still coalesces them with foreground lookups: a foreground request for a match the worker is already
+fetching waits for that fetch, paced at the worker's share, rather than sending the same request a second time.
+"""
+
+import asyncio
+import logging
+
+from backend.python_legacy import data_source
+from backend.python_legacy.config import (
+    PREFETCH_PUUIDS, PREFETCH_INTERVAL, PREFETCH_MATCH_COUNT, PREFETCH_CONCURRENCY, PREFETCH_RATE_SHARE
+)
+from backend.python_legacy.player_aggregate import unseen_matchIds
+from backend.python_legacy.player_summary import get_playerSummary_async
+from backend.python_legacy.rate_limiter import budget_share
+
+logger = logging.getLogger(__name__)
+
+class PrefetchWorker:
+    """
+    Polls the recent matches of tracked players and warms the caches with their new matches.
+
+    Args:
+        puuids (list[str]): The PUUIDs of the tracked players.
+        interval (float): Seconds between two polls.
+        count (int): Number of recent matches looked at per player.
+        concurrency (int): Number of matches prefetched at the same time.
+        rate_share (float): Fraction of every rate limit window the worker may use.
+    """
+    def __init__(self, puuids: list[str] = PREFETCH_PUUIDS, interval: float = PREFETCH_INTERVAL, count: int = PREFETCH_MATCH_COUNT,
+                 concurrency: int = PREFETCH_CONCURRENCY, rate_share: float = PREFETCH_RATE_SHARE):
+        self.puuids = list(puuids)
+        self.interval = interval
+        self.count = count
+        self.concurrency = max(concurrency, 1)
+        self.rate_share = rate_share
+        # newest prefetched match ID of each player
+        self.cursors = {}
+        self._task = None
+
+    async def _prefetch_match(self, puuid: str, match_id: str, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            try:
+                await get_playerSummary_async(puuid, match_id)
+                return True
+            except Exception as error:
+                logger.warning(f"Prefetch of {match_id} for {puuid} failed: {error}")
+                return False
+
+    async def prefetch_player(self, puuid: str) -> dict:
+        """
+        Prefetches the matches of a player that are newer than its cursor.
+        The cursor only moves once every new match was prefetched, so failed matches are retried on the next poll.
+
+        Returns:
+            dict: "new_matches" (the number of matches prefetched) and "failed_matches" (their IDs).
+        """
+        match_ids = await data_source.source.get_recentMatches_async(puuid, self.count)
+        new_ids = unseen_matchIds(match_ids, self.cursors.get(puuid))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._prefetch_match(puuid, match_id, semaphore) for match_id in new_ids))
+        failed = [match_id for match_id, succeeded in zip(new_ids, results) if not succeeded]
+
+        if match_ids and not failed:
+            self.cursors[puuid] = match_ids[0]
+
+        return {"new_matches": len(new_ids) - len(failed), "failed_matches": failed}
+
+    async def run_once(self) -> dict:
+        """
+        Runs one poll over every tracked player, one player at a time.
+
+        Returns:
+            dict: The result of prefetch_player for each PUUID, or an "error" entry if its match list could not be fetched.
+        """
+        # tasks started below copy the context, so every request of the poll runs under the share
+        token = budget_share.set(self.rate_share)
+        try:
+            results = {}
+            for puuid in self.puuids:
+                try:
+                    results[puuid] = await self.prefetch_player(puuid)
+                except Exception as error:
+                    logger.warning(f"Prefetch of the recent matches of {puuid} failed: {error}")
+                    results[puuid] = {"error": str(error)}
+
+            return results
+        finally:
+            budget_share.reset(token)
+
+    async def run(self):
+        """
+        Polls until cancelled.
+        """
+        while True:
+            results = await self.run_once()
+            logger.info(f"Prefetched {sum(result.get('new_matches', 0) for result in results.values())} new matches")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        """
+        Starts polling in a task of the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="prefetch-worker")
+        return self._task
+
+    async def stop(self):
+        """
+        Cancels the polling task and waits for it to finish.
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
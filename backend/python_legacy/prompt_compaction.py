@@ -0,0 +1,205 @@
+"""
+Token-budgeted compaction of player summaries for the LLM prompts
+The summary built by player_summary is turned into short text lines: one line of end-of-game stats, one line per
+timeline event written from the player's point of view, and a few level/gold snapshots. Repeated events in
+consecutive minutes are merged into one line, and when the lines do not fit the token budget the least informative
+ones are dropped first (snapshots, then plates and feats, then assists and objectives, then kills and deaths).
+"""
+
+import math
+import re
+
+try:
+    import tiktoken
+except ImportError:     # optional, token counts are estimated without it
+    tiktoken = None
+
+# priority of each kind of line, higher is kept first
+PRIORITY_KILL = 5
+PRIORITY_DEATH = 5
+PRIORITY_MAJOR_OBJECTIVE = 4
+PRIORITY_ASSIST = 3
+PRIORITY_OBJECTIVE = 3
+PRIORITY_MINOR = 2
+PRIORITY_SNAPSHOT = 1
+
+MAJOR_MONSTERS = ("BARON_NASHOR", "ELDER_DRAGON")
+# minutes between two level/gold snapshots
+SNAPSHOT_INTERVAL = 5
+
+_encoding = None
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+def count_tokens(text:str) -> int:
+    """
+    Counts the tokens of a text with tiktoken's cl100k_base encoding when it is installed, or estimates them
+    (words of up to four letters, numbers of up to three digits and punctuation count as one token each).
+    """
+    global _encoding
+
+    if tiktoken is not None:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:   # the encoding file could not be downloaded
+                _encoding = False
+        if _encoding:
+            return len(_encoding.encode(text))
+
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif piece.isalpha():
+            tokens += math.ceil(len(piece) / 4)
+        else:
+            tokens += 1
+    return tokens
+
+def _format_number(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    return str(value)
+
+def encode_playerStats(player_stats:dict) -> str:
+    """
+    Encodes the end-of-game stats of get_playerDetails in one line. Rune IDs are left out.
+    """
+    if not player_stats:
+        return "stats: unknown"
+
+    result = "win" if player_stats.get("win") else "loss"
+    parts = [
+        f"{player_stats.get('champion')} {player_stats.get('role') or '?'} {result}",
+        f"lvl {player_stats.get('champLevel')}",
+        f"KDA {player_stats.get('kills')}/{player_stats.get('deaths')}/{player_stats.get('assists')}",
+        f"gold {player_stats.get('totalGold')}",
+        f"dmg {player_stats.get('totalDamage')}",
+        f"cs {player_stats.get('cs')}",
+        f"vision {player_stats.get('visionScore')} (wards {player_stats.get('wardsPlaced')}, control {player_stats.get('detectorWardsPlaced')})",
+    ]
+    challenges = ", ".join(f"{key} {_format_number(value)}" for key, value in (player_stats.get("challenge") or {}).items())
+    if challenges:
+        parts.append(challenges)
+
+    return "stats: " + " | ".join(parts)
+
+def encode_event(event:dict, playerId:int | None) -> tuple[int, str] | None:
+    """
+    Encodes one timeline event from the point of view of the player.
+
+    return: (priority, text), or None for an event type that is not encoded.
+    """
+    event_type = event.get("type")
+
+    if event_type == "CHAMPION_KILL":
+        killer, victim = event.get("killerId"), event.get("victimId")
+        assists = event.get("assistingParticipantIds") or []
+        assists_text = f" (assists {','.join(str(assist) for assist in assists)})" if assists else ""
+        if playerId is not None and killer == playerId:
+            return PRIORITY_KILL, f"killed {victim}{assists_text}"
+        if playerId is not None and victim == playerId:
+            return PRIORITY_DEATH, f"died to {killer}{assists_text}"
+        if playerId is not None and playerId in assists:
+            return PRIORITY_ASSIST, f"assisted {killer} on {victim}"
+        return PRIORITY_ASSIST, f"kill {killer}>{victim}{assists_text}"
+
+    if event_type == "ELITE_MONSTER_KILL":
+        monster = event.get("monsterSubType") or event.get("monsterType")
+        priority = PRIORITY_MAJOR_OBJECTIVE if monster in MAJOR_MONSTERS or event.get("monsterType") in MAJOR_MONSTERS else PRIORITY_OBJECTIVE
+        return priority, f"{monster} by team {event.get('killerTeamId')}"
+
+    if event_type == "BUILDING_KILL":
+        building = event.get("towerType") or event.get("buildingType")
+        priority = PRIORITY_MAJOR_OBJECTIVE if building == "INHIBITOR_BUILDING" else PRIORITY_OBJECTIVE
+        return priority, f"destroyed {event.get('laneType')} {building}"
+
+    if event_type == "TURRET_PLATE_DESTROYED":
+        return PRIORITY_MINOR, f"plate {event.get('laneType')}"
+
+    if event_type == "FEAT_UPDATE":
+        return PRIORITY_MINOR, f"feat {event.get('featType')} team {event.get('teamId')}"
+
+    return None
+
+def _merge_repeats(items:list[dict]) -> list[dict]:
+    """
+    Merges lines with the same text in the same or consecutive minutes into one line with a minute range and a count.
+    """
+    merged = []
+    last_by_text = {}
+    for item in items:
+        previous = last_by_text.get(item["text"])
+        if previous is not None and item["minute"] - previous["last_minute"] <= 1:
+            previous["last_minute"] = item["minute"]
+            previous["count"] += 1
+            continue
+
+        item = {**item, "last_minute": item["minute"], "count": 1}
+        merged.append(item)
+        last_by_text[item["text"]] = item
+
+    return merged
+
+def _format_item(item:dict) -> str:
+    minutes = f"m{item['minute']}" if item["last_minute"] == item["minute"] else f"m{item['minute']}-{item['last_minute']}"
+    count = f" x{item['count']}" if item["count"] > 1 else ""
+    return f"{minutes} {item['text']}{count}"
+
+def compact_playerSummary(player_summary:dict, token_budget:int) -> dict:
+    """
+    Compacts a player summary into short lines that fit the token budget, keeping the most informative first.
+
+    Args:
+        player_summary (dict): The summary built by player_summary.get_playerSummary.
+        token_budget (int): The maximum number of tokens of the compacted text. The stats line is always kept.
+
+    Returns:
+        dict: "text" (the compacted summary), "tokens" (its token count), "lines_total" and "lines_kept"
+            (timeline lines after merging repeats, before and after the budget).
+    """
+    timeline = player_summary.get("player_timeline") or []
+    # the player's own frame stats carry its participantId in match-v5 payloads
+    playerId = next((frame["participantFrames"].get("participantId") for frame in timeline if frame.get("participantFrames")), None)
+
+    items = []
+    next_snapshot = 0
+    for frame in timeline:
+        minute = frame["timestamp"]
+        stats = frame.get("participantFrames") or {}
+        if minute >= next_snapshot and stats:
+            items.append({"minute": minute, "priority": PRIORITY_SNAPSHOT, "text": f"lvl {stats.get('level')} gold {stats.get('currentGold')}"})
+            next_snapshot = minute - minute % SNAPSHOT_INTERVAL + SNAPSHOT_INTERVAL
+
+        for event in frame["events"]:
+            encoded = encode_event(event, playerId)
+            if encoded is not None:
+                items.append({"minute": minute, "priority": encoded[0], "text": encoded[1]})
+
+    items = _merge_repeats(items)
+
+    stats_line = encode_playerStats(player_summary.get("player_stats"))
+    used = count_tokens(stats_line)
+    kept = []
+    # once a line does not fit, no less informative line takes its place
+    blocked_priority = None
+    for position in sorted(range(len(items)), key=lambda position: (-items[position]["priority"], items[position]["minute"])):
+        if blocked_priority is not None and items[position]["priority"] < blocked_priority:
+            break
+
+        cost = count_tokens(_format_item(items[position])) + 1     # one more for the line break
+        if used + cost <= token_budget:
+            kept.append(position)
+            used += cost
+        else:
+            blocked_priority = items[position]["priority"]
+
+    lines = [stats_line, *(_format_item(items[position]) for position in sorted(kept))]
+    text = "\n".join(lines)
+
+    return {
+        "text": text,
+        "tokens": count_tokens(text),
+        "lines_total": len(items),
+        "lines_kept": len(kept)
+    }
@@ -0,0 +1,86 @@
+"""
+Mergeable quantile sketch for running aggregates
+Values are counted in logarithmic buckets (as in DDSketch), so any quantile is known within a fixed relative error
+while the sketch only grows with the range of the values, not their number. Sketches are JSON serializable and
+can be updated with new values or merged without the values seen before.
+"""
+
+import math
+
+import numpy as np
+
+class QuantileSketch:
+    """
+    Counts positive values in buckets of relative width `relative_accuracy` and the rest in a zero bucket.
+    """
+    __slots__ = ("relative_accuracy", "_log_gamma", "buckets", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, values) -> "QuantileSketch":
+        """
+        Adds an array of values, ignoring NaN. Negative values are counted as zero.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+
+        positive = values[values > 0]
+        self.zero_count += int(len(values) - len(positive))
+        self.count += int(len(values))
+
+        indexes, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+        for index, count in zip(indexes.tolist(), counts.tolist()):
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+        return self
+
+    def merge(self, other:"QuantileSketch") -> "QuantileSketch":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracies")
+
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+        return self
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Returns the value at quantile q (0 to 1), within relative_accuracy of the exact one, or None if empty.
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # middle of the bucket (gamma^(index-1), gamma^index] in relative terms
+                return 2 * math.exp(index * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+        return 2 * math.exp(max(self.buckets) * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): count for index, count in self.buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data:dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.zero_count = data["zero_count"]
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
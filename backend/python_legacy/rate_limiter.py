@@ -0,0 +1,228 @@
+"""
+Client-side rate limiter for the Riot API.
+Outgoing requests are paced per routing region (application limits) and per region and endpoint (method limits),
+using the limits and counts Riot reports in the X-App-Rate-Limit and X-Method-Rate-Limit headers.
+Callers over the limit wait for a free token instead of failing, and a 429 with Retry-After pauses the scope it names.
+Background work runs under a lower budget_share, so it stops at a fraction of each window and leaves the rest to
+foreground requests.
+"""
+
+import asyncio
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# endpoint names used to group method rate limits, the first matching path wins
+_METHOD_PATTERNS = [
+    (re.compile(r"^/riot/account/v1/accounts/by-riot-id/"), "account-v1.getByRiotId"),
+    (re.compile(r"^/lol/match/v5/matches/by-puuid/[^/]+/ids$"), "match-v5.getMatchIdsByPUUID"),
+    (re.compile(r"^/lol/match/v5/matches/[^/]+/timeline$"), "match-v5.getTimeline"),
+    (re.compile(r"^/lol/match/v5/matches/[^/]+$"), "match-v5.getMatch"),
+]
+
+# fraction of every rate limit window the current task may fill, lowered by background workers
+budget_share = contextvars.ContextVar("budget_share", default=1.0)
+
+def parse_limits(value: str) -> list[tuple[int, int]]:
+    """
+    Parses a Riot rate limit header value.
+
+    Args:
+        value (str): Comma separated "count:seconds" pairs (ex: "20:1,100:120").
+
+    Returns:
+        list: (count, seconds) tuples.
+    """
+    limits = []
+    for pair in value.split(","):
+        if pair.strip():
+            count, seconds = pair.split(":")
+            limits.append((int(count), int(seconds)))
+    return limits
+
+def endpoint_keys(url: str) -> tuple[str, str]:
+    """
+    Returns the application scope (region host) and the method scope (region host + endpoint) of a URL.
+    """
+    parts = urlsplit(url)
+    method = parts.path
+    for pattern, name in _METHOD_PATTERNS:
+        if pattern.search(parts.path):
+            method = name
+            break
+
+    return parts.netloc, f"{parts.netloc}:{method}"
+
+class _Window:
+    """
+    A bucket of `limit` tokens where each spent token comes back one window after it was spent.
+    This never lets more than `limit` requests into any `seconds` long window.
+    """
+    __slots__ = ("limit", "seconds", "spent")
+
+    def __init__(self, limit: int, seconds: float):
+        self.limit = limit
+        self.seconds = seconds
+        self.spent = deque()
+
+    def wait_time(self, now: float, share: float = 1.0) -> float:
+        while self.spent and self.spent[0] <= now - self.seconds:
+            self.spent.popleft()
+
+        # a share never rounds down to zero tokens, so background work is slowed but not stopped
+        limit = max(int(self.limit * share), 1) if share < 1.0 else self.limit
+        if len(self.spent) < limit:
+            return 0.0
+        return self.spent[len(self.spent) - limit] + self.seconds - now
+
+class _Scope:
+    """
+    All the windows of one application or method scope and the pause set by a 429.
+    """
+    __slots__ = ("windows", "blocked_until")
+
+    def __init__(self, limits: list[tuple[int, int]], pad: float):
+        self.windows = [_Window(limit, seconds + pad) for limit, seconds in limits]
+        self.blocked_until = 0.0
+
+    def wait_time(self, now: float, share: float = 1.0) -> float:
+        wait = max(self.blocked_until - now, 0.0)
+        for window in self.windows:
+            wait = max(wait, window.wait_time(now, share))
+        return wait
+
+    def spend(self, now: float):
+        for window in self.windows:
+            window.spent.append(now)
+
+    def set_limits(self, limits: list[tuple[int, int]], pad: float):
+        """
+        Applies the limits Riot reported, keeping the spent tokens of windows that did not change.
+        """
+        current = {window.seconds: window for window in self.windows}
+        windows = []
+        for limit, seconds in limits:
+            window = current.get(seconds + pad) or _Window(limit, seconds + pad)
+            window.limit = limit
+            windows.append(window)
+        self.windows = windows
+
+    def sync_counts(self, counts: list[tuple[int, int]], pad: float, now: float):
+        """
+        Counts requests Riot has seen but this process has not sent (ex: other workers sharing the key).
+        """
+        windows = {window.seconds: window for window in self.windows}
+        for count, seconds in counts:
+            window = windows.get(seconds + pad)
+            if window is None:
+                continue
+            window.wait_time(now)   # drop expired tokens before comparing
+            for _ in range(count - len(window.spent)):
+                window.spent.append(now)
+
+class RiotRateLimiter:
+    """
+    Thread-safe and asyncio-friendly pacing of Riot API requests.
+
+    Args:
+        app_limits (str): Application limits used until Riot reports them (ex: "20:1,100:120").
+        method_limits (str): Method limits used until Riot reports them for an endpoint.
+        pad (float): Seconds added to every window to absorb clock and network skew.
+    """
+    def __init__(self, app_limits: str, method_limits: str, pad: float = 0.0):
+        self.app_limits = parse_limits(app_limits)
+        self.method_limits = parse_limits(method_limits)
+        self.pad = pad
+        self.waits = 0
+        self._scopes = {}
+        self._lock = threading.Lock()
+
+    def _scope(self, key: str, limits: list[tuple[int, int]]) -> _Scope:
+        scope = self._scopes.get(key)
+        if scope is None:
+            scope = self._scopes[key] = _Scope(limits, self.pad)
+        return scope
+
+    def _scopes_for(self, url: str) -> tuple[_Scope, _Scope]:
+        app_key, method_key = endpoint_keys(url)
+        return self._scope(app_key, self.app_limits), self._scope(method_key, self.method_limits)
+
+    def reserve(self, url: str) -> float:
+        """
+        Takes a token from the URL's application and method scopes if both have one.
+        Only the current budget_share of each window is available to the caller.
+
+        Returns:
+            float: 0 when the request may be sent now, otherwise the seconds to wait before trying again.
+        """
+        share = budget_share.get()
+        with self._lock:
+            now = time.monotonic()
+            app_scope, method_scope = self._scopes_for(url)
+
+            wait = max(app_scope.wait_time(now, share), method_scope.wait_time(now, share))
+            if wait > 0:
+                self.waits += 1
+                return wait
+
+            app_scope.spend(now)
+            method_scope.spend(now)
+            return 0.0
+
+    def acquire(self, url: str):
+        """
+        Blocks the calling thread until the request may be sent.
+        """
+        while (wait := self.reserve(url)) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str):
+        """
+        Suspends the calling task until the request may be sent.
+        """
+        while (wait := self.reserve(url)) > 0:
+            await asyncio.sleep(wait)
+
+    def update(self, url: str, headers):
+        """
+        Applies the limits and counts from a response's rate limit headers.
+        """
+        with self._lock:
+            now = time.monotonic()
+            app_scope, method_scope = self._scopes_for(url)
+
+            for scope, prefix in ((app_scope, "X-App-Rate-Limit"), (method_scope, "X-Method-Rate-Limit")):
+                limits = headers.get(prefix)
+                if isinstance(limits, str):
+                    scope.set_limits(parse_limits(limits), self.pad)
+
+                counts = headers.get(f"{prefix}-Count")
+                if isinstance(counts, str):
+                    scope.sync_counts(parse_limits(counts), self.pad, now)
+
+    def backoff(self, url: str, headers) -> bool:
+        """
+        Pauses the scope named by a 429 response for its Retry-After seconds.
+
+        Returns:
+            bool: True if the request should be queued again. Riot sends Retry-After for application and
+                method limits; a 429 without it comes from the underlying service and is not retried.
+        """
+        retry_after = headers.get("Retry-After")
+        if not isinstance(retry_after, str):
+            return False
+
+        with self._lock:
+            blocked_until = time.monotonic() + float(retry_after)
+            app_scope, method_scope = self._scopes_for(url)
+            scope = app_scope if headers.get("X-Rate-Limit-Type") == "application" else method_scope
+            scope.blocked_until = max(scope.blocked_until, blocked_until)
+
+        logger.warning(f"Rate limited by Riot, retrying {url} in {retry_after} seconds")
+        return True
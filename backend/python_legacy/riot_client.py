@@ -8,14 +8,74 @@ Version: 1.1
 """
 
 import logging
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Callable
+from urllib.parse import urlencode
 import requests
-from backend.python_legacy.config import REGION, HEADERS
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from backend.python_legacy.config import (
+    REGION, HEADERS,
+    RIOT_POOL_SIZE, RIOT_CONNECT_TIMEOUT, RIOT_READ_TIMEOUT, RIOT_MAX_RETRIES, RIOT_RETRY_BACKOFF,
+    RIOT_CACHE_ENABLED, RIOT_CACHE_PATH, RIOT_CACHE_MAX_BYTES, RIOT_CACHE_ACCESS_REFRESH, RECENT_MATCHES_TTL, PUUID_TTL,
+    RIOT_MEMO_ENABLED, RIOT_MEMO_MAX_ENTRIES, RIOT_MEMO_MAX_BYTES,
+    RIOT_RATE_LIMIT_ENABLED, RIOT_APP_RATE_LIMIT, RIOT_METHOD_RATE_LIMIT, RIOT_RATE_LIMIT_PAD, RIOT_RATE_LIMIT_MAX_RETRIES
+)
+from backend.python_legacy.match_cache import MatchCache
+from backend.python_legacy.memo_cache import MemoCache
+from backend.python_legacy.rate_limiter import RiotRateLimiter
 
 # Configure logging
 logging.basicConfig(level = logging.INFO)
 logger = logging.getLogger(__name__)
 
+class _RateLimitedRetry(Retry):
+    """
+    urllib3 retry policy that takes a rate limiter token before every retry, so resent requests stay under the limits.
+    """
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if rate_limiter is not None and _pool is not None:
+            rate_limiter.acquire(f"{_pool.scheme}://{_pool.host}{url}")
+        return retry
+
+def create_session() -> requests.Session:
+    """
+    Creates an HTTP session that keeps connections to the Riot API alive between requests.
+    Transient 5xx responses and connection failures are retried with exponential backoff, each retry paced by the
+    rate limiter. 429 responses are never retried here, _rate_limited_get backs off through the rate limiter instead.
+
+    Returns:
+        requests.Session: A session with a connection-pooled, retrying adapter mounted for https.
+    """
+    retry = _RateLimitedRetry(
+        total=RIOT_MAX_RETRIES,
+        backoff_factor=RIOT_RETRY_BACKOFF,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=False,   # else a 429 with Retry-After is resent outside the rate limiter
+        raise_on_status=False   # hand the last response to raise_for_status once retries run out
+    )
+    adapter = HTTPAdapter(pool_connections=RIOT_POOL_SIZE, pool_maxsize=RIOT_POOL_SIZE, max_retries=retry, pool_block=True)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+
+    return session
+
+# shared connection pool (the underlying urllib3 pool is thread-safe)
+session = create_session()
+
+# paces requests under the key's app and method limits (None when turned off)
+rate_limiter = (
+    RiotRateLimiter(RIOT_APP_RATE_LIMIT, RIOT_METHOD_RATE_LIMIT, RIOT_RATE_LIMIT_PAD) if RIOT_RATE_LIMIT_ENABLED else None
+)
+
+# shared on-disk cache (None when caching is turned off)
+match_cache = MatchCache(RIOT_CACHE_PATH, RIOT_CACHE_MAX_BYTES, RIOT_CACHE_ACCESS_REFRESH) if RIOT_CACHE_ENABLED else None
+# in-process LRU with request coalescing in front of the on-disk cache (None when turned off)
+memo_cache = MemoCache(RIOT_MEMO_MAX_ENTRIES, RIOT_MEMO_MAX_BYTES) if RIOT_MEMO_ENABLED else None
+
 class RiotAPIError(Exception):
     """
     Custom exception for Riot API-related errors.
@@ -37,25 +97,106 @@ def send_request(url: str):
         dict: The JSON response from the API.
     """
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = _rate_limited_get(url)
         response.raise_for_status()  # This will raise an HTTPError for 4xx/5xx responses
 
         return response.json()
     
     except requests.exceptions.HTTPError as error:
-        logger.error(f"API request with HTTP status code {error.response.status_code}")
-
-        raise RiotAPIError(
-            f"API request failed: {error.response.status_code} - {error.response.text}",
-            status_code=error.response.status_code if error.response else None,
-            response_text=error.response.text if error.response else None
-        ) from error
+        raise _http_error(error) from error
     
     except requests.exceptions.RequestException as error:
         logger.error(f"Network error occurred while accessing {url}: {error}")
 
         raise RiotAPIError(f"Network error occurred: {str(error)}") from error
 
+def _http_error(error: requests.exceptions.HTTPError) -> RiotAPIError:
+    """
+    Converts an HTTPError into a RiotAPIError, also when the error carries no response.
+    """
+    response = error.response
+    if response is None:
+        logger.error(f"API request failed without a response: {error}")
+        return RiotAPIError(f"API request failed: {error}")
+
+    logger.error(f"API request with HTTP status code {response.status_code}")
+    return RiotAPIError(
+        f"API request failed: {response.status_code} - {response.text}",
+        status_code=response.status_code,
+        response_text=response.text
+    )
+
+def _rate_limited_get(url: str, **kwargs) -> requests.Response:
+    """
+    Sends the GET request once the rate limiter allows it, queueing it again after a 429 with Retry-After.
+    """
+    if rate_limiter is None:
+        return session.get(url, headers=HEADERS, timeout=(RIOT_CONNECT_TIMEOUT, RIOT_READ_TIMEOUT), **kwargs)
+
+    retries = 0
+    while True:
+        rate_limiter.acquire(url)
+        response = session.get(url, headers=HEADERS, timeout=(RIOT_CONNECT_TIMEOUT, RIOT_READ_TIMEOUT), **kwargs)
+        rate_limiter.update(url, response.headers)
+
+        if response.status_code == 429 and retries < RIOT_RATE_LIMIT_MAX_RETRIES and rate_limiter.backoff(url, response.headers):
+            # a streamed response holds its pooled connection until closed
+            response.close()
+            retries += 1
+            continue
+
+        return response
+
+def cached_request(url: str, cache_key: str, ttl: float | None = None):
+    """
+    Helper function that serves a request from the in-memory memo or the on-disk cache when possible.
+    Concurrent identical lookups share a single call to the layers below.
+
+    Args:
+        url (str): The URL to send the GET request to on a cache miss.
+        cache_key (str): The key the response is stored under.
+        ttl (float | None): Seconds the response stays fresh, None if it never changes.
+
+    Returns:
+        dict: The JSON response from the cache or the API.
+    """
+    return cached_call(cache_key, lambda: send_request(url), ttl)
+
+def cached_call(cache_key: str, loader: Callable[[], Any], ttl: float | None = None):
+    """
+    Serves any JSON serializable value from the in-memory memo or the on-disk cache, calling the loader on a miss.
+    This lets values derived from a match (ex: a timeline index) be cached next to the raw payloads.
+
+    Args:
+        cache_key (str): The key the value is stored under.
+        loader (Callable): Produces the value on a cache miss.
+        ttl (float | None): Seconds the value stays fresh, None if it never changes.
+
+    Returns:
+        Any: The cached or freshly loaded value.
+    """
+    if memo_cache is None:
+        return _load_cached(cache_key, loader, ttl)
+
+    return memo_cache.get_or_load(cache_key, lambda: _load_cached(cache_key, loader, ttl), ttl)
+
+def _load_cached(cache_key: str, loader: Callable[[], Any], ttl: float | None):
+    """
+    Serves a value from the on-disk cache, falling back to the loader on a miss.
+    """
+    if match_cache is None:
+        return loader()
+
+    cached = match_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Cache hit for {cache_key}")
+        return cached
+
+    data = loader()
+    match_cache.set(cache_key, data, ttl)
+
+    return data
+
 
 def get_PUUID(gameName:str, tagLine:str) -> str:
     """
@@ -74,7 +215,7 @@ def get_PUUID(gameName:str, tagLine:str) -> str:
     url = f"https://{REGION}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{gameName}/{tagLine}"
     logger.info(f"Fetching PUUID for {gameName}#{tagLine} from {url}")
 
-    return send_request(url).get("puuid")
+    return cached_request(url, f"puuid:{gameName}#{tagLine}", PUUID_TTL).get("puuid")
 
 def get_recentMatches(puuid:str, count:int = 5) -> list[str]:
     """
@@ -93,7 +234,44 @@ def get_recentMatches(puuid:str, count:int = 5) -> list[str]:
     url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids?count={count}"
     logger.info(f"Fetching recent matches for PUUID {puuid} from {url}")
 
-    return send_request(url)
+    return cached_request(url, f"recent-matches:{puuid}:{count}", RECENT_MATCHES_TTL)
+
+def matchIds_query(start:int = 0, count:int = 100, queue:int | None = None,
+                   startTime:int | None = None, endTime:int | None = None) -> str:
+    """
+    Returns the query string of a match IDs page, without the filters that are not set.
+    It is also part of the cache key of the page.
+    """
+    return urlencode({
+        key: value for key, value in
+        (("start", start), ("count", count), ("queue", queue), ("startTime", startTime), ("endTime", endTime))
+        if value is not None
+    })
+
+def get_matchIds(puuid:str, start:int = 0, count:int = 100, queue:int | None = None,
+                 startTime:int | None = None, endTime:int | None = None) -> list[str]:
+    """
+    Fetches one page of a player's match IDs, newest first.
+
+    Args:
+        puuid (str): The PUUID of the player.
+        start (int): The index of the first match ID of the page (default is 0).
+        count (int): The number of match IDs of the page, at most 100 (default is 100).
+        queue (int | None): Only matches of this queue ID (ex: 420 for ranked solo).
+        startTime (int | None): Only matches played after this epoch timestamp in seconds.
+        endTime (int | None): Only matches played before this epoch timestamp in seconds.
+
+    Returns:
+        list: The match IDs of the page, fewer than count on the last page.
+
+    Raises:
+        Exception: If the API request fails or returns an error.
+    """
+    query = matchIds_query(start, count, queue, startTime, endTime)
+    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids?{query}"
+    logger.info(f"Fetching match IDs for PUUID {puuid} from {url}")
+
+    return cached_request(url, f"match-ids:{puuid}:{query}", RECENT_MATCHES_TTL)
 
 def get_matchDetails(match_id:str) -> dict[str, Any]:
     """
@@ -111,7 +289,7 @@ def get_matchDetails(match_id:str) -> dict[str, Any]:
     url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/{match_id}"
     logger.info(f"Fetching match details for match ID {match_id} from {url}")
 
-    return send_request(url)
+    return cached_request(url, f"match-details:{match_id}")
 
 def get_matchTimeline(match_id:str) -> dict[str, Any]:
     """
@@ -129,5 +307,45 @@ def get_matchTimeline(match_id:str) -> dict[str, Any]:
     url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/{match_id}/timeline"
     logger.info(f"Fetching match timeline for match ID {match_id} from {url}")
 
-    return send_request(url)
-    
\ No newline at end of file
+    return cached_request(url, f"match-timeline:{match_id}")
+
+@contextmanager
+def open_matchTimeline(match_id:str):
+    """
+    Opens the timeline of a match as a binary stream, so it can be parsed while it is downloaded.
+    The payload bypasses the caches; use get_matchTimeline when the whole payload is needed.
+
+    Args:
+        match_id (str): The ID of the match to stream the timeline of.
+
+    Yields:
+        BinaryIO: The decoded response body.
+
+    Raises:
+        RiotAPIError: If the API request fails or returns an error.
+    """
+    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/{match_id}/timeline"
+    logger.info(f"Streaming match timeline for match ID {match_id} from {url}")
+
+    try:
+        response = _rate_limited_get(url, stream=True)
+
+    except requests.exceptions.RequestException as error:
+        logger.error(f"Network error occurred while accessing {url}: {error}")
+
+        raise RiotAPIError(f"Network error occurred: {str(error)}") from error
+
+    try:
+        response.raise_for_status()
+
+    except requests.exceptions.HTTPError as error:
+        # read the error body first, then release the pooled connection
+        api_error = _http_error(error)
+        response.close()
+        raise api_error from error
+
+    try:
+        response.raw.decode_content = True  # undo gzip transfer encoding while reading
+        yield response.raw
+    finally:
+        response.close()
@@ -3,26 +3,58 @@ server.py is the main entry point for the backend server.
 It initializes the server, sets up routes, and starts listening for requests.
 """
 
-from fastapi import FastAPI, HTTPException
-from backend.python_legacy import riot_client
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Literal
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from backend.python_legacy import riot_client, async_riot_client, data_source
 from backend.python_legacy.riot_client import RiotAPIError
-from src.analysis import player_summary
+from backend.python_legacy import player_summary, player_aggregate, llm_analysis, match_history, match_warehouse
+from backend.python_legacy.config import MATCH_HISTORY_MAX_LIMIT, PREFETCH_ENABLED, PREFETCH_PUUIDS
+from backend.python_legacy.prefetch_worker import PrefetchWorker
 
-app = FastAPI(title="LOL Match Analyzer")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # keep the caches warm for the tracked players while the server runs
+    prefetch_worker = PrefetchWorker() if PREFETCH_ENABLED and PREFETCH_PUUIDS else None
+    if prefetch_worker is not None:
+        prefetch_worker.start()
+
+    yield
+
+    if prefetch_worker is not None:
+        await prefetch_worker.stop()
+    # release the pooled upstream connections on shutdown
+    await async_riot_client.close_client()
+
+app = FastAPI(title="LOL Match Analyzer", lifespan=lifespan)
+
+def _encode_json(payload) -> bytes:
+    # the same encoding as FastAPI's JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+async def json_response(payload) -> Response:
+    """
+    Encodes a large JSON response (ex: a whole timeline) in a worker thread. FastAPI would convert it with
+    jsonable_encoder on the event loop, several times slower than json.dumps.
+    """
+    return Response(content=await asyncio.to_thread(_encode_json, payload), media_type="application/json")
 
 # Define the root endpoint
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "LOL Replay Analyzer"}
 
 # Define endpoints for the Riot API client
 @app.get("/puuid/{gameName}/{tagLine}")
-def fetch_puuid(gameName: str, tagLine: str):
+async def fetch_puuid(gameName: str, tagLine: str):
     """
     Returns the PUUID for a given player.
     """
     try:
-        puuid = riot_client.get_PUUID(gameName, tagLine)
+        puuid = await data_source.source.get_PUUID_async(gameName, tagLine)
         return {"puuid": puuid}
     except RiotAPIError as error:
         raise HTTPException(status_code=404, detail=str(error))
@@ -30,12 +62,12 @@ def fetch_puuid(gameName: str, tagLine: str):
         raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
 
 @app.get("/recent-matches/{puuid}")
-def fetch_recentMatches(puuid: str, count: int = 5):
+async def fetch_recentMatches(puuid: str, count: int = 5):
     """
     Returns recent match IDs for a given PUUID.
     """
     try:
-        matches = riot_client.get_recentMatches(puuid, count)
+        matches = await data_source.source.get_recentMatches_async(puuid, count)
         return {"matches": matches}
     except RiotAPIError as error:
         raise HTTPException(status_code=404, detail=str(error))
@@ -43,40 +75,234 @@ def fetch_recentMatches(puuid: str, count: int = 5):
         raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
 
 @app.get("/match-details/{match_id}")
-def fetch_matchFullDetails(match_id: str):
+async def fetch_matchFullDetails(match_id: str):
     """
     Returns a full match details for a given match ID.
     """
     try:
-        details = riot_client.get_matchDetails(match_id)
-        return {"match_details": details}
+        details = await data_source.source.get_matchDetails_async(match_id)
+        return await json_response({"match_details": details})
     except RiotAPIError as error:
         raise HTTPException(status_code=404, detail=str(error))
     except Exception as error:
         raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
     
 @app.get("/match-timeline/{match_id}")
-def fetch_matchFullEvents(match_id: str):
+async def fetch_matchFullEvents(match_id: str):
     """
     Returns a full match timeline for a given match ID.
     """
     try:
-        details = riot_client.get_matchTimeline(match_id)
-        return {"match_timeline": details}
+        details = await data_source.source.get_matchTimeline_async(match_id)
+        return await json_response({"match_timeline": details})
     except RiotAPIError as error:
         raise HTTPException(status_code=404, detail=str(error))
     except Exception as error:
         raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
     
 @app.get("/player-summary/{puuid}/{match_id}")
-def fetch_playerSummary(puuid: str, match_id: str):
+async def fetch_playerSummary(puuid: str, match_id: str):
     """
     Returns a summary of player-specific stats and timeline for a given match ID and PUUID.
     """
     try:
-        summary = player_summary.get_playerSummary(puuid, match_id)
+        summary = await player_summary.get_playerSummary_async(puuid, match_id)
         return {"player_summary": summary}
     except RiotAPIError as error:
         raise HTTPException(status_code=404, detail=str(error))
     except Exception as error:
-        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+@app.get("/player-insights/{puuid}")
+async def fetch_playerMultiInsights(puuid: str, count: int = 5):
+    """
+    Returns LLM coaching feedback for each recent match of a given PUUID and across them, from a single LLM request.
+    Matches whose summary cannot be built are reported per match and left out of the review.
+    """
+    try:
+        match_ids = await data_source.source.get_recentMatches_async(puuid, count)
+        summaries = await player_summary.get_playerSummaries_async(puuid, match_ids)
+
+        player_summaries = {entry["match_id"]: entry["player_summary"] for entry in summaries if "player_summary" in entry}
+        failed_matches = [entry for entry in summaries if "error" in entry]
+        insights = await llm_analysis.generate_multiInsights_async(player_summaries) if player_summaries else {"matches": [], "overall": None}
+
+        return {"player_insights": insights, "failed_matches": failed_matches}
+    except RiotAPIError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+@app.get("/player-insights/{puuid}/{match_id}")
+async def stream_playerInsights(puuid: str, match_id: str):
+    """
+    Streams LLM coaching feedback for a given match ID and PUUID as server-sent events, token by token.
+    The player summary is built from the cached match payloads when available.
+    """
+    try:
+        summary = await player_summary.get_playerSummary_async(puuid, match_id)
+    except RiotAPIError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+    if not summary["player_stats"]:
+        raise HTTPException(status_code=404, detail=f"Player {puuid} not found in match {match_id}")
+
+    async def sse_stream():
+        try:
+            async for text in llm_analysis.stream_insights_async(summary):
+                yield f"event: token\ndata: {json.dumps(text)}\n\n"
+        except Exception as error:
+            # headers are already sent, so the failure is reported as the last event
+            error_entry = {"status_code": 500, "detail": "Internal Server Error: " + str(error)}
+            yield f"event: error\ndata: {json.dumps(error_entry)}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(sse_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/player-frame-series/{puuid}/{match_id}")
+async def fetch_playerFrameSeries(puuid: str, match_id: str):
+    """
+    Returns the per-minute stats of a player for a given match ID as columns, with per-frame deltas and per-minute rates.
+    """
+    try:
+        series = await player_summary.get_playerFrameSeries_async(puuid, match_id)
+    except RiotAPIError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"Player {puuid} not found in match {match_id}")
+
+    return {
+        "frame_series": series.to_dict(),
+        "gold_deltas": series.deltas("totalGold").tolist(),
+        "cs_per_minute": series.per_minute("cs").tolist(),
+        "gold_per_minute": series.per_minute("totalGold").tolist()
+    }
+
+@app.get("/match-summary/{match_id}")
+async def fetch_matchSummary(match_id: str):
+    """
+    Returns the stats and timeline of all ten participants of a given match ID in one response.
+    """
+    try:
+        summary = await player_summary.get_matchSummary_async(match_id)
+        return await json_response({"match_summary": summary})
+    except RiotAPIError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+@app.get("/player-summaries/{puuid}")
+async def fetch_playerSummaries(puuid: str, count: int = 5):
+    """
+    Returns the player summaries of the recent matches of a given PUUID in one response.
+    Matches that fail are reported per match instead of failing the whole batch.
+    """
+    try:
+        match_ids = await data_source.source.get_recentMatches_async(puuid, count)
+        summaries = await player_summary.get_playerSummaries_async(puuid, match_ids)
+        return {"player_summaries": summaries}
+    except RiotAPIError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+@app.get("/player-aggregate/{puuid}")
+async def fetch_playerAggregate(puuid: str, count: int = 20, incremental: bool = False):
+    """
+    Returns the aggregate stats (win rates per champion and role, KDA and per-minute distributions)
+    of the recent matches of a given PUUID.
+    With incremental=true, the persisted aggregates of every match seen so far are updated with the new matches only.
+    """
+    try:
+        if incremental:
+            aggregate = await player_aggregate.get_playerAggregate_incremental_async(puuid, count)
+        else:
+            aggregate = await player_aggregate.get_playerAggregate_async(puuid, count)
+        return {"player_aggregate": aggregate}
+    except RiotAPIError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+@app.get("/match-history/{puuid}")
+async def crawl_matchHistory(puuid: str, start: int = 0, queue: int | None = None, startTime: int | None = None,
+                             endTime: int | None = None, limit: int = Query(100, ge=1, le=MATCH_HISTORY_MAX_LIMIT)):
+    """
+    Crawls up to `limit` matches of the match history of a given PUUID into the cache, paging through the match IDs
+    from `start` with optional queue and time filters. Matches already cached are not fetched again.
+    `limit` is capped at MATCH_HISTORY_MAX_LIMIT, so one request cannot start an unbounded crawl against the rate limit.
+    """
+    try:
+        history = await match_history.crawl_matchHistory_async(puuid, start, queue, startTime, endTime, limit)
+        return {"match_history": history}
+    except RiotAPIError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+@app.get("/player-summaries/{puuid}/stream")
+async def stream_playerSummaries(puuid: str, count: int = 5, format: Literal["ndjson", "sse"] = "ndjson"):
+    """
+    Streams the player summaries of the recent matches of a given PUUID, each one as soon as it is ready.
+    Uses newline-delimited JSON by default, or server-sent events with format=sse.
+    """
+    try:
+        match_ids = await data_source.source.get_recentMatches_async(puuid, count)
+    except RiotAPIError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+    async def ndjson_stream():
+        async for entry in player_summary.iter_playerSummaries_async(puuid, match_ids):
+            yield json.dumps(entry) + "\n"
+
+    async def sse_stream():
+        async for entry in player_summary.iter_playerSummaries_async(puuid, match_ids):
+            yield f"event: player_summary\ndata: {json.dumps(entry)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    if format == "sse":
+        return StreamingResponse(sse_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+@app.get("/player-matches/{puuid}")
+async def fetch_playerMatches(puuid: str, champion: str | None = None, role: str | None = None, patch: str | None = None,
+                              queue: int | None = None, limit: int = 100):
+    """
+    Returns the matches of a given PUUID stored in the local warehouse, newest first, filtered by champion, role,
+    patch (or patch=latest) and queue. Matches get there through the summary, prefetch and match history endpoints.
+    """
+    warehouse = match_warehouse.warehouse
+    if warehouse is None:
+        raise HTTPException(status_code=503, detail="Match warehouse is disabled")
+
+    try:
+        matches = await asyncio.to_thread(warehouse.query_playerMatches, puuid, champion, role, patch, queue, limit)
+        return {"player_matches": matches}
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
+
+@app.get("/cache-metrics")
+def fetch_cacheMetrics():
+    """
+    Returns the hit rates of the in-memory memo and the on-disk Riot API cache.
+    """
+    try:
+        cache_metrics = {"enabled": False}
+        if riot_client.match_cache is not None:
+            cache_metrics = {"enabled": True, **riot_client.match_cache.metrics()}
+
+        memo_metrics = {"enabled": False}
+        if riot_client.memo_cache is not None:
+            memo_metrics = {"enabled": True, **riot_client.memo_cache.metrics()}
+
+        return {"cache_metrics": cache_metrics, "memo_metrics": memo_metrics}
+    except Exception as error:
+        raise HTTPException(status_code=500, detail="Internal Server Error: " + str(error))
@@ -0,0 +1,63 @@
+"""
+Rows of the match warehouse.
+Building the rows of a match has no side effects (no config, no database), so the bulk loader's worker processes
+import this module without creating the shared MatchWarehouse of match_warehouse.
+"""
+
+import json
+import zlib
+
+# normalized columns of a row, filled from the extracted player stats
+STAT_COLUMNS = {
+    "champion": "champion",
+    "role": "role",
+    "win": "win",
+    "kills": "kills",
+    "deaths": "deaths",
+    "assists": "assists",
+    "cs": "cs",
+    "total_gold": "totalGold",
+    "total_damage": "totalDamage",
+    "vision_score": "visionScore",
+}
+
+ROW_COLUMNS = ("match_id", "puuid", "participant_id", "patch", "queue_id", "game_creation", "game_duration", *STAT_COLUMNS)
+
+def parse_patch(game_version: str | None) -> str | None:
+    """
+    Returns the patch of a game version (ex: "14.20" for "14.20.628.1234").
+    """
+    if not game_version:
+        return None
+    return ".".join(game_version.split(".")[:2])
+
+def build_rows(match_details: dict, match_summary: list[dict]) -> list[tuple]:
+    """
+    Builds the warehouse rows of a match. The serialization and compression happen here, outside of any
+    transaction, so bulk loaders can run it in worker processes.
+
+    Args:
+        match_details (dict): The raw match details, for the patch, queue and game times.
+        match_summary (list[dict]): The entries of player_summary.extract_matchSummary.
+
+    Returns:
+        list: One tuple per participant, in the column order of MatchWarehouse.insert_rows.
+    """
+    if not match_details or "info" not in match_details:
+        return []
+
+    info = match_details["info"]
+    match_id = match_details.get("metadata", {}).get("matchId") or info.get("gameId")
+    rows = []
+    for entry in match_summary:
+        player_stats = entry["player_stats"]
+        timeline = entry.get("player_timeline")
+        rows.append((
+            str(match_id), entry["puuid"], entry.get("participantId"), parse_patch(info.get("gameVersion")),
+            info.get("queueId"), info.get("gameCreation"), info.get("gameDuration"),
+            *(player_stats.get(key) for key in STAT_COLUMNS.values()),
+            json.dumps(player_stats, separators=(",", ":")),
+            zlib.compress(json.dumps(timeline, separators=(",", ":")).encode("utf-8")) if timeline is not None else None
+        ))
+
+    return rows
@@ -0,0 +1,222 @@
+"""
+SQLite store of the match warehouse.
+Opening a MatchWarehouse has no side effects at import, so tools writing to their own database (ex: bulk_ingest
+--warehouse) import this module without creating the shared warehouse of match_warehouse.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+
+from backend.python_legacy.warehouse_rows import ROW_COLUMNS, build_rows
+
+logger = logging.getLogger(__name__)
+
+class MatchWarehouse:
+    """
+    SQLite store of one row per participant of every ingested match.
+
+    Args:
+        path (str): The path of the SQLite database file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connect()
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS participants (
+                match_id TEXT NOT NULL,
+                puuid TEXT NOT NULL,
+                participant_id INTEGER,
+                patch TEXT,
+                queue_id INTEGER,
+                game_creation INTEGER,
+                game_duration INTEGER,
+                champion TEXT,
+                role TEXT,
+                win INTEGER,
+                kills INTEGER,
+                deaths INTEGER,
+                assists INTEGER,
+                cs INTEGER,
+                total_gold INTEGER,
+                total_damage INTEGER,
+                vision_score INTEGER,
+                player_stats TEXT NOT NULL,
+                player_timeline BLOB,
+                PRIMARY KEY (match_id, puuid)
+            )
+            """
+        )
+        # every player query filters on puuid first, then on at most a few of these columns
+        for columns in (
+            "puuid, game_creation", "puuid, champion, patch", "puuid, role, patch", "puuid, patch", "puuid, queue_id", "champion, patch"
+        ):
+            name = "idx_participants_" + columns.replace(", ", "_")
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON participants ({columns})")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Returns the SQLite connection of the current thread, opening it on first use.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def ingest_match(self, match_details: dict, match_summary: list[dict]):
+        """
+        Stores the rows of a match. A row ingested without a timeline keeps the timeline stored before, if any.
+
+        Args:
+            match_details (dict): The raw match details, for the patch, queue and game times.
+            match_summary (list[dict]): The entries of player_summary.extract_matchSummary. An entry whose
+                "player_timeline" is None is stored without a timeline.
+        """
+        self.insert_rows(build_rows(match_details, match_summary))
+
+    def insert_rows(self, rows: list[tuple]):
+        """
+        Stores rows built by build_rows in one transaction.
+        """
+        if not rows:
+            return
+
+        try:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    f"""
+                    INSERT INTO participants ({", ".join(ROW_COLUMNS)}, player_stats, player_timeline)
+                    VALUES ({", ".join("?" * (len(ROW_COLUMNS) + 2))})
+                    ON CONFLICT (match_id, puuid) DO UPDATE SET
+                        {", ".join(f"{column} = excluded.{column}" for column in ROW_COLUMNS[2:])},
+                        player_stats = excluded.player_stats,
+                        player_timeline = COALESCE(excluded.player_timeline, player_timeline)
+                    """,
+                    rows
+                )
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+
+        except sqlite3.Error as error:
+            logger.warning(f"Warehouse write failed for {rows[0][0]}: {error}")
+
+    def known_matchIds(self, match_ids: list[str]) -> set[str]:
+        """
+        Returns the match IDs that have rows in the warehouse.
+        """
+        found = set()
+        connection = self._connect()
+        # stay under SQLite's limit of bound parameters per statement
+        for offset in range(0, len(match_ids), 500):
+            chunk = match_ids[offset:offset + 500]
+            rows = connection.execute(f"SELECT DISTINCT match_id FROM participants WHERE match_id IN ({','.join('?' * len(chunk))})", chunk)
+            found.update(match_id for match_id, in rows)
+        return found
+
+    def get_playerSummary(self, puuid: str, match_id: str) -> dict | None:
+        """
+        Returns the stored summary of a player in a match, as player_summary.get_playerSummary builds it.
+
+        Returns:
+            dict | None: "player_stats" and "player_timeline", or None if the row or its timeline is not stored.
+        """
+        row = self._connect().execute(
+            "SELECT player_stats, player_timeline FROM participants WHERE match_id = ? AND puuid = ?", (match_id, puuid)
+        ).fetchone()
+        if row is None or row[1] is None:
+            return None
+
+        return {"player_stats": json.loads(row[0]), "player_timeline": json.loads(zlib.decompress(row[1]))}
+
+    def get_matchSummary(self, match_id: str) -> list[dict] | None:
+        """
+        Returns the stored summary of every participant of a match, as player_summary.get_matchSummary builds it.
+
+        Returns:
+            list | None: The entries in participant order, or None if the match or one of its timelines is not stored.
+        """
+        rows = self._connect().execute(
+            "SELECT puuid, participant_id, player_stats, player_timeline FROM participants WHERE match_id = ? ORDER BY participant_id",
+            (match_id,)
+        ).fetchall()
+        if not rows or any(row[3] is None for row in rows):
+            return None
+
+        return [
+            {"puuid": puuid, "participantId": participantId, "player_stats": json.loads(stats), "player_timeline": json.loads(zlib.decompress(timeline))}
+            for puuid, participantId, stats, timeline in rows
+        ]
+
+    def query_playerMatches(self, puuid: str, champion: str | None = None, role: str | None = None, patch: str | None = None,
+                            queue: int | None = None, limit: int = 100) -> list[dict]:
+        """
+        Returns the stored matches of a player, newest first, optionally filtered.
+
+        Args:
+            puuid (str): The PUUID of the player.
+            champion (str | None): Only games on this champion (ex: "Jinx").
+            role (str | None): Only games in this team position (ex: "BOTTOM").
+            patch (str | None): Only games of this patch (ex: "14.20"), or "latest" for the newest stored patch.
+            queue (int | None): Only games of this queue ID.
+            limit (int): The maximum number of matches.
+
+        Returns:
+            list: One dictionary per match with the normalized columns and "player_stats".
+        """
+        connection = self._connect()
+        if patch == "latest":
+            patch = self.latest_patch()
+
+        conditions, parameters = ["puuid = ?"], [puuid]
+        for column, value in (("champion", champion), ("role", role), ("patch", patch), ("queue_id", queue)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+
+        rows = connection.execute(
+            f"""
+            SELECT {", ".join(ROW_COLUMNS)}, player_stats FROM participants
+            WHERE {" AND ".join(conditions)}
+            ORDER BY game_creation DESC LIMIT ?
+            """,
+            (*parameters, limit)
+        )
+
+        matches = []
+        for row in rows:
+            match = dict(zip(ROW_COLUMNS, row))
+            match["win"] = bool(match["win"]) if match["win"] is not None else None
+            match["player_stats"] = json.loads(row[-1])
+            matches.append(match)
+        return matches
+
+    def latest_patch(self) -> str | None:
+        """
+        Returns the newest patch with stored games.
+        """
+        patches = [patch for patch, in self._connect().execute("SELECT DISTINCT patch FROM participants WHERE patch IS NOT NULL")]
+        return max(patches, key=lambda patch: tuple(int(part) for part in patch.split(".") if part.isdigit()), default=None)
+
+    def metrics(self) -> dict:
+        """
+        Returns the number of stored matches and participant rows.
+        """
+        matches, rows = self._connect().execute("SELECT COUNT(DISTINCT match_id), COUNT(*) FROM participants").fetchone()
+        return {"matches": matches, "rows": rows}
@@ -0,0 +1,16 @@
+# Pytest setup file for the python_legacy tests
+# Set required environment variables for tests before the config module is imported
+
+import os
+
+os.environ.setdefault("REGION", "americas")
+os.environ.setdefault("PLATFORM_REGION", "na1")
+# keep tests off the caches so every call reaches the mocked transport
+os.environ.setdefault("RIOT_CACHE_ENABLED", "false")
+os.environ.setdefault("RIOT_MEMO_ENABLED", "false")
+os.environ.setdefault("RIOT_RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("MATCH_WAREHOUSE_ENABLED", "false")
+os.environ.setdefault("LLM_INSIGHTS_CACHE_ENABLED", "false")
+os.environ.setdefault("LLM_INSIGHTS_MEMO_ENTRIES", "0")
+# with the caches off, "auto" would stream every timeline: keep the indexed path unless a test opts in
+os.environ.setdefault("TIMELINE_STREAM", "false")
@@ -0,0 +1,180 @@
+# Test suite for the async Riot API client functions
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+
+from backend.python_legacy import async_riot_client
+from backend.python_legacy.async_riot_client import get_PUUID, get_recentMatches, get_matchIds, get_matchDetails, get_matchTimeline
+from backend.python_legacy.memo_cache import MemoCache
+from backend.python_legacy.riot_client import RiotAPIError
+
+error_cases = [
+    (400, "Bad request"),
+    (401, "Unauthorized"),
+    (403, "Forbidden"),
+    (404, "Data not found"),
+    (429, "Rate limit exceeded"),
+    (500, "Internal server error"),
+    (503, "Service unavailable"),
+]
+
+def run_with_transport(handler, coroutine_function, *args):
+    """
+    Runs the coroutine function against an httpx.MockTransport and returns its result with the requests sent.
+    """
+    requests_sent = []
+
+    async def recording_handler(request):
+        requests_sent.append(request)
+        await asyncio.sleep(0)  # yield like a real network round trip would
+        return handler(request)
+
+    async def main():
+        client = async_riot_client.create_client(transport=httpx.MockTransport(recording_handler))
+        with patch("backend.python_legacy.async_riot_client.get_client", return_value=client), \
+             patch("backend.python_legacy.async_riot_client.RIOT_RETRY_BACKOFF", 0):
+            try:
+                return await coroutine_function(*args)
+            finally:
+                await client.aclose()
+
+    return asyncio.run(main()), requests_sent
+
+@pytest.mark.async_riot_client
+class TestAsyncRiotClient:
+    """
+    Test suite for the async riot client functions.
+    """
+    def setup_method(self):
+        self.gameName = "GNR nomsy"
+        self.tagLine = "stuck"
+        self.puuid = "1234-5678-8765-4321"
+        self.matchId = "matchId_1"
+
+    def test_get_PUUID(self):
+        result, requests_sent = run_with_transport(
+            lambda request: httpx.Response(200, json={"puuid": self.puuid}),
+            get_PUUID, self.gameName, self.tagLine
+        )
+
+        assert result == self.puuid
+        assert len(requests_sent) == 1
+        assert requests_sent[0].url == httpx.URL(f"https://americas.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{self.gameName}/{self.tagLine}")
+
+    def test_get_recentMatches(self):
+        response = ["matchId_1", "matchId_2", "matchId_3"]
+        result, requests_sent = run_with_transport(
+            lambda request: httpx.Response(200, json=response),
+            get_recentMatches, self.puuid, 3
+        )
+
+        assert result == response
+        assert requests_sent[0].url == httpx.URL(f"https://americas.api.riotgames.com/lol/match/v5/matches/by-puuid/{self.puuid}/ids?count=3")
+
+    def test_get_matchIds(self):
+        result, requests_sent = run_with_transport(
+            lambda request: httpx.Response(200, json=["matchId_101"]),
+            get_matchIds, self.puuid, 100, 100, 420, 1700000000
+        )
+
+        assert result == ["matchId_101"]
+        assert requests_sent[0].url == httpx.URL(
+            f"https://americas.api.riotgames.com/lol/match/v5/matches/by-puuid/{self.puuid}/ids?start=100&count=100&queue=420&startTime=1700000000"
+        )
+
+    def test_get_matchDetails(self):
+        response = {"metadata": {"matchId": self.matchId}, "info": {"gameId": 123456789}}
+        result, requests_sent = run_with_transport(
+            lambda request: httpx.Response(200, json=response),
+            get_matchDetails, self.matchId
+        )
+
+        assert result == response
+        assert requests_sent[0].url == httpx.URL(f"https://americas.api.riotgames.com/lol/match/v5/matches/{self.matchId}")
+
+    def test_get_matchTimeline(self):
+        response = {"metadata": {"matchId": self.matchId}, "info": {"frames": []}}
+        result, requests_sent = run_with_transport(
+            lambda request: httpx.Response(200, json=response),
+            get_matchTimeline, self.matchId
+        )
+
+        assert result == response
+        assert requests_sent[0].url == httpx.URL(f"https://americas.api.riotgames.com/lol/match/v5/matches/{self.matchId}/timeline")
+
+    @pytest.mark.parametrize("status_code, error_message", error_cases)
+    def test_get_matchDetails_error(self, status_code, error_message):
+        with pytest.raises(RiotAPIError) as exc_info:
+            run_with_transport(
+                lambda request: httpx.Response(status_code, text=error_message),
+                get_matchDetails, self.matchId
+            )
+
+        assert str(exc_info.value) == f"API request failed: {status_code} - {error_message}"
+        assert exc_info.value.status_code == status_code
+
+    def test_transient_errors_retried(self):
+        statuses = iter([503, 500])
+
+        def handler(request):
+            status_code = next(statuses, 200)
+            if status_code != 200:
+                return httpx.Response(status_code, text="Service unavailable")
+            return httpx.Response(200, json={"metadata": {"matchId": self.matchId}})
+
+        result, requests_sent = run_with_transport(handler, get_matchDetails, self.matchId)
+
+        assert result == {"metadata": {"matchId": self.matchId}}
+        assert len(requests_sent) == 3
+
+    @patch("backend.python_legacy.async_riot_client.RIOT_MAX_RETRIES", 2)
+    def test_transient_errors_retries_run_out(self):
+        requests_sent = []
+
+        def handler(request):
+            requests_sent.append(request)
+            return httpx.Response(502, text="Bad gateway")
+
+        with pytest.raises(RiotAPIError) as exc_info:
+            run_with_transport(handler, get_matchDetails, self.matchId)
+
+        assert exc_info.value.status_code == 502
+        # the first request and two retries
+        assert len(requests_sent) == 3
+
+    def test_client_errors_not_retried(self):
+        requests_sent = []
+
+        def handler(request):
+            requests_sent.append(request)
+            return httpx.Response(404, text="Data not found")
+
+        with pytest.raises(RiotAPIError):
+            run_with_transport(handler, get_matchDetails, self.matchId)
+
+        assert len(requests_sent) == 1
+
+    def test_network_error(self):
+        def handler(request):
+            raise httpx.ConnectError("Connection refused", request=request)
+
+        with pytest.raises(RiotAPIError) as exc_info:
+            run_with_transport(handler, get_matchTimeline, self.matchId)
+
+        assert str(exc_info.value) == "Network error occurred: Connection refused"
+
+    def test_concurrent_lookups_coalesced(self):
+        response = {"metadata": {"matchId": self.matchId}, "info": {"gameId": 123456789}}
+
+        async def fetch_many():
+            return await asyncio.gather(*(get_matchDetails(self.matchId) for _ in range(20)))
+
+        memo = MemoCache(max_entries=8)
+        with patch("backend.python_legacy.riot_client.memo_cache", memo):
+            results, requests_sent = run_with_transport(lambda request: httpx.Response(200, json=response), fetch_many)
+
+        assert results == [response] * 20
+        assert len(requests_sent) == 1
+        assert memo.metrics()["coalesced"] == 19
@@ -0,0 +1,112 @@
+# Test suite for the offline bulk ingestion of match dumps.
+
+import gzip
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+from backend.python_legacy.bulk_ingest import find_dumps, main
+from backend.python_legacy.match_extraction import build_timelineIndex, extract_matchSummary
+from backend.python_legacy.match_warehouse import MatchWarehouse
+
+def make_matchDetails(match_id:str) -> dict:
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {"gameVersion": "14.20.628.1", "queueId": 420, "gameCreation": 1000, "gameDuration": 1800, "participants": [{
+            "participantId": 1, "puuid": "me", "championName": "Jinx", "teamPosition": "BOTTOM", "kills": 5, "deaths": 1,
+            "assists": 2, "totalMinionsKilled": 100, "neutralMinionsKilled": 0, "challenges": {"kda": 7.0}, "win": True
+        }]}
+    }
+
+def make_matchTimeline(match_id:str) -> dict:
+    return {
+        "metadata": {"matchId": match_id, "participants": ["me"]},
+        "info": {
+            "frames": [{
+                "timestamp": 60000,
+                "events": [{"type": "CHAMPION_KILL", "killerId": 1, "victimId": 6, "timestamp": 60005}],
+                "participantFrames": {"1": {"participantId": 1, "level": 2}}
+            }],
+            "participants": [{"participantId": 1, "puuid": "me"}]
+        }
+    }
+
+@pytest.mark.bulk_ingest
+class TestBulkIngest:
+    """
+    Test suite for the bulk ingestion command.
+    """
+    @pytest.fixture
+    def dump_dir(self, tmp_path):
+        (tmp_path / "season").mkdir()
+        for match_id in ("NA1_1", "NA1_2"):
+            (tmp_path / "season" / f"{match_id}.json").write_text(json.dumps(make_matchDetails(match_id)))
+        with gzip.open(tmp_path / "season" / "NA1_1_timeline.json.gz", "wt") as file:
+            json.dump(make_matchTimeline("NA1_1"), file)
+        (tmp_path / "NA1_3.json").write_text("{not json")
+        (tmp_path / "notes.txt").write_text("ignored")
+        return tmp_path
+
+    def test_find_dumps(self, dump_dir):
+        dumps = find_dumps(str(dump_dir))
+
+        assert [(match_id, timeline is not None) for match_id, _, timeline in dumps] == [("NA1_1", True), ("NA1_2", False), ("NA1_3", False)]
+
+    def test_jsonl_output(self, dump_dir, tmp_path, capsys):
+        output = tmp_path / "summaries.jsonl.gz"
+
+        main([str(dump_dir), "--output", str(output), "--workers", "2"])
+
+        with gzip.open(output, "rt") as file:
+            records = [json.loads(line) for line in file]
+        assert [record["match_id"] for record in records] == ["NA1_1", "NA1_2"]
+        assert records[0]["match_summary"] == extract_matchSummary(make_matchDetails("NA1_1"), build_timelineIndex(make_matchTimeline("NA1_1")))
+        assert records[1]["match_summary"][0]["player_timeline"] is None
+        assert records[0]["info"]["queueId"] == 420
+
+        captured = capsys.readouterr()
+        assert "ingested 2 matches (1 failed)" in captured.out
+        assert "matches/sec" in captured.out
+        assert "failed NA1_3: JSONDecodeError" in captured.err
+
+    def test_warehouse_output(self, dump_dir, tmp_path):
+        path = str(tmp_path / "warehouse.sqlite3")
+
+        main([str(dump_dir), "--warehouse", path, "--workers", "1"])
+
+        warehouse = MatchWarehouse(path)
+        assert sorted(match["match_id"] for match in warehouse.query_playerMatches("me", champion="Jinx", patch="14.20")) == ["NA1_1", "NA1_2"]
+        assert warehouse.get_playerSummary("me", "NA1_1")["player_timeline"][0]["timestamp"] == 1
+
+    def test_warehouse_output_without_shared_warehouse(self, dump_dir, tmp_path):
+        # --warehouse writes only to the given database, the shared warehouse (and its file) is never created
+        path = tmp_path / "warehouse.sqlite3"
+        shared_path = tmp_path / "shared" / "match_warehouse.sqlite3"
+        environment = {**os.environ, "MATCH_WAREHOUSE_ENABLED": "true", "MATCH_WAREHOUSE_PATH": str(shared_path)}
+
+        command = [sys.executable, "-m", "backend.python_legacy.bulk_ingest", str(dump_dir), "--warehouse", str(path), "--workers", "1"]
+        assert subprocess.run(command, env=environment, capture_output=True).returncode == 0
+
+        assert MatchWarehouse(str(path)).metrics()["matches"] == 2
+        assert not shared_path.parent.exists()
+
+    def test_runs_without_riot_client(self):
+        script = (
+            "import sys, backend.python_legacy.bulk_ingest; "
+            "sys.exit('backend.python_legacy.riot_client' in sys.modules or 'backend.python_legacy.config' in sys.modules)"
+        )
+
+        assert subprocess.run([sys.executable, "-c", script]).returncode == 0
+
+    def test_warehouse_rows_without_warehouse(self):
+        # the workers build warehouse rows without creating the shared MatchWarehouse (and its database file)
+        script = (
+            "import sys; from backend.python_legacy.bulk_ingest import encode_warehouseRows; "
+            "rows = encode_warehouseRows({'match_id': 'NA1_1', 'info': {'gameVersion': '14.20.1'}, 'match_summary': "
+            "[{'puuid': 'me', 'participantId': 1, 'player_stats': {'champion': 'Jinx'}, 'player_timeline': None}]}); "
+            "sys.exit(len(rows) != 1 or rows[0][3] != '14.20' or 'backend.python_legacy.match_warehouse' in sys.modules)"
+        )
+
+        assert subprocess.run([sys.executable, "-c", script]).returncode == 0
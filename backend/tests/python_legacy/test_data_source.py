@@ -0,0 +1,192 @@
+# Test suite for the pluggable data sources.
+
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from backend.python_legacy import data_source
+from backend.python_legacy.data_source import (
+    CachedDataSource, DataSource, FixtureDataSource, LiveDataSource, create_source, record_fixtures, write_fixture
+)
+from backend.python_legacy.match_cache import MatchCache
+from backend.python_legacy.match_warehouse import MatchWarehouse
+from backend.python_legacy.player_summary import get_matchSummary_async, get_playerSummary, get_timelineIndex
+from backend.python_legacy.memo_cache import MemoCache
+from backend.python_legacy.riot_client import RiotAPIError, matchIds_query
+from backend.python_legacy.server import app
+
+def make_match(match_id:str, gameCreation:int, queueId:int = 420) -> dict:
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {
+            "gameCreation": gameCreation, "gameDuration": 1800, "gameVersion": "14.20.1", "queueId": queueId,
+            "participants": [{
+                "participantId": 1, "puuid": "me", "championName": "Jinx", "teamPosition": "BOTTOM", "kills": 5, "deaths": 1,
+                "assists": 2, "totalMinionsKilled": 100, "neutralMinionsKilled": 10, "goldEarned": 9000, "challenges": {}, "win": True
+            }]
+        }
+    }
+
+def make_timeline(match_id:str) -> dict:
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {
+            "frames": [{
+                "timestamp": 60000,
+                "events": [{"type": "CHAMPION_KILL", "killerId": 1, "victimId": 6, "timestamp": 60005}],
+                "participantFrames": {"1": {"participantId": 1, "level": 2}}
+            }],
+            "participants": [{"participantId": 1, "puuid": "me"}]
+        }
+    }
+
+@pytest.fixture
+def corpus(tmp_path):
+    directory = str(tmp_path)
+    write_fixture(directory, "accounts", "nomsy#stuck", {"puuid": "me"})
+    write_fixture(directory, "match-ids", "me", ["NA1_3", "NA1_2", "NA1_1"])
+    for match_id, created, queue in (("NA1_3", 3000_000, 400), ("NA1_2", 2000_000, 420), ("NA1_1", 1000_000, 420)):
+        write_fixture(directory, "matches", match_id, make_match(match_id, created, queue))
+        write_fixture(directory, "timelines", match_id, make_timeline(match_id), compress=True)
+    return directory
+
+@pytest.mark.data_source
+class TestFixtureDataSource:
+    """
+    Test suite for the fixture-replay source.
+    """
+    def test_lookups(self, corpus):
+        source = FixtureDataSource(corpus)
+        assert source.get_PUUID("nomsy", "stuck") == "me"
+        assert source.get_recentMatches("me", 2) == ["NA1_3", "NA1_2"]
+        assert source.get_matchDetails("NA1_2")["info"]["gameCreation"] == 2000_000
+        # timelines are gzipped in the corpus
+        assert source.get_matchTimeline("NA1_1")["metadata"]["matchId"] == "NA1_1"
+        # parsed payloads are memoized
+        assert source.get_matchDetails("NA1_2") is source.get_matchDetails("NA1_2")
+
+    def test_matchIds_filters(self, corpus):
+        source = FixtureDataSource(corpus)
+        assert source.get_matchIds("me", start=1, count=5) == ["NA1_2", "NA1_1"]
+        assert source.get_matchIds("me", queue=420) == ["NA1_2", "NA1_1"]
+        assert source.get_matchIds("me", startTime=1500, endTime=2500) == ["NA1_2"]
+
+    def test_missing_payload(self, corpus):
+        source = FixtureDataSource(corpus)
+        with pytest.raises(RiotAPIError) as error:
+            source.get_matchDetails("NA1_404")
+        assert error.value.status_code == 404
+
+    def test_async_and_stream(self, corpus):
+        source = FixtureDataSource(corpus)
+        assert asyncio.run(source.get_recentMatches_async("me", 1)) == ["NA1_3"]
+        with source.open_matchTimeline("NA1_3") as stream:
+            assert json.load(stream)["metadata"]["matchId"] == "NA1_3"
+
+    def test_record_fixtures(self, corpus, tmp_path):
+        recorded = str(tmp_path / "recorded")
+        assert record_fixtures(recorded, "nomsy", "stuck", 2, source=FixtureDataSource(corpus)) == 2
+        replay = FixtureDataSource(recorded)
+        assert replay.get_recentMatches("me", 5) == ["NA1_3", "NA1_2"]
+        assert replay.get_matchTimeline("NA1_2") == make_timeline("NA1_2")
+
+@pytest.mark.data_source
+class TestCachedDataSource:
+    """
+    Test suite for the cache-only source.
+    """
+    def test_reads_the_caches(self, tmp_path):
+        match_cache = MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+        match_cache.set("match-details:NA1_1", make_match("NA1_1", 1000))
+        match_cache.set(f"match-ids:me:{matchIds_query(0, 100, 420)}", ["NA1_1"])
+        memo_cache = MemoCache(8)
+        memo_cache.get_or_load("puuid:nomsy#stuck", lambda: {"puuid": "me"})
+
+        with patch("backend.python_legacy.riot_client.match_cache", match_cache), \
+             patch("backend.python_legacy.riot_client.memo_cache", memo_cache), \
+             patch("backend.python_legacy.riot_client.requests.Session.get") as mock_get:
+            source = CachedDataSource()
+            assert source.get_PUUID("nomsy", "stuck") == "me"
+            assert source.get_matchDetails("NA1_1")["metadata"]["matchId"] == "NA1_1"
+            assert source.get_matchIds("me", queue=420) == ["NA1_1"]
+            with pytest.raises(RiotAPIError) as error:
+                source.get_matchTimeline("NA1_1")
+            assert error.value.status_code == 404
+            mock_get.assert_not_called()
+
+@pytest.mark.data_source
+class TestCreateSource:
+    """
+    Test suite for the source selection.
+    """
+    def test_create_source(self, corpus):
+        assert isinstance(create_source("live"), LiveDataSource)
+        assert isinstance(create_source("cached"), CachedDataSource)
+        assert isinstance(create_source("fixture", corpus), FixtureDataSource)
+        with pytest.raises(ValueError):
+            create_source("fixture")
+        with pytest.raises(ValueError):
+            create_source("replay")
+
+@pytest.mark.data_source
+class TestDataSourceInterface:
+    """
+    Test suite for the abstract interface and the writes of the non-live sources.
+    """
+    def test_abstract(self):
+        class PartialSource(DataSource):
+            def get_PUUID(self, gameName, tagLine):
+                return "me"
+
+        with pytest.raises(TypeError):
+            DataSource()
+        with pytest.raises(TypeError):
+            PartialSource()
+
+    def test_fixture_source_writes_no_shared_store(self, corpus, tmp_path):
+        match_cache = MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+        source = FixtureDataSource(corpus)
+
+        with patch.object(data_source, "source", source), \
+             patch("backend.python_legacy.riot_client.match_cache", match_cache), \
+             patch("backend.python_legacy.riot_client.memo_cache", MemoCache(8)) as memo_cache, \
+             patch("backend.python_legacy.match_warehouse.warehouse", warehouse):
+            assert get_playerSummary("me", "NA1_2")["player_stats"]["champion"] == "Jinx"
+            assert len(asyncio.run(get_matchSummary_async("NA1_1"))) == 1
+            # the timeline index is memoized by the fixture source itself
+            assert get_timelineIndex("NA1_2") is get_timelineIndex("NA1_2")
+            assert data_source.writable_warehouse() is None
+
+        assert match_cache.get("match-timeline-index:NA1_2") is None
+        assert memo_cache.metrics()["entries"] == 0
+        assert warehouse.known_matchIds(["NA1_1", "NA1_2"]) == set()
+
+    def test_live_source_writes(self, tmp_path):
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+
+        with patch.object(data_source, "source", LiveDataSource()), \
+             patch("backend.python_legacy.match_warehouse.warehouse", warehouse):
+            assert data_source.writable_warehouse() is warehouse
+
+@pytest.mark.data_source
+class TestServerWithFixtures:
+    """
+    Runs the FastAPI stack against a fixture corpus.
+    """
+    def test_endpoints(self, corpus):
+        client = TestClient(app)
+        with patch.object(data_source, "source", FixtureDataSource(corpus)), \
+             patch("backend.python_legacy.riot_client.requests.Session.get") as mock_get:
+            assert client.get("/puuid/nomsy/stuck").json() == {"puuid": "me"}
+            assert client.get("/recent-matches/me?count=2").json() == {"matches": ["NA1_3", "NA1_2"]}
+            assert client.get("/match-details/NA1_1").status_code == 200
+
+            response = client.get("/player-summary/me/NA1_2")
+            assert response.status_code == 200
+            assert response.json()["player_summary"]["player_stats"]["champion"] == "Jinx"
+
+            assert client.get("/match-details/NA1_404").status_code == 404
+            mock_get.assert_not_called()
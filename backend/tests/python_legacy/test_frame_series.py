@@ -0,0 +1,108 @@
+# Test suite for the columnar frame series.
+
+import json
+import numpy as np
+import pytest
+
+from backend.python_legacy.frame_series import FrameSeries
+from backend.python_legacy.player_summary import extract_playerFrameSeries
+
+def make_frames() -> list[dict]:
+    """
+    Returns four frames of two participants with cumulative gold and CS.
+    """
+    frames = []
+    for minute in range(4):
+        frames.append({
+            "timestamp": minute * 60000 + (17 if minute else 0),
+            "events": [],
+            "participantFrames": {
+                str(participant): {
+                    "level": minute + 1,
+                    "xp": 280 * minute,
+                    "currentGold": 100 * minute,
+                    "totalGold": 500 + 400 * minute * participant,
+                    "minionsKilled": 6 * minute,
+                    "jungleMinionsKilled": participant,
+                    "position": {"x": 1000 + minute, "y": 2000 - minute},
+                    "damageStats": {"totalDamageDoneToChampions": 150 * minute, "totalDamageTaken": 90 * minute},
+                }
+                for participant in (1, 2)
+            }
+        })
+    return frames
+
+@pytest.mark.frame_series
+class TestFrameSeries:
+    """
+    Test suite for the FrameSeries class.
+    """
+    def setup_method(self):
+        self.series = FrameSeries.from_frames(make_frames(), 2)
+
+    def test_columns(self):
+        assert len(self.series) == 4
+        assert self.series.minutes.tolist() == [0, 1, 2, 3]
+        assert self.series["totalGold"].tolist() == [500, 1300, 2100, 2900]
+        assert self.series["cs"].tolist() == [2, 8, 14, 20]
+        assert self.series["positionX"].tolist() == [1000, 1001, 1002, 1003]
+        assert self.series["damageToChampions"].tolist() == [0, 150, 300, 450]
+        assert self.series["totalGold"].dtype == np.int32
+
+    def test_deltas(self):
+        assert self.series.deltas("totalGold").tolist() == [0, 800, 800, 800]
+        assert self.series.deltas("level").tolist() == [0, 1, 1, 1]
+
+    def test_per_minute(self):
+        assert self.series.per_minute("cs").tolist() == [0.0, 8.0, 7.0, 20 / 3]
+
+    def test_unknown_column(self):
+        with pytest.raises(KeyError):
+            self.series["kills"]
+
+    def test_to_dict(self):
+        series = self.series.to_dict()
+
+        assert json.loads(json.dumps(series)) == series
+        assert list(series) == ["minute", *self.series.columns]
+        assert series["cs"] == [2, 8, 14, 20]
+
+    def test_missing_participant_frame(self):
+        frames = make_frames()
+        del frames[1]["participantFrames"]["2"]
+
+        series = FrameSeries.from_frames(frames, 2)
+
+        assert series["totalGold"].tolist() == [500, 0, 2100, 2900]
+
+    def test_smaller_than_dict_frames(self):
+        frames = make_frames()
+
+        assert self.series.nbytes < len(json.dumps([frame["participantFrames"]["2"] for frame in frames]))
+
+    def test_empty(self):
+        series = FrameSeries.from_frames([], 1)
+
+        assert len(series) == 0
+        assert series.deltas("totalGold").tolist() == []
+        assert series.to_dict()["minute"] == []
+
+@pytest.mark.frame_series
+class TestExtractPlayerFrameSeries:
+    """
+    Test suite for the extract_playerFrameSeries function.
+    """
+    def test_extract(self):
+        frames = make_frames()
+        timeline = {"info": {"frames": frames, "participants": [{"participantId": 1, "puuid": "puuid-1"}, {"participantId": 2, "puuid": "puuid-2"}]}}
+
+        series = extract_playerFrameSeries("puuid-1", timeline)
+
+        assert series["totalGold"].tolist() == [500, 900, 1300, 1700]
+        assert timeline["info"]["frames"] == make_frames()
+
+    def test_unknown_puuid(self):
+        timeline = {"info": {"frames": make_frames(), "participants": [{"participantId": 1, "puuid": "puuid-1"}]}}
+
+        assert extract_playerFrameSeries("other-puuid", timeline) is None
+        assert extract_playerFrameSeries("puuid-1", {}) is None
@@ -0,0 +1,361 @@
+# Test suite for the LLM insight generation, run against local stub clients.
+
+import asyncio
+import json
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.python_legacy import llm_analysis
+from backend.python_legacy.llm_analysis import generate_insights, generate_insights_async, insights_cacheKey, stream_insights_async
+from backend.python_legacy.llm_analysis import CompletionSlots
+from backend.python_legacy.llm_analysis import generate_multiInsights, generate_multiInsights_async, parse_multiInsights, prepare_multiPrompt
+from backend.python_legacy.prompt_compaction import count_tokens
+from backend.python_legacy.match_cache import MatchCache
+
+mock_summary = {
+    "player_stats": {"champion": "Ahri", "kills": 10, "deaths": 2},
+    "player_timeline": [{"timestamp": 5, "events": [{"type": "CHAMPION_KILL", "killerId": 1}], "participantFrames": {"level": 6}}]
+}
+
+def make_response(content:str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+class StubClient:
+    """
+    Stands in for the OpenAI client: records the requests and tracks how many are in flight.
+    """
+    def __init__(self, delay:float = 0.0):
+        self.calls = []
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return make_response(f"feedback {len(self.calls)}")
+
+class AsyncStubClient(StubClient):
+    """
+    Stands in for the AsyncOpenAI client.
+    """
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return make_response(f"feedback {len(self.calls)}")
+
+@pytest.mark.llm_analysis
+class TestInsightsCacheKey:
+    """
+    Test suite for the insights cache key.
+    """
+    def test_normalized(self):
+        reordered = {"player_timeline": mock_summary["player_timeline"], "player_stats": {"deaths": 2, "kills": 10, "champion": "Ahri"}}
+
+        assert insights_cacheKey(reordered) == insights_cacheKey(mock_summary)
+
+    def test_model_and_prompt_version(self):
+        key = insights_cacheKey(mock_summary, "gpt-4o-mini")
+
+        assert key != insights_cacheKey(mock_summary, "gpt-3.5-turbo")
+        with patch("backend.python_legacy.llm_analysis.PROMPT_VERSION", "next"):
+            assert insights_cacheKey(mock_summary, "gpt-4o-mini") != key
+
+@pytest.mark.llm_analysis
+class TestGenerateInsights:
+    """
+    Test suite for the generate_insights function.
+    """
+    def test_request(self):
+        client = StubClient()
+
+        insights = generate_insights(mock_summary, model="stub-model", client=client)
+
+        assert insights == "feedback 1"
+        assert client.calls[0]["model"] == "stub-model"
+        assert client.calls[0]["messages"][0] == {"role": "system", "content": llm_analysis.SYSTEM_PROMPT}
+        assert "Ahri" in client.calls[0]["messages"][1]["content"]
+        # the clients are created with OPENAI_TIMEOUT, it is not repeated per request
+        assert "timeout" not in client.calls[0]
+
+    def test_cached(self, tmp_path):
+        client = StubClient()
+
+        with patch("backend.python_legacy.llm_analysis.insights_cache", MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)):
+            first = generate_insights(mock_summary, client=client)
+            second = generate_insights(dict(reversed(mock_summary.items())), client=client)
+
+        assert first == second == "feedback 1"
+        assert len(client.calls) == 1
+
+    def test_bounded_concurrency(self):
+        client = StubClient(delay=0.02)
+        summaries = [{**mock_summary, "player_stats": {"kills": index}} for index in range(8)]
+
+        with patch("backend.python_legacy.llm_analysis._completion_slots", CompletionSlots(2)):
+            threads = [threading.Thread(target=generate_insights, args=(summary,), kwargs={"client": client}) for summary in summaries]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(client.calls) == 8
+        assert client.max_in_flight == 2
+
+@pytest.mark.llm_analysis
+class TestGenerateInsightsAsync:
+    """
+    Test suite for the generate_insights_async function.
+    """
+    def test_identical_requests_share_one_completion(self):
+        client = AsyncStubClient(delay=0.01)
+
+        async def burst():
+            return await asyncio.gather(*(generate_insights_async(mock_summary, client=client) for _ in range(5)))
+
+        insights = asyncio.run(burst())
+
+        assert insights == ["feedback 1"] * 5
+        assert len(client.calls) == 1
+
+    def test_bounded_concurrency(self):
+        client = AsyncStubClient(delay=0.01)
+        summaries = [{**mock_summary, "player_stats": {"kills": index}} for index in range(6)]
+
+        async def burst():
+            return await asyncio.gather(*(generate_insights_async(summary, client=client) for summary in summaries))
+
+        with patch("backend.python_legacy.llm_analysis._completion_slots", CompletionSlots(3)):
+            insights = asyncio.run(burst())
+
+        assert len(insights) == 6
+        assert client.max_in_flight == 3
+
+    def test_limit_shared_with_sync_callers(self):
+        slots = CompletionSlots(2)
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+
+        def track(delta):
+            with lock:
+                in_flight[0] += delta
+                peak[0] = max(peak[0], in_flight[0])
+
+        def sync_call():
+            with slots:
+                track(1)
+                time.sleep(0.02)
+                track(-1)
+
+        async def async_call():
+            async with slots:
+                track(1)
+                await asyncio.sleep(0.02)
+                track(-1)
+
+        async def burst():
+            await asyncio.gather(*(async_call() for _ in range(4)))
+
+        threads = [threading.Thread(target=sync_call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        asyncio.run(burst())
+        for thread in threads:
+            thread.join()
+
+        assert peak[0] == 2
+        assert slots.in_use == 0
+
+    def test_cancelled_waiter_frees_its_turn(self):
+        slots = CompletionSlots(1)
+
+        async def scenario():
+            await slots.acquire_async()
+            waiter = asyncio.create_task(slots.acquire_async())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            slots.release()
+            await asyncio.sleep(0)
+            # the slot handed to the cancelled waiter came back
+            await asyncio.wait_for(slots.acquire_async(), 1)
+            slots.release()
+
+        asyncio.run(scenario())
+        assert slots.in_use == 0
+
+class StreamingStubClient:
+    """
+    Stands in for the AsyncOpenAI client with stream=True: yields the reply in chunks.
+    """
+    def __init__(self, chunks:list[str]):
+        self.chunks = chunks
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+
+        async def stream():
+            yield SimpleNamespace(choices=[])
+            for text in self.chunks:
+                await asyncio.sleep(0)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))])
+        return stream()
+
+@pytest.mark.llm_analysis
+class TestStreamInsightsAsync:
+    """
+    Test suite for the stream_insights_async function.
+    """
+    def collect(self, client, tmp_path):
+        async def run():
+            return [text async for text in stream_insights_async(mock_summary, client=client)]
+
+        with patch("backend.python_legacy.llm_analysis.insights_cache", MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)):
+            return asyncio.run(run()), asyncio.run(run())
+
+    def test_streams_then_caches(self, tmp_path):
+        client = StreamingStubClient(["Ward ", "more ", "often."])
+
+        first, second = self.collect(client, tmp_path)
+
+        assert first == ["Ward ", "more ", "often."]
+        assert second == ["Ward more often."]
+        assert len(client.calls) == 1
+        assert client.calls[0]["stream"] is True
+
+    def test_shares_cache_with_generate_insights(self, tmp_path):
+        client = StreamingStubClient(["Ward ", "more ", "often."])
+
+        with patch("backend.python_legacy.llm_analysis.insights_cache", MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)):
+            asyncio.run(self.consume(client))
+            insights = generate_insights(mock_summary, client=StubClient())
+
+        assert insights == "Ward more often."
+
+    async def consume(self, client):
+        async for _ in stream_insights_async(mock_summary, client=client):
+            pass
+
+    def test_identical_streams_share_one_completion(self, tmp_path):
+        client = StreamingStubClient(["Ward ", "more ", "often."])
+
+        async def run():
+            async def collect():
+                return [text async for text in stream_insights_async(mock_summary, client=client)]
+            return await asyncio.gather(collect(), collect(), collect())
+
+        streams = asyncio.run(run())
+
+        assert streams == [["Ward ", "more ", "often."]] * 3
+        assert len(client.calls) == 1
+        assert llm_analysis._insight_streams == {}
+
+    def test_slot_released_before_a_slow_reader(self):
+        client = StreamingStubClient(["Ward ", "more ", "often."])
+        slots = CompletionSlots(1)
+
+        async def run():
+            stream = stream_insights_async(mock_summary, client=client)
+            first = await anext(stream)
+            # the reader stalls after one chunk, the upstream stream is still read to its end
+            for _ in range(50):
+                if slots.in_use == 0:
+                    break
+                await asyncio.sleep(0)
+            in_use = slots.in_use
+            rest = [text async for text in stream]
+            return first, rest, in_use
+
+        with patch("backend.python_legacy.llm_analysis._completion_slots", slots):
+            first, rest, in_use = asyncio.run(run())
+
+        assert in_use == 0
+        assert [first, *rest] == ["Ward ", "more ", "often."]
+
+    def test_upstream_error_reaches_every_reader(self):
+        async def create(**kwargs):
+            raise RuntimeError("upstream closed")
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        async def run():
+            async def collect():
+                return [text async for text in stream_insights_async(mock_summary, client=client)]
+            return await asyncio.gather(collect(), collect(), return_exceptions=True)
+
+        errors = asyncio.run(run())
+
+        assert [str(error) for error in errors] == ["upstream closed"] * 2
+        assert llm_analysis._insight_streams == {}
+
+@pytest.mark.llm_analysis
+class TestMultiInsights:
+    """
+    Test suite for the multi-match insights.
+    """
+    def setup_method(self):
+        self.summaries = {
+            f"NA1_{index}": {**mock_summary, "player_stats": {**mock_summary["player_stats"], "kills": index}}
+            for index in range(5)
+        }
+
+    def json_client(self, reply:dict):
+        client = StubClient()
+        client.chat.completions.create = lambda **kwargs: (client.calls.append(kwargs), make_response(json.dumps(reply)))[1]
+        return client
+
+    def test_one_request_for_every_match(self):
+        client = self.json_client({"matches": {"NA1_0": "Ward more.", "NA1_3": "Farm better."}, "overall": "Deaths are the pattern."})
+
+        insights = generate_multiInsights(self.summaries, client=client)
+
+        assert len(client.calls) == 1
+        assert client.calls[0]["response_format"] == {"type": "json_object"}
+        prompt = client.calls[0]["messages"][1]["content"]
+        assert all(f"## {match_id}" in prompt for match_id in self.summaries)
+        assert insights["overall"] == "Deaths are the pattern."
+        assert [entry["match_id"] for entry in insights["matches"]] == list(self.summaries)
+        assert insights["matches"][0]["feedback"] == "Ward more."
+        assert insights["matches"][1]["feedback"] is None
+
+    def test_prompt_smaller_than_separate_prompts(self):
+        prepared = prepare_multiPrompt(self.summaries)
+        separate = sum(count_tokens(llm_analysis.build_prompt(summary)) for summary in self.summaries.values())
+
+        assert prepared["tokens_after"] < separate
+        assert prepared["tokens_after"] < prepared["tokens_before"]
+
+    def test_reply_not_json(self):
+        insights = parse_multiInsights("Play safer.", ["NA1_0"])
+
+        assert insights == {"matches": [{"match_id": "NA1_0", "feedback": None}], "overall": "Play safer."}
+
+    def test_async_cached(self, tmp_path):
+        calls = []
+
+        async def create(**kwargs):
+            calls.append(kwargs)
+            return make_response(json.dumps({"matches": {}, "overall": "Good games."}))
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        with patch("backend.python_legacy.llm_analysis.insights_cache", MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)):
+            first = asyncio.run(generate_multiInsights_async(self.summaries, client=client))
+            second = asyncio.run(generate_multiInsights_async(self.summaries, client=client))
+
+        assert first == second
+        assert first["overall"] == "Good games."
+        assert len(calls) == 1
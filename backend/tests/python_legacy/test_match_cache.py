@@ -0,0 +1,113 @@
+# Test suite for the on-disk match cache.
+
+import pytest
+from unittest.mock import patch
+
+from backend.python_legacy.match_cache import MatchCache
+
+@pytest.mark.match_cache
+class TestMatchCache:
+    """
+    Test suite for the MatchCache class.
+    """
+    def setup_method(self):
+        self.match = {"metadata": {"matchId": "matchId_1"}, "info": {"gameId": 123456789}}
+
+    def test_get_set(self, tmp_path):
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+
+        assert cache.get("match-details:matchId_1") is None
+
+        cache.set("match-details:matchId_1", self.match)
+
+        assert cache.get("match-details:matchId_1") == self.match
+        assert cache.metrics()["hits"] == 1
+        assert cache.metrics()["misses"] == 1
+        assert cache.metrics()["hit_rate"] == 0.5
+
+    def test_survives_restart(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        MatchCache(path, max_bytes=1024 * 1024).set("match-details:matchId_1", self.match)
+
+        assert MatchCache(path, max_bytes=1024 * 1024).get("match-details:matchId_1") == self.match
+
+    @patch("backend.python_legacy.match_cache.time.time")
+    def test_cached_keys(self, mock_time, tmp_path):
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+        mock_time.return_value = 1000.0
+        cache.set("match-details:matchId_1", self.match)
+        cache.set("match-details:matchId_2", self.match, ttl=60)
+
+        assert cache.cached_keys(["match-details:matchId_1", "match-details:matchId_2", "match-details:matchId_3"]) == {
+            "match-details:matchId_1", "match-details:matchId_2"
+        }
+        mock_time.return_value = 1060.0
+        assert cache.cached_keys(["match-details:matchId_1", "match-details:matchId_2"]) == {"match-details:matchId_1"}
+        # probing does not count as a lookup
+        assert cache.metrics()["hits"] == cache.metrics()["misses"] == 0
+
+    @patch("backend.python_legacy.match_cache.time.time")
+    def test_ttl_expiry(self, mock_time, tmp_path):
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+
+        mock_time.return_value = 1000.0
+        cache.set("recent-matches:puuid:5", ["matchId_1"], ttl=60)
+
+        mock_time.return_value = 1059.0
+        assert cache.get("recent-matches:puuid:5") == ["matchId_1"]
+
+        mock_time.return_value = 1060.0
+        assert cache.get("recent-matches:puuid:5") is None
+        assert cache.metrics()["entries"] == 0
+
+    @patch("backend.python_legacy.match_cache.time.time")
+    def test_lru_eviction_by_size(self, mock_time, tmp_path):
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+        mock_time.return_value = 1000.0
+        cache.set("match-details:matchId_1", self.match)
+        entry_size = cache.metrics()["bytes_used"]
+
+        # room for exactly two entries of this size
+        cache.max_bytes = entry_size * 2
+
+        mock_time.return_value = 1001.0
+        cache.set("match-details:matchId_2", self.match)
+
+        # touching matchId_1 once its access time is stale makes matchId_2 the least recently used entry
+        mock_time.return_value = 1000.0 + cache.access_refresh
+        cache.get("match-details:matchId_1")
+
+        mock_time.return_value = 1001.0 + cache.access_refresh
+        cache.set("match-details:matchId_3", self.match)
+
+        assert cache.get("match-details:matchId_1") == self.match
+        assert cache.get("match-details:matchId_2") is None
+        assert cache.get("match-details:matchId_3") == self.match
+        assert cache.metrics()["bytes_used"] <= cache.max_bytes
+
+    @patch("backend.python_legacy.match_cache.time.time")
+    def test_hits_skip_fresh_access_times(self, mock_time, tmp_path):
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024, access_refresh=60)
+        mock_time.return_value = 1000.0
+        cache.set("match-details:matchId_1", self.match)
+        connection = cache._connect()
+
+        # hits within the refresh interval do not write
+        changes = connection.total_changes
+        mock_time.return_value = 1059.0
+        for _ in range(5):
+            assert cache.get("match-details:matchId_1") == self.match
+        assert connection.total_changes == changes
+
+        mock_time.return_value = 1060.0
+        cache.get("match-details:matchId_1")
+        assert connection.total_changes == changes + 1
+        assert connection.execute("SELECT last_access FROM cache_entries").fetchone()[0] == 1060.0
+
+    def test_oversized_value_not_stored(self, tmp_path):
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=8)
+
+        cache.set("match-details:matchId_1", self.match)
+
+        assert cache.get("match-details:matchId_1") is None
+        assert cache.metrics()["bytes_used"] == 0
@@ -0,0 +1,151 @@
+# Test suite for the paginated match history crawl.
+
+import asyncio
+import pytest
+import threading
+from unittest.mock import patch
+
+from backend.python_legacy.match_cache import MatchCache
+from backend.python_legacy.match_extraction import extract_matchSummary
+from backend.python_legacy.match_history import crawl_matchHistory_async, iter_matchIds_async
+from backend.python_legacy.match_warehouse import MatchWarehouse
+from backend.python_legacy.riot_client import RiotAPIError
+
+mock_puuid = "test-puuid"
+
+@pytest.mark.match_history
+class TestMatchHistory:
+    """
+    Test suite for paging match IDs and crawling their details.
+    """
+    def setup_method(self):
+        self.history = [f"NA1_{index}" for index in range(250, 0, -1)]
+        self.pages = []
+        self.fetched = []
+        self.failing = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def matchIds(self, puuid, start, count, queue, startTime, endTime):
+        self.pages.append((start, count, queue, startTime, endTime))
+        return self.history[start:start + count]
+
+    async def matchDetails(self, match_id):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if match_id in self.failing:
+            raise RiotAPIError("Service unavailable", status_code=503)
+        self.fetched.append(match_id)
+        return {"metadata": {"matchId": match_id}, "info": {"gameVersion": "14.20.1", "queueId": 420, "participants": [{
+            "participantId": 1, "puuid": mock_puuid, "championName": "Jinx", "teamPosition": "BOTTOM",
+            "totalMinionsKilled": 100, "neutralMinionsKilled": 0, "challenges": {}, "win": True
+        }]}}
+
+    def patched(self):
+        return patch("backend.python_legacy.async_riot_client.get_matchIds", side_effect=self.matchIds), \
+            patch("backend.python_legacy.async_riot_client.get_matchDetails", side_effect=self.matchDetails)
+
+    def test_pages_until_short_page(self):
+        async def collect():
+            return [match_id async for match_id in iter_matchIds_async(mock_puuid, queue=420)]
+
+        ids_patch, _ = self.patched()
+        with ids_patch:
+            match_ids = asyncio.run(collect())
+
+        assert match_ids == self.history
+        assert self.pages == [(0, 100, 420, None, None), (100, 100, 420, None, None), (200, 100, 420, None, None)]
+
+    def test_lazy_with_limit(self):
+        async def first_two():
+            match_ids = []
+            async for match_id in iter_matchIds_async(mock_puuid, start=10, limit=150, page_size=50):
+                match_ids.append(match_id)
+                if len(match_ids) == 2:
+                    break
+            return match_ids
+
+        ids_patch, details_patch = self.patched()
+        with ids_patch, details_patch:
+            assert asyncio.run(first_two()) == ["NA1_240", "NA1_239"]
+            assert self.pages == [(10, 50, None, None, None)]
+
+            self.pages.clear()
+            asyncio.run(crawl_matchHistory_async(mock_puuid, limit=150, concurrency=1))
+            assert [page[1] for page in self.pages] == [100, 50]
+
+    def test_crawl_bounded_concurrency(self):
+        self.failing = {"NA1_7"}
+
+        ids_patch, details_patch = self.patched()
+        with ids_patch, details_patch:
+            history = asyncio.run(crawl_matchHistory_async(mock_puuid, concurrency=4))
+
+        assert history["match_ids"] == self.history
+        assert history["fetched"] == 249
+        assert history["failed_matches"] == ["NA1_7"]
+        assert self.max_in_flight == 4
+
+    def test_recrawl_skips_cached(self, tmp_path):
+        ids_patch, details_patch = self.patched()
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+        for match_id in self.history[50:]:
+            cache.set(f"match-details:{match_id}", {"metadata": {"matchId": match_id}})
+
+        with ids_patch, details_patch, patch("backend.python_legacy.riot_client.match_cache", cache):
+            history = asyncio.run(crawl_matchHistory_async(mock_puuid))
+
+        assert history["skipped"] == 200
+        assert history["fetched"] == 50
+        assert sorted(self.fetched) == sorted(self.history[:50])
+
+    def test_crawl_fills_warehouse(self, tmp_path):
+        ids_patch, details_patch = self.patched()
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+
+        with ids_patch, details_patch, patch("backend.python_legacy.match_warehouse.warehouse", warehouse):
+            asyncio.run(crawl_matchHistory_async(mock_puuid, limit=20))
+            history = asyncio.run(crawl_matchHistory_async(mock_puuid, limit=30))
+
+        assert history["skipped"] == 20
+        assert len(self.fetched) == 30
+        assert len(warehouse.query_playerMatches(mock_puuid, champion="Jinx", patch="14.20")) == 30
+        # crawled rows carry stats only, the summary endpoints still fetch the timeline
+        assert warehouse.get_playerSummary(mock_puuid, "NA1_250") is None
+
+    def test_crawl_extracts_off_the_event_loop(self, tmp_path):
+        ids_patch, details_patch = self.patched()
+        threads = set()
+
+        def extract(match_details, timeline_index):
+            threads.add(threading.current_thread())
+            return extract_matchSummary(match_details, timeline_index)
+
+        with ids_patch, details_patch, \
+             patch("backend.python_legacy.match_warehouse.warehouse", MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))), \
+             patch("backend.python_legacy.match_history.extract_matchSummary", side_effect=extract):
+            asyncio.run(crawl_matchHistory_async(mock_puuid, limit=5))
+
+        # asyncio.run runs the event loop in this thread
+        assert threads and threading.current_thread() not in threads
+
+    def test_counts_with_warehouse_and_cache(self, tmp_path):
+        # NA1_250..NA1_241 are stored, NA1_240..NA1_221 only cached, and one match of each kind fails
+        self.failing = {"NA1_230", "NA1_210"}
+        ids_patch, details_patch = self.patched()
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)
+        for match_id in self.history[10:30]:
+            cache.set(f"match-details:{match_id}", {"metadata": {"matchId": match_id}})
+
+        with ids_patch, details_patch, patch("backend.python_legacy.match_warehouse.warehouse", warehouse), \
+             patch("backend.python_legacy.riot_client.match_cache", cache):
+            asyncio.run(crawl_matchHistory_async(mock_puuid, limit=10))
+            history = asyncio.run(crawl_matchHistory_async(mock_puuid, limit=50))
+
+        assert history["skipped"] == 10 + 19
+        assert history["fetched"] == 20 - 1
+        assert history["failed_matches"] == ["NA1_230", "NA1_210"]
+        assert history["fetched"] + history["skipped"] + len(history["failed_matches"]) == 50
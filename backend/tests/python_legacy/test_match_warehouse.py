@@ -0,0 +1,120 @@
+# Test suite for the local match warehouse.
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from backend.python_legacy.match_warehouse import MatchWarehouse, parse_patch
+from backend.python_legacy.player_summary import build_timelineIndex, extract_matchSummary, get_playerSummary_async, get_matchSummary
+
+def make_participant(participantId:int, puuid:str, champion:str, role:str, win:bool) -> dict:
+    return {
+        "participantId": participantId, "puuid": puuid, "championName": champion, "teamPosition": role,
+        "kills": participantId, "deaths": 1, "assists": 2, "totalMinionsKilled": 100, "neutralMinionsKilled": 10,
+        "goldEarned": 9000, "challenges": {"kda": 3.0, "abilityUses": 200}, "win": win
+    }
+
+def make_match(match_id:str, gameVersion:str, gameCreation:int, champion:str = "Jinx", queueId:int = 420) -> dict:
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {
+            "gameCreation": gameCreation, "gameDuration": 1800, "gameVersion": gameVersion, "queueId": queueId,
+            "participants": [make_participant(1, "me", champion, "BOTTOM", True), make_participant(2, "other", "Thresh", "UTILITY", True)]
+        }
+    }
+
+def make_timelineIndex(match_id:str) -> dict:
+    return build_timelineIndex({
+        "metadata": {"matchId": match_id},
+        "info": {
+            "frames": [{
+                "timestamp": 60000,
+                "events": [{"type": "CHAMPION_KILL", "killerId": 1, "victimId": 6, "timestamp": 60005}],
+                "participantFrames": {"1": {"participantId": 1, "level": 2}, "2": {"participantId": 2, "level": 1}}
+            }],
+            "participants": [{"participantId": 1, "puuid": "me"}, {"participantId": 2, "puuid": "other"}]
+        }
+    })
+
+@pytest.mark.match_warehouse
+class TestMatchWarehouse:
+    """
+    Test suite for the MatchWarehouse class.
+    """
+    def setup_method(self):
+        self.matches = [
+            make_match("NA1_1", "14.19.620.1", 1000),
+            make_match("NA1_2", "14.20.628.1234", 2000),
+            make_match("NA1_3", "14.20.630.1", 3000, champion="Ezreal"),
+            make_match("NA1_4", "14.20.630.1", 4000, queueId=400),
+        ]
+
+    def ingest(self, warehouse, with_timeline:bool = True):
+        for match in self.matches:
+            timeline_index = make_timelineIndex(match["metadata"]["matchId"]) if with_timeline else None
+            warehouse.ingest_match(match, extract_matchSummary(match, timeline_index))
+
+    def test_parse_patch(self):
+        assert parse_patch("14.20.628.1234") == "14.20"
+        assert parse_patch(None) is None
+
+    def test_query_filters(self, tmp_path):
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+        self.ingest(warehouse)
+
+        jinx_this_patch = warehouse.query_playerMatches("me", champion="Jinx", patch="latest")
+        assert [match["match_id"] for match in jinx_this_patch] == ["NA1_4", "NA1_2"]
+        assert jinx_this_patch[0]["win"] is True
+        assert jinx_this_patch[0]["player_stats"]["challenge"] == {"kda": 3.0}
+
+        assert [match["match_id"] for match in warehouse.query_playerMatches("me", patch="14.20", queue=420)] == ["NA1_3", "NA1_2"]
+        assert warehouse.query_playerMatches("other", role="BOTTOM") == []
+        assert len(warehouse.query_playerMatches("me", limit=2)) == 2
+        assert warehouse.metrics() == {"matches": 4, "rows": 8}
+
+    def test_query_uses_indexes(self, tmp_path):
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+
+        plan = warehouse._connect().execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM participants WHERE puuid = ? AND champion = ? AND patch = ?", ("me", "Jinx", "14.20")
+        ).fetchall()
+
+        assert "USING INDEX idx_participants_puuid_champion_patch" in " ".join(row[-1] for row in plan)
+
+    def test_summaries_round_trip(self, tmp_path):
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+        self.ingest(warehouse)
+        expected = extract_matchSummary(self.matches[1], make_timelineIndex("NA1_2"))
+
+        assert warehouse.get_matchSummary("NA1_2") == expected
+        assert warehouse.get_playerSummary("me", "NA1_2") == {"player_stats": expected[0]["player_stats"], "player_timeline": expected[0]["player_timeline"]}
+        assert warehouse.get_playerSummary("me", "NA1_9") is None
+
+    def test_ingest_without_timeline_keeps_stored_timeline(self, tmp_path):
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+
+        self.ingest(warehouse, with_timeline=False)
+        assert warehouse.get_playerSummary("me", "NA1_1") is None
+        assert warehouse.known_matchIds(["NA1_1", "NA1_9"]) == {"NA1_1"}
+
+        self.ingest(warehouse)
+        self.ingest(warehouse, with_timeline=False)
+        assert warehouse.get_playerSummary("me", "NA1_1")["player_timeline"][0]["timestamp"] == 1
+
+    def test_summaries_served_from_warehouse(self, tmp_path):
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+        bundle = {"match_details": self.matches[0], "timeline_index": make_timelineIndex("NA1_1")}
+
+        with patch("backend.python_legacy.match_warehouse.warehouse", warehouse), \
+             patch("backend.python_legacy.player_summary.get_matchBundle_async", return_value=bundle) as mock_bundle_async, \
+             patch("backend.python_legacy.player_summary.get_matchBundle", return_value=bundle) as mock_bundle:
+            first = asyncio.run(get_playerSummary_async("me", "NA1_1"))
+            second = asyncio.run(get_playerSummary_async("me", "NA1_1"))
+            teammate = asyncio.run(get_playerSummary_async("other", "NA1_1"))
+            match_summary = get_matchSummary("NA1_1")
+
+        assert first == second
+        assert teammate["player_stats"]["champion"] == "Thresh"
+        assert len(match_summary) == 2
+        mock_bundle_async.assert_called_once_with("NA1_1")
+        mock_bundle.assert_not_called()
@@ -0,0 +1,174 @@
+# Test suite for the in-process memo layer.
+
+import asyncio
+import json
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+from backend.python_legacy.memo_cache import MemoCache, estimate_size
+
+@pytest.mark.memo_cache
+class TestMemoCache:
+    """
+    Test suite for the MemoCache class.
+    """
+    def test_get_or_load(self):
+        memo = MemoCache(max_entries=8)
+        loader = Mock(return_value={"info": "details"})
+
+        assert memo.get_or_load("match-details:matchId_1", loader) == {"info": "details"}
+        assert memo.get_or_load("match-details:matchId_1", loader) == {"info": "details"}
+
+        loader.assert_called_once()
+        assert memo.metrics()["hits"] == 1
+        assert memo.metrics()["misses"] == 1
+
+    def test_get_never_loads(self):
+        memo = MemoCache(max_entries=8)
+
+        assert memo.get("match-details:matchId_1") is None
+        memo.get_or_load("match-details:matchId_1", lambda: {"info": "details"})
+
+        assert memo.get("match-details:matchId_1") == {"info": "details"}
+        assert memo.metrics()["misses"] == 1
+
+    def test_lru_eviction(self):
+        memo = MemoCache(max_entries=2)
+        memo.get_or_load("a", lambda: 1)
+        memo.get_or_load("b", lambda: 2)
+        memo.get_or_load("a", lambda: 1)    # "b" is now the least recently used key
+        memo.get_or_load("c", lambda: 3)
+
+        loader = Mock(return_value=2)
+        memo.get_or_load("b", loader)
+
+        loader.assert_called_once()
+        assert memo.metrics()["entries"] == 2
+
+    def test_size_bound(self):
+        payload = {"info": {"frames": [{"events": [{"type": "CHAMPION_KILL", "killerId": 1}] * 50}] * 40}}
+        size = estimate_size(payload)
+        memo = MemoCache(max_entries=100, max_bytes=int(size * 2.5))
+
+        for match_id in range(3):
+            memo.get_or_load(f"match-timeline:{match_id}", lambda: payload)
+
+        # the least recently used payload is evicted to stay under the byte budget
+        assert memo.get("match-timeline:0") is None
+        assert memo.metrics()["entries"] == 2
+        assert memo.metrics()["bytes_used"] == 2 * size
+
+        memo.set("match-timeline:1", {"info": {}})
+        assert memo.metrics()["bytes_used"] == size + estimate_size({"info": {}})
+
+    def test_value_over_size_bound_not_kept(self):
+        memo = MemoCache(max_entries=8, max_bytes=100)
+        loader = Mock(return_value=["matchId"] * 100)
+
+        memo.get_or_load("match-ids:puuid", loader)
+        memo.get_or_load("match-ids:puuid", loader)
+
+        assert loader.call_count == 2
+        assert memo.metrics()["bytes_used"] == 0
+
+    def test_estimate_size(self):
+        payload = {
+            "metadata": {"participants": [f"puuid-{index}" for index in range(10)]},
+            "info": {"frames": [{"timestamp": 60000 * minute, "events": [{"type": "WARD_PLACED", "creatorId": 1}] * minute} for minute in range(30)]}
+        }
+        size = len(json.dumps(payload, separators=(",", ":")))
+
+        assert 0.8 * size <= estimate_size(payload) <= 1.2 * size
+        assert estimate_size("puuid") == len('"puuid"')
+
+    @patch("backend.python_legacy.memo_cache.time.monotonic")
+    def test_ttl_expiry(self, mock_monotonic):
+        memo = MemoCache(max_entries=8)
+        loader = Mock(return_value=["matchId_1"])
+
+        mock_monotonic.return_value = 100.0
+        memo.get_or_load("recent-matches:puuid:5", loader, ttl=60)
+        mock_monotonic.return_value = 161.0
+        memo.get_or_load("recent-matches:puuid:5", loader, ttl=60)
+
+        assert loader.call_count == 2
+
+    def test_single_flight(self):
+        memo = MemoCache(max_entries=8)
+        release = threading.Event()
+        loader = Mock(side_effect=lambda: release.wait() and {"info": "details"})
+        results = []
+
+        def lookup():
+            results.append(memo.get_or_load("match-details:matchId_1", loader))
+
+        threads = [threading.Thread(target=lookup) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+
+        # wait until every follower is parked on the leader's call
+        while memo.metrics()["coalesced"] < 9:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        loader.assert_called_once()
+        assert results == [{"info": "details"}] * 10
+        assert memo.metrics()["misses"] == 1
+        assert memo.metrics()["coalesced"] == 9
+
+    def test_errors_shared_and_not_memoized(self):
+        memo = MemoCache(max_entries=8)
+        loader = Mock(side_effect=Exception("Match details fetch error"))
+
+        with pytest.raises(Exception) as exc_info:
+            memo.get_or_load("match-details:matchId_1", loader)
+        assert str(exc_info.value) == "Match details fetch error"
+
+        with pytest.raises(Exception):
+            memo.get_or_load("match-details:matchId_1", loader)
+        assert loader.call_count == 2
+        assert memo.metrics()["entries"] == 0
+
+    def test_async_leader_cancelled(self):
+        memo = MemoCache(max_entries=8)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"info": "details"}
+
+        async def run():
+            leader = asyncio.create_task(memo.get_or_load_async("match-details:matchId_1", loader))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(memo.get_or_load_async("match-details:matchId_1", loader))
+            await asyncio.sleep(0)
+
+            # a disconnected client cancels the caller that started the load
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await waiter
+
+        assert asyncio.run(run()) == {"info": "details"}
+        assert len(calls) == 1
+        assert memo.get("match-details:matchId_1") == {"info": "details"}
+
+    def test_async_errors_shared_and_not_memoized(self):
+        memo = MemoCache(max_entries=8)
+
+        async def loader():
+            await asyncio.sleep(0)
+            raise Exception("Match details fetch error")
+
+        async def run():
+            return await asyncio.gather(
+                *(memo.get_or_load_async("match-details:matchId_1", loader) for _ in range(3)), return_exceptions=True
+            )
+
+        assert [str(error) for error in asyncio.run(run())] == ["Match details fetch error"] * 3
+        assert memo.metrics()["misses"] == 1
+        assert memo.metrics()["entries"] == 0
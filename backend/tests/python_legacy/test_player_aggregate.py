@@ -0,0 +1,243 @@
+# Test suite for the multi-match aggregate stats.
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from backend.python_legacy.match_cache import MatchCache
+from backend.python_legacy.player_aggregate import aggregate_playerStats, build_statColumns, get_playerAggregate, get_playerAggregate_async
+from backend.python_legacy.player_aggregate import get_playerAggregate_incremental_async, load_aggregateState, unseen_matchIds, _aggregate_states
+from backend.python_legacy.player_aggregate import new_aggregateState, store_aggregateState
+from backend.python_legacy.memo_cache import MemoCache
+from backend.python_legacy.player_summary import extract_playerDetails
+from backend.python_legacy.riot_client import RiotAPIError
+
+mock_puuid = "test-puuid"
+
+def make_details(champion:str, role:str, win:bool, kills:int, deaths:int, assists:int, damagePerMinute:float = 500.0) -> dict:
+    return {
+        "champion": champion, "role": role, "win": win, "kills": kills, "deaths": deaths, "assists": assists, "cs": 150,
+        "challenge": {"damagePerMinute": damagePerMinute, "goldPerMinute": 400.0, "visionScorePerMinute": 1.0}
+    }
+
+def make_matchDetails(player_details:dict) -> dict:
+    """
+    Returns a match payload whose participant extracts to the given stats.
+    """
+    return {"info": {"participants": [{
+        "puuid": mock_puuid, "championName": player_details["champion"], "teamPosition": player_details["role"],
+        "kills": player_details["kills"], "deaths": player_details["deaths"], "assists": player_details["assists"],
+        "totalMinionsKilled": 100, "neutralMinionsKilled": 50, "challenges": player_details["challenge"], "win": player_details["win"]
+    }]}}
+
+@pytest.mark.player_aggregate
+class TestAggregatePlayerStats:
+    """
+    Test suite for the aggregate_playerStats function.
+    """
+    def setup_method(self):
+        self.player_details = [
+            make_details("Ahri", "MIDDLE", True, 10, 2, 5, 600.0),
+            make_details("Ahri", "MIDDLE", False, 2, 5, 3, 400.0),
+            make_details("Lux", "UTILITY", True, 1, 0, 15, 300.0),
+            make_details("Ahri", "MIDDLE", True, 6, 3, 6, 500.0),
+        ]
+
+    def test_totals(self):
+        aggregate = aggregate_playerStats(self.player_details)
+
+        assert aggregate["matches"] == 4
+        assert aggregate["wins"] == 3
+        assert aggregate["win_rate"] == 0.75
+
+    def test_by_champion_and_role(self):
+        aggregate = aggregate_playerStats(self.player_details)
+
+        assert aggregate["by_champion"]["Ahri"] == {"matches": 3, "wins": 2, "win_rate": 2 / 3, "kda": (7.5 + 1.0 + 4.0) / 3}
+        assert aggregate["by_champion"]["Lux"]["kda"] == 16.0
+        assert aggregate["by_role"]["UTILITY"]["win_rate"] == 1.0
+
+    def test_distributions(self):
+        aggregate = aggregate_playerStats(self.player_details)
+
+        assert aggregate["per_minute"]["damagePerMinute"]["mean"] == 450.0
+        assert aggregate["per_minute"]["damagePerMinute"]["p50"] == 450.0
+        assert aggregate["kda"]["p50"] == 5.75
+        assert aggregate["kda"]["p10"] <= aggregate["kda"]["p90"]
+
+    def test_missing_challenge_values(self):
+        self.player_details[0]["challenge"] = {}
+
+        columns = build_statColumns(self.player_details)
+        aggregate = aggregate_playerStats(self.player_details)
+
+        assert columns["damagePerMinute"].tolist()[1:] == [400.0, 300.0, 500.0]
+        assert aggregate["per_minute"]["damagePerMinute"]["mean"] == 400.0
+
+    def test_empty(self):
+        aggregate = aggregate_playerStats([{}, {}])
+
+        assert aggregate["matches"] == 0
+        assert aggregate["win_rate"] is None
+        assert aggregate["kda"]["mean"] is None
+        assert aggregate["by_champion"] == {}
+
+@pytest.mark.player_aggregate
+class TestGetPlayerAggregate:
+    """
+    Test suite for fetching the matches of an aggregate.
+    """
+    def setup_method(self):
+        self.matches = {
+            "match-1": make_matchDetails(make_details("Ahri", "MIDDLE", True, 10, 2, 5)),
+            "match-2": make_matchDetails(make_details("Lux", "UTILITY", False, 1, 4, 9)),
+        }
+
+    @patch("backend.python_legacy.riot_client.get_matchDetails")
+    @patch("backend.python_legacy.riot_client.get_recentMatches")
+    def test_get_playerAggregate(self, mock_recentMatches, mock_matchDetails):
+        mock_recentMatches.return_value = list(self.matches)
+        mock_matchDetails.side_effect = lambda match_id: self.matches[match_id]
+
+        aggregate = get_playerAggregate(mock_puuid, 2)
+
+        assert aggregate["matches"] == 2
+        assert aggregate["win_rate"] == 0.5
+        mock_recentMatches.assert_called_once_with(mock_puuid, 2)
+
+    @patch("backend.python_legacy.async_riot_client.get_matchDetails")
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_get_playerAggregate_async_partial_failure(self, mock_recentMatches, mock_matchDetails):
+        mock_recentMatches.return_value = [*self.matches, "match-3"]
+
+        async def matchDetails(match_id):
+            if match_id == "match-3":
+                raise RiotAPIError("Data not found", status_code=404)
+            return self.matches[match_id]
+        mock_matchDetails.side_effect = matchDetails
+
+        aggregate = asyncio.run(get_playerAggregate_async(mock_puuid, 3))
+
+        assert aggregate["matches"] == 2
+        assert aggregate["by_champion"]["Ahri"]["wins"] == 1
+        assert aggregate["failed_matches"] == ["match-3"]
+
+@pytest.mark.player_aggregate
+class TestIncrementalAggregate:
+    """
+    Test suite for the persisted running aggregates.
+    """
+    def setup_method(self):
+        self.matches = {
+            f"match-{index}": make_matchDetails(make_details("Ahri" if index % 2 else "Lux", "MIDDLE", index % 3 == 0, index, 2, 4, 100.0 * index))
+            for index in range(1, 7)
+        }
+        _aggregate_states.clear()
+
+    def run(self, match_ids, failing=()):
+        """
+        Runs one visit where Riot lists match_ids (newest first), returning the aggregate and the fetched match IDs.
+        """
+        fetched = []
+
+        async def matchDetails(match_id):
+            fetched.append(match_id)
+            if match_id in failing:
+                raise RiotAPIError("Service unavailable", status_code=503)
+            return self.matches[match_id]
+
+        with patch("backend.python_legacy.async_riot_client.get_recentMatches") as mock_recentMatches, \
+             patch("backend.python_legacy.async_riot_client.get_matchDetails") as mock_matchDetails:
+            mock_recentMatches.return_value = match_ids
+            mock_matchDetails.side_effect = matchDetails
+            aggregate = asyncio.run(get_playerAggregate_incremental_async(mock_puuid, len(match_ids)))
+
+        return aggregate, sorted(fetched)
+
+    def test_only_new_matches_are_fetched(self):
+        first, fetched = self.run(["match-3", "match-2", "match-1"])
+        assert fetched == ["match-1", "match-2", "match-3"]
+        assert first["matches"] == 3
+
+        second, fetched = self.run(["match-5", "match-4", "match-3"])
+        assert fetched == ["match-4", "match-5"]
+        assert second["new_matches"] == 2
+
+        third, fetched = self.run(["match-5", "match-4", "match-3"])
+        assert fetched == []
+        assert third["new_matches"] == 0
+
+    def test_matches_full_recompute(self):
+        self.run(["match-3", "match-2", "match-1"])
+        self.run(["match-5", "match-4", "match-3"])
+        aggregate, _ = self.run(["match-6", "match-5", "match-4"])
+        assert not aggregate["rebuilt"]
+
+        expected = aggregate_playerStats([extract_playerDetails(mock_puuid, match) for match in self.matches.values()])
+        assert aggregate["matches"] == expected["matches"] == 6
+        assert aggregate["win_rate"] == expected["win_rate"]
+        for champion, totals in expected["by_champion"].items():
+            assert aggregate["by_champion"][champion] == pytest.approx(totals)
+        assert aggregate["kda"]["mean"] == pytest.approx(expected["kda"]["mean"])
+        assert aggregate["per_minute"]["damagePerMinute"]["p50"] == pytest.approx(expected["per_minute"]["damagePerMinute"]["p50"], rel=0.2)
+
+    def test_failed_match_is_retried(self):
+        aggregate, _ = self.run(["match-3", "match-2", "match-1"], failing={"match-2"})
+        assert aggregate["matches"] == 1
+        assert aggregate["failed_matches"] == ["match-2"]
+
+        aggregate, fetched = self.run(["match-3", "match-2", "match-1"])
+        assert fetched == ["match-2", "match-3"]
+        assert aggregate["matches"] == 3
+
+    def test_persisted_in_match_cache(self, tmp_path):
+        with patch("backend.python_legacy.riot_client.match_cache", MatchCache(str(tmp_path / "cache.sqlite3"), 1024 * 1024)):
+            self.run(["match-2", "match-1"])
+            state = load_aggregateState(mock_puuid)
+
+        assert state["cursor"] == "match-2"
+        assert state["matches"] == 2
+        assert _aggregate_states.metrics()["entries"] == 0
+
+    def test_unseen_matchIds(self):
+        assert unseen_matchIds(["c", "b", "a"], None) == ["c", "b", "a"]
+        assert unseen_matchIds(["c", "b", "a"], "b") == ["c"]
+        assert unseen_matchIds(["c", "b", "a"], "z") is None
+
+    def test_missing_cursor_rebuilds(self):
+        self.run(["match-2", "match-1"])
+        # four matches played since: the cursor fell off the listed page
+        aggregate, fetched = self.run(["match-6", "match-5"])
+
+        assert fetched == ["match-5", "match-6"]
+        assert aggregate["rebuilt"]
+        assert aggregate["matches"] == 2
+
+    def test_larger_count_backfills(self):
+        first, _ = self.run(["match-5", "match-4"])
+        assert first["rebuilt"] and first["matches"] == 2
+
+        second, fetched = self.run(["match-5", "match-4", "match-3", "match-2"])
+        assert fetched == ["match-2", "match-3", "match-4", "match-5"]
+        assert second["rebuilt"]
+        assert second["matches"] == 4
+
+        # a smaller count keeps the aggregates of the larger one
+        with patch("backend.python_legacy.async_riot_client.get_recentMatches") as mock_recentMatches:
+            mock_recentMatches.return_value = ["match-5", "match-4", "match-3", "match-2"]
+            third = asyncio.run(get_playerAggregate_incremental_async(mock_puuid, 2))
+        mock_recentMatches.assert_called_once_with(mock_puuid, 4)
+        assert not third["rebuilt"]
+        assert third["matches"] == 4
+
+    def test_in_memory_states_are_bounded(self):
+        with patch("backend.python_legacy.player_aggregate._aggregate_states", MemoCache(1)) as states:
+            self.run(["match-2", "match-1"])
+            store_aggregateState("other-puuid", new_aggregateState())
+            assert states.metrics()["entries"] == 1
+
+            # the evicted aggregates are rebuilt, and reported as such
+            aggregate, fetched = self.run(["match-3", "match-2", "match-1"])
+            assert fetched == ["match-1", "match-2", "match-3"]
+            assert aggregate["rebuilt"]
+            assert aggregate["matches"] == 3
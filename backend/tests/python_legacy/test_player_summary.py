@@ -1,19 +1,69 @@
 # Test suite for the player analysis functions.
 
+import asyncio
+import copy
+import io
+import json
 import pytest
+import threading
 from unittest.mock import patch, Mock, ANY
+from requests.exceptions import HTTPError
 
-from src.analysis.player_summary import get_playerDetails, get_playerTimeline, get_playerSummary
+from backend.python_legacy.player_summary import get_playerDetails, get_playerTimeline, get_playerSummary, get_matchBundle
+from backend.python_legacy.player_summary import get_playerSummaries_async, iter_playerSummaries_async
+from backend.python_legacy.player_summary import extract_playerTimeline, extract_playerTimeline_stream, get_playerTimeline_stream
+from backend.python_legacy.player_summary import build_timelineIndex, extract_playerTimeline_indexed, get_timelineIndex
+from backend.python_legacy.player_summary import extract_playerDetails, extract_matchSummary, get_matchSummary
+from backend.python_legacy.player_summary import iter_playerFrames, TimelineFrame
+from backend.python_legacy.player_summary import get_playerSummary_async, get_matchSummary_async, stream_timelines
+from backend.python_legacy.match_warehouse import MatchWarehouse
+from backend.python_legacy import data_source
+from backend.python_legacy.data_source import FixtureDataSource, write_fixture
+from backend.python_legacy.memo_cache import MemoCache
+from backend.python_legacy.rate_limiter import budget_share
+from backend.python_legacy.riot_client import RiotAPIError
 
 mock_puuid = "test-puuid"
 mock_matchId = "test-match-id"
 
+def make_timeline() -> dict:
+    """
+    Returns a three minute timeline of ten participants shaped like a match-v5 payload.
+    """
+    frames = []
+    for minute in range(3):
+        frames.append({
+            "timestamp": minute * 60000,
+            "events": [
+                {"type": "CHAMPION_KILL", "killerId": 1, "victimId": 6, "timestamp": minute * 60000 + 5, "killStreakLength": 1, "position": {"x": 10.5, "y": 20}},
+                {"type": "CHAMPION_KILL", "killerId": 2, "victimId": 7, "assistingParticipantIds": [4, 5], "timestamp": minute * 60000 + 6},
+                {"type": "WARD_PLACED", "creatorId": 1, "timestamp": minute * 60000 + 7},
+                {"type": "BUILDING_KILL", "killerId": 3, "timestamp": minute * 60000 + 8},
+                {"type": "TURRET_PLATE_DESTROYED", "killerId": 6, "timestamp": minute * 60000 + 9},
+            ] + ([{"type": "ELITE_MONSTER_KILL", "killerId": 8, "killerTeamId": 200, "timestamp": 120010}] if minute == 2 else [])
+            if minute else [{"type": "PAUSE_END", "timestamp": 0}],
+            "participantFrames": {
+                str(participant): {"level": minute + 1, "currentGold": 500.0 * minute, "totalGold": 900, "xp": 100, "damageStats": {"totalDamageDone": 10}}
+                for participant in range(1, 11)
+            }
+        })
+
+    # Riot sends metadata first and info.frames before info.participants
+    return {
+        "metadata": {"matchId": mock_matchId, "participants": [f"puuid-{index}" for index in range(1, 11)]},
+        "info": {
+            "frameInterval": 60000,
+            "frames": frames,
+            "participants": [{"participantId": index, "puuid": f"puuid-{index}"} for index in range(1, 11)]
+        }
+    }
+
 @pytest.mark.player_details
 class TestPlayerAnalysisStats:
     """
     Test suite for the get_matchStats function.
     """
-    @patch("src.analysis.player_summary.get_matchDetails")
+    @patch("backend.python_legacy.riot_client.get_matchDetails")
     def test_get_playerDetails(self, mock_matchDetails):
         response = {
             "info": {
@@ -34,7 +84,8 @@ class TestPlayerAnalysisStats:
                         "totalMinionsKilled": 200,
                         "neutralMinionsKilled": 30,
                         "perks": {"statPerks": {}, "styles": []},
-                        "challenges": {"challenge1": 100, "challenge2": 200}
+                        "challenges": {"kda": 7.5, "soloKills": 2, "challenge1": 100},
+                        "win": True
                     },
                     # should not be included
                     {
@@ -74,7 +125,8 @@ class TestPlayerAnalysisStats:
             "detectorWardsPlaced": 2,
             "cs": 230,  # 200 + 30
             "runes": {"statPerks": {}, "styles": []},
-            "challenge": {"challenge1": 100, "challenge2": 200}
+            "challenge": {"kda": 7.5, "soloKills": 2},  # challenge1 is filtered out
+            "win": True
         }
 
         stats = get_playerDetails(mock_puuid, mock_matchId)
@@ -86,12 +138,13 @@ class TestPlayerAnalysisTimeData:
     """
     Test suite for the get_matchTimeData function.
     """
-    @patch("src.analysis.player_summary.get_matchTimeline")
+    @patch("backend.python_legacy.riot_client.get_matchTimeline")
     def test_get_matchTimeline(self, mock_matchTimeline):
         response = {
             "info": {
                 "frames": [
                     {
+                        "timestamp": 120000,
                         "events": [
                             {"killerId": 2, "type": "CHAMPION_KILL", "assistingParticipantIds": [1]},
                             {"killerId": 1, "type": "BUILDING_KILL"},
@@ -106,8 +159,8 @@ class TestPlayerAnalysisTimeData:
                             {"type": "WARD_PLACED", "participantId": 1}
                         ],
                         "participantFrames": {
-                            "1": {"totalGold": 500},
-                            "2": {"totalGold": 300}
+                            "1": {"currentGold": 450, "totalGold": 500},
+                            "2": {"currentGold": 250, "totalGold": 300}
                         }
                     }
                 ],
@@ -136,6 +189,7 @@ class TestPlayerAnalysisTimeData:
         expected_data = {
             "frameData": [
                 {
+                    "timestamp": 2,
                     "events": [
                         {"killerId": 2, "type": "CHAMPION_KILL", "assistingParticipantIds": [1]},
                         {"killerId": 1, "type": "BUILDING_KILL"},
@@ -143,21 +197,272 @@ class TestPlayerAnalysisTimeData:
                         {"type": "ELITE_MONSTER_KILL", "killerId": 2, "assistingParticipantIds": [3], "killerTeamId": 100},
                         {"type": "FEAT_UPDATE", "teamId": 100},
                     ],
-                    "participantFrames": {"totalGold": 500}
+                    "participantFrames": {"currentGold": 450}  # totalGold is removed
                 }
             ]
         }
         assert data == expected_data["frameData"]
-    
+
+    def test_does_not_modify_timeline(self):
+        timeline = make_timeline()
+
+        first = extract_playerTimeline("puuid-1", timeline)
+        second = extract_playerTimeline("puuid-1", timeline)
+
+        # the cached payload stays intact, so every later read sees the same data
+        assert timeline == make_timeline()
+        assert first == second
+        assert "timestamp" not in first[0]["events"][0]
+        assert "killStreakLength" not in first[0]["events"][0]
+
+    def test_shared_timeline_for_several_players(self):
+        timeline = make_timeline()
+        expected = {puuid: extract_playerTimeline(puuid, copy.deepcopy(timeline)) for puuid in ("puuid-1", "puuid-6")}
+
+        data = {puuid: extract_playerTimeline(puuid, timeline) for puuid in ("puuid-1", "puuid-6")}
+
+        assert data == expected
+
+    def test_iter_playerFrames(self):
+        frames = list(iter_playerFrames("puuid-3", make_timeline()))
+
+        assert all(isinstance(frame, TimelineFrame) for frame in frames)
+        assert [frame.to_dict() for frame in frames] == extract_playerTimeline("puuid-3", make_timeline())
+        assert not hasattr(frames[0], "__dict__")
+
+@pytest.mark.event_filter
+class TestEventFilter:
+    """
+    Test suite for the event types kept in a player's timeline and for players who are not in the match.
+    """
+    def setup_method(self):
+        self.timeline = make_timeline()
+        self.timeline["info"]["frames"][1]["events"] += [
+            {"type": "FEAT_UPDATE", "teamId": 100, "timestamp": 60020},
+            {"type": "TURRET_PLATE_DESTROYED", "killerId": 1, "timestamp": 60021},
+        ]
+
+    def extractions(self, puuid:str) -> list[list[dict]]:
+        return [
+            extract_playerTimeline(puuid, self.timeline),
+            extract_playerTimeline_indexed(puuid, build_timelineIndex(self.timeline)),
+            extract_playerTimeline_stream(puuid, io.BytesIO(json.dumps(self.timeline).encode("utf-8"))),
+        ]
+
+    def test_feat_updates_and_own_turret_plates_are_kept(self):
+        for timeline in self.extractions("puuid-1"):
+            types = [event["type"] for event in timeline[0]["events"]]
+            assert "FEAT_UPDATE" in types
+            # only the plate the player destroyed, not the one of participant 6
+            assert types.count("TURRET_PLATE_DESTROYED") == 1
+
+        for timeline in self.extractions("puuid-2"):
+            types = [event["type"] for event in timeline[0]["events"]]
+            assert "FEAT_UPDATE" in types
+            assert "TURRET_PLATE_DESTROYED" not in types
+
+    def test_player_not_in_match(self):
+        assert extract_playerDetails("other-puuid", make_matchDetails()) == {}
+        assert all(timeline == [] for timeline in self.extractions("other-puuid"))
+
+
+@pytest.mark.player_timeline_stream
+class TestPlayerTimelineStream:
+    """
+    Test suite for the streaming timeline parser.
+    """
+    def setup_method(self):
+        self.timeline = make_timeline()
+
+    def stream(self, payload):
+        return io.BytesIO(json.dumps(payload).encode("utf-8"))
+
+    def test_matches_dict_extraction(self):
+        expected = extract_playerTimeline("puuid-1", copy.deepcopy(self.timeline))
+
+        data = extract_playerTimeline_stream("puuid-1", self.stream(self.timeline))
+
+        assert data == expected
+        assert [frame["timestamp"] for frame in data] == [1, 2]
+        assert data[0]["participantFrames"] == {"level": 2, "currentGold": 500.0}
+
+    def test_without_metadata(self):
+        timeline = copy.deepcopy(self.timeline)
+        del timeline["metadata"]
+        expected = extract_playerTimeline("puuid-2", copy.deepcopy(timeline))
+
+        assert extract_playerTimeline_stream("puuid-2", self.stream(timeline)) == expected
+
+    def large_timeline(self) -> dict:
+        # larger than the first chunk ijson reads (64 KB), so the fallback needs more than the recorded part
+        timeline = copy.deepcopy(self.timeline)
+        timeline["info"]["frames"][1]["events"] += [
+            {"type": "WARD_PLACED", "creatorId": 2, "timestamp": 60100 + index} for index in range(2000)
+        ]
+        assert len(json.dumps(timeline)) > 65536
+        return timeline
+
+    def test_large_timeline_player_not_in_match(self):
+        assert extract_playerTimeline_stream("other-puuid", self.stream(self.large_timeline())) == []
+
+    def test_large_timeline_info_first(self):
+        timeline = self.large_timeline()
+        timeline = {"info": timeline["info"], "metadata": timeline["metadata"]}
+        expected = extract_playerTimeline("puuid-2", copy.deepcopy(timeline))
+
+        assert expected
+        assert extract_playerTimeline_stream("puuid-2", self.stream(timeline)) == expected
+
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_get_playerTimeline_stream(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.raw = self.stream(self.timeline)
+
+        data = get_playerTimeline_stream("puuid-1", mock_matchId)
+
+        assert data == extract_playerTimeline("puuid-1", copy.deepcopy(self.timeline))
+        assert mock_get.call_args.kwargs["stream"] is True
+        mock_get.return_value.close.assert_called_once()
+
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_get_playerTimeline_stream_error(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 404
+        mock_response.text = "Data not found"
+        mock_response.raise_for_status.side_effect = HTTPError("HTTP Error: 404", response=mock_response)
+        mock_get.return_value = mock_response
+
+        with pytest.raises(RiotAPIError) as exc_info:
+            get_playerTimeline_stream("puuid-1", mock_matchId)
+
+        assert str(exc_info.value) == "API request failed: 404 - Data not found"
+        mock_response.close.assert_called_once()
+
+@pytest.mark.player_timeline_index
+class TestTimelineIndex:
+    """
+    Test suite for the per-match timeline index.
+    """
+    def setup_method(self):
+        self.timeline = make_timeline()
+
+    def test_matches_extraction_for_every_participant(self):
+        index = build_timelineIndex(copy.deepcopy(self.timeline))
+
+        for participant in range(1, 11):
+            puuid = f"puuid-{participant}"
+            expected = extract_playerTimeline(puuid, copy.deepcopy(self.timeline))
+            assert extract_playerTimeline_indexed(puuid, index) == expected
+
+    def test_does_not_modify_timeline(self):
+        timeline = copy.deepcopy(self.timeline)
+
+        build_timelineIndex(timeline)
+
+        assert timeline == self.timeline
+
+    def test_serializable(self):
+        index = build_timelineIndex(self.timeline)
+
+        assert json.loads(json.dumps(index)) == index
+
+    def test_unknown_puuid(self):
+        assert extract_playerTimeline_indexed("other-puuid", build_timelineIndex(self.timeline)) == []
+
+    @patch("backend.python_legacy.riot_client.get_matchTimeline")
+    def test_get_timelineIndex_cached(self, mock_matchTimeline):
+        mock_matchTimeline.return_value = self.timeline
+
+        with patch("backend.python_legacy.riot_client.memo_cache", MemoCache(max_entries=8)):
+            indexes = [get_timelineIndex(mock_matchId) for _ in range(5)]
+
+        # a premade of five reads one index built from one timeline scan
+        mock_matchTimeline.assert_called_once_with(mock_matchId)
+        assert all(index is indexes[0] for index in indexes)
+
+def make_matchDetails() -> dict:
+    """
+    Returns match details of the ten participants of make_timeline, listed in a different order.
+    """
+    participants = []
+    for index in (6, 7, 8, 9, 10, 1, 2, 3, 4, 5):
+        participants.append({
+            "participantId": index, "puuid": f"puuid-{index}", "championName": f"Champion{index}", "teamPosition": "TOP",
+            "champLevel": 18, "kills": index, "deaths": 1, "assists": 2, "goldEarned": 1000, "totalDamageDealtToChampions": 2000,
+            "visionScore": 10, "wardsPlaced": 3, "detectorWardsPlaced": 1, "totalMinionsKilled": 100, "neutralMinionsKilled": 10,
+            "perks": {}, "challenges": {"kda": 2.0, "abilityUses": 100}, "win": index <= 5
+        })
+
+    return {"metadata": {"matchId": mock_matchId}, "info": {"participants": participants}}
+
+@pytest.mark.match_summary
+class TestMatchSummary:
+    """
+    Test suite for the whole-lobby match summary.
+    """
+    def setup_method(self):
+        self.match_details = make_matchDetails()
+        self.timeline_index = build_timelineIndex(make_timeline())
+
+    def test_matches_player_summaries(self):
+        match_summary = extract_matchSummary(self.match_details, self.timeline_index)
+
+        assert [entry["puuid"] for entry in match_summary] == [player["puuid"] for player in self.match_details["info"]["participants"]]
+        for entry in match_summary:
+            assert entry["participantId"] == int(entry["puuid"].split("-")[1])
+            assert entry["player_stats"] == extract_playerDetails(entry["puuid"], self.match_details)
+            assert entry["player_timeline"] == extract_playerTimeline_indexed(entry["puuid"], self.timeline_index)
+
+    def test_invalid_match_details(self):
+        assert extract_matchSummary({}, self.timeline_index) == []
+
+    @patch("backend.python_legacy.player_summary.get_matchBundle")
+    def test_get_matchSummary_fetches_once(self, mock_matchBundle):
+        mock_matchBundle.return_value = {"match_details": self.match_details, "timeline_index": self.timeline_index}
+
+        match_summary = get_matchSummary(mock_matchId)
+
+        assert len(match_summary) == 10
+        mock_matchBundle.assert_called_once_with(mock_matchId)
+
+    def test_async_extraction_off_the_event_loop(self, tmp_path):
+        threads = []
+
+        def record(function):
+            def wrapped(*args):
+                threads.append(threading.current_thread())
+                return function(*args)
+            return wrapped
+
+        async def matchTimeline(match_id):
+            return make_timeline()
+
+        async def matchDetails(match_id):
+            return self.match_details
+
+        warehouse = MatchWarehouse(str(tmp_path / "warehouse.sqlite3"))
+        with patch("backend.python_legacy.async_riot_client.get_matchTimeline", side_effect=matchTimeline), \
+             patch("backend.python_legacy.async_riot_client.get_matchDetails", side_effect=matchDetails), \
+             patch("backend.python_legacy.player_summary.build_timelineIndex", record(build_timelineIndex)), \
+             patch("backend.python_legacy.player_summary.extract_matchSummary", record(extract_matchSummary)):
+            match_summary = asyncio.run(get_matchSummary_async(mock_matchId))
+            with patch("backend.python_legacy.match_warehouse.warehouse", warehouse):
+                asyncio.run(get_playerSummary_async("puuid-1", mock_matchId))
+
+        assert len(match_summary) == 10
+        # index, summary, then index and summary again for the warehouse
+        assert len(threads) == 4
+        assert threading.main_thread() not in threads
 
 @pytest.mark.player_summary
 class TestPlayerAnalysisPerformance:
     """
     Test suite for the get_playerPerformance function.
     """
-    @patch("src.analysis.player_summary.get_playerTimeline")
-    @patch("src.analysis.player_summary.get_playerDetails")
-    def test_get_playerPerformance(self, mock_matchStats, mock_matchTimeData):
+    @patch("backend.python_legacy.player_summary.extract_playerTimeline_indexed")
+    @patch("backend.python_legacy.player_summary.extract_playerDetails")
+    @patch("backend.python_legacy.player_summary.get_matchBundle")
+    def test_get_playerPerformance(self, mock_matchBundle, mock_matchStats, mock_matchTimeData):
 
         matchDetails_response = {"champion": "Ahri", "kills": 10}
         matchTimeline_response = {
@@ -168,7 +473,7 @@ class TestPlayerAnalysisPerformance:
                 "participantFrames": {"totalGold": 1500}
             }
             
-        
+        mock_matchBundle.return_value = {"match_details": {"info": "details"}, "timeline_index": {"frames": "index"}}
         mock_matchStats.return_value = matchDetails_response
         mock_matchTimeData.return_value = matchTimeline_response
 
@@ -178,4 +483,143 @@ class TestPlayerAnalysisPerformance:
             "player_stats": matchDetails_response,
             "player_timeline": matchTimeline_response
         }
-    
\ No newline at end of file
+        # the match is fetched once and both extractors share the payloads
+        mock_matchBundle.assert_called_once_with(mock_matchId)
+        mock_matchStats.assert_called_once_with(mock_puuid, {"info": "details"})
+        mock_matchTimeData.assert_called_once_with(mock_puuid, {"frames": "index"})
+
+@pytest.mark.player_summary_stream
+class TestPlayerSummaryStream:
+    """
+    Test suite for the player summaries built with the streaming timeline parser.
+    """
+    def setup_method(self):
+        self.expected = {
+            "player_stats": extract_playerDetails("puuid-1", make_matchDetails()),
+            "player_timeline": extract_playerTimeline_indexed("puuid-1", build_timelineIndex(make_timeline()))
+        }
+
+    def make_source(self, tmp_path) -> FixtureDataSource:
+        write_fixture(str(tmp_path), "matches", mock_matchId, make_matchDetails())
+        write_fixture(str(tmp_path), "timelines", mock_matchId, make_timeline())
+        return FixtureDataSource(str(tmp_path))
+
+    def test_matches_indexed_summary(self, tmp_path):
+        with patch.object(data_source, "source", self.make_source(tmp_path)), \
+             patch("backend.python_legacy.player_summary.TIMELINE_STREAM", "true"), \
+             patch("backend.python_legacy.player_summary.get_matchBundle") as mock_matchBundle:
+            assert get_playerSummary("puuid-1", mock_matchId) == self.expected
+            assert asyncio.run(get_playerSummary_async("puuid-1", mock_matchId)) == self.expected
+            # the timeline is never indexed
+            mock_matchBundle.assert_not_called()
+
+    def test_auto_streams_without_caches(self):
+        with patch("backend.python_legacy.player_summary.TIMELINE_STREAM", "auto"), \
+             patch("backend.python_legacy.riot_client.match_cache", None), \
+             patch("backend.python_legacy.riot_client.memo_cache", None):
+            assert stream_timelines()
+            with patch("backend.python_legacy.riot_client.memo_cache", MemoCache(8)):
+                assert not stream_timelines()
+
+        with patch("backend.python_legacy.player_summary.TIMELINE_STREAM", "false"):
+            assert not stream_timelines()
+
+@pytest.mark.match_bundle
+class TestMatchBundle:
+    """
+    Test suite for the get_matchBundle function.
+    """
+    @patch("backend.python_legacy.player_summary.get_timelineIndex")
+    @patch("backend.python_legacy.riot_client.get_matchDetails")
+    def test_get_matchBundle(self, mock_matchDetails, mock_timelineIndex):
+        mock_matchDetails.return_value = {"info": "details"}
+        mock_timelineIndex.return_value = {"frames": "index"}
+
+        bundle = get_matchBundle(mock_matchId)
+
+        assert bundle == {"match_details": {"info": "details"}, "timeline_index": {"frames": "index"}}
+        mock_matchDetails.assert_called_once_with(mock_matchId)
+        mock_timelineIndex.assert_called_once_with(mock_matchId)
+
+    @patch("backend.python_legacy.player_summary.get_timelineIndex")
+    @patch("backend.python_legacy.riot_client.get_matchDetails")
+    def test_get_matchBundle_keeps_budget_share(self, mock_matchDetails, mock_timelineIndex):
+        shares = []
+        mock_matchDetails.side_effect = lambda match_id: shares.append(budget_share.get()) or {"info": "details"}
+        mock_timelineIndex.side_effect = lambda match_id: shares.append(budget_share.get()) or {"frames": "index"}
+
+        token = budget_share.set(0.25)
+        try:
+            get_matchBundle(mock_matchId)
+        finally:
+            budget_share.reset(token)
+
+        # the pool threads run with the share of the caller (ex: the prefetch worker)
+        assert shares == [0.25, 0.25]
+        assert budget_share.get() == 1.0
+
+    @patch("backend.python_legacy.player_summary.get_timelineIndex")
+    @patch("backend.python_legacy.riot_client.get_matchDetails")
+    def test_get_matchBundle_error(self, mock_matchDetails, mock_matchTimeline):
+        mock_matchDetails.return_value = {"info": "details"}
+        mock_matchTimeline.side_effect = Exception("Match timeline fetch error")
+
+        with pytest.raises(Exception) as exc_info:
+            get_matchBundle(mock_matchId)
+
+        assert str(exc_info.value) == "Match timeline fetch error"
+
+@pytest.mark.player_summaries
+class TestPlayerSummaries:
+    """
+    Test suite for the get_playerSummaries_async function.
+    """
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
+    def test_get_playerSummaries_partial_failure(self, mock_playerSummary):
+        async def summary(puuid, match_id):
+            if match_id == "match2":
+                raise RiotAPIError("API request failed: 404 - Data not found", status_code=404)
+            if match_id == "match3":
+                raise Exception("unexpected")
+            return {"player_stats": {"match": match_id}, "player_timeline": []}
+        mock_playerSummary.side_effect = summary
+
+        summaries = asyncio.run(get_playerSummaries_async(mock_puuid, ["match1", "match2", "match3"]))
+
+        assert summaries == [
+            {"match_id": "match1", "player_summary": {"player_stats": {"match": "match1"}, "player_timeline": []}},
+            {"match_id": "match2", "error": {"status_code": 404, "detail": "API request failed: 404 - Data not found"}},
+            {"match_id": "match3", "error": {"status_code": 500, "detail": "Internal Server Error: unexpected"}},
+        ]
+
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
+    def test_get_playerSummaries_bounded(self, mock_playerSummary):
+        in_flight = {"now": 0, "max": 0}
+
+        async def summary(puuid, match_id):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return {"player_stats": {}, "player_timeline": []}
+        mock_playerSummary.side_effect = summary
+
+        match_ids = [f"match{index}" for index in range(10)]
+        summaries = asyncio.run(get_playerSummaries_async(mock_puuid, match_ids, concurrency=3))
+
+        assert [entry["match_id"] for entry in summaries] == match_ids
+        assert in_flight["max"] == 3
+
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
+    def test_iter_playerSummaries_fastest_first(self, mock_playerSummary):
+        delays = {"match1": 0.03, "match2": 0.0, "match3": 0.01}
+
+        async def summary(puuid, match_id):
+            await asyncio.sleep(delays[match_id])
+            return {"player_stats": {"match": match_id}, "player_timeline": []}
+        mock_playerSummary.side_effect = summary
+
+        async def collect():
+            return [entry["match_id"] async for entry in iter_playerSummaries_async(mock_puuid, list(delays))]
+
+        assert asyncio.run(collect()) == ["match2", "match3", "match1"]
@@ -0,0 +1,88 @@
+# Test suite for the background prefetch of tracked players' matches.
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from backend.python_legacy.prefetch_worker import PrefetchWorker
+from backend.python_legacy.rate_limiter import budget_share
+from backend.python_legacy.riot_client import RiotAPIError
+
+@pytest.mark.prefetch_worker
+class TestPrefetchWorker:
+    """
+    Test suite for the PrefetchWorker class.
+    """
+    def setup_method(self):
+        self.recent = {"player-1": ["match-2", "match-1"], "player-2": ["match-3", "match-2"]}
+        self.failing = set()
+        self.prefetched = []
+        self.shares = []
+
+    async def recentMatches(self, puuid, count):
+        if puuid not in self.recent:
+            raise RiotAPIError("Data not found", status_code=404)
+        return self.recent[puuid][:count]
+
+    async def playerSummary(self, puuid, match_id):
+        self.shares.append(budget_share.get())
+        if match_id in self.failing:
+            raise RiotAPIError("Service unavailable", status_code=503)
+        self.prefetched.append((puuid, match_id))
+        return {"player_stats": {}, "player_timeline": []}
+
+    def run_once(self, worker):
+        with patch("backend.python_legacy.async_riot_client.get_recentMatches", side_effect=self.recentMatches), \
+             patch("backend.python_legacy.prefetch_worker.get_playerSummary_async", side_effect=self.playerSummary):
+            return asyncio.run(worker.run_once())
+
+    def test_prefetches_new_matches_only(self):
+        worker = PrefetchWorker(["player-1", "player-2"], rate_share=0.25)
+
+        results = self.run_once(worker)
+        assert results["player-1"] == {"new_matches": 2, "failed_matches": []}
+        assert len(self.prefetched) == 4
+        assert self.shares == [0.25] * 4
+
+        self.recent["player-1"].insert(0, "match-4")
+        self.prefetched.clear()
+        results = self.run_once(worker)
+        assert self.prefetched == [("player-1", "match-4")]
+        assert results["player-2"]["new_matches"] == 0
+
+    def test_failed_match_is_retried(self):
+        worker = PrefetchWorker(["player-1"])
+        self.failing.add("match-1")
+
+        results = self.run_once(worker)
+        assert results["player-1"] == {"new_matches": 1, "failed_matches": ["match-1"]}
+        assert "player-1" not in worker.cursors
+
+        self.failing.clear()
+        self.run_once(worker)
+        assert self.prefetched[-2:] == [("player-1", "match-2"), ("player-1", "match-1")]
+        assert worker.cursors["player-1"] == "match-2"
+
+    def test_player_error_does_not_stop_the_poll(self):
+        worker = PrefetchWorker(["unknown", "player-1"])
+
+        results = self.run_once(worker)
+
+        assert "error" in results["unknown"]
+        assert results["player-1"]["new_matches"] == 2
+        assert budget_share.get() == 1.0
+
+    def test_start_and_stop(self):
+        worker = PrefetchWorker(["player-1"], interval=60)
+
+        async def run():
+            worker.start()
+            await asyncio.sleep(0.01)
+            await worker.stop()
+
+        with patch("backend.python_legacy.async_riot_client.get_recentMatches", side_effect=self.recentMatches), \
+             patch("backend.python_legacy.prefetch_worker.get_playerSummary_async", side_effect=self.playerSummary):
+            asyncio.run(run())
+
+        assert len(self.prefetched) == 2
+        assert worker._task is None
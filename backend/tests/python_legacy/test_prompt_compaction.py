@@ -0,0 +1,107 @@
+# Test suite for the token-budgeted prompt compaction.
+
+import pytest
+from unittest.mock import patch
+
+from backend.python_legacy.llm_analysis import prepare_prompt
+from backend.python_legacy.prompt_compaction import compact_playerSummary, count_tokens, encode_event, encode_playerStats
+
+def make_summary(minutes:int = 30) -> dict:
+    """
+    Returns a player summary of participant 1 with a kill, a death and a plate every minute and a dragon every five.
+    """
+    timeline = []
+    for minute in range(1, minutes + 1):
+        events = [
+            {"type": "CHAMPION_KILL", "killerId": 1, "victimId": 6 + minute % 5, "assistingParticipantIds": [2], "position": {"x": 1, "y": 2}},
+            {"type": "CHAMPION_KILL", "killerId": 7, "victimId": 1, "bounty": 300},
+            {"type": "TURRET_PLATE_DESTROYED", "killerId": 1, "laneType": "TOP_LANE", "teamId": 200},
+        ]
+        if minute % 5 == 0:
+            events.append({"type": "ELITE_MONSTER_KILL", "killerId": 2, "killerTeamId": 100, "monsterType": "DRAGON", "monsterSubType": "FIRE_DRAGON"})
+        timeline.append({"timestamp": minute, "events": events, "participantFrames": {"participantId": 1, "level": min(minute, 18), "currentGold": 100 * minute}})
+
+    return {
+        "player_stats": {
+            "champion": "Ahri", "role": "MIDDLE", "champLevel": 18, "kills": 30, "deaths": 30, "assists": 0, "totalGold": 15000,
+            "totalDamage": 40000, "visionScore": 30, "wardsPlaced": 12, "detectorWardsPlaced": 3, "cs": 250,
+            "runes": {"styles": [{"selections": [{"perk": 8112}]}]}, "challenge": {"kda": 1.0, "damagePerMinute": 1333.3333}, "win": False
+        },
+        "player_timeline": timeline
+    }
+
+@pytest.mark.prompt_compaction
+class TestEncoding:
+    """
+    Test suite for the compact encodings.
+    """
+    def test_encode_playerStats(self):
+        line = encode_playerStats(make_summary()["player_stats"])
+
+        assert line.startswith("stats: Ahri MIDDLE loss | lvl 18 | KDA 30/30/0")
+        assert "damagePerMinute 1333.33" in line
+        assert "8112" not in line
+
+    def test_encode_event_point_of_view(self):
+        assert encode_event({"type": "CHAMPION_KILL", "killerId": 1, "victimId": 6}, 1) == (5, "killed 6")
+        assert encode_event({"type": "CHAMPION_KILL", "killerId": 6, "victimId": 1, "assistingParticipantIds": [7, 8]}, 1) == (5, "died to 6 (assists 7,8)")
+        assert encode_event({"type": "CHAMPION_KILL", "killerId": 2, "victimId": 6, "assistingParticipantIds": [1]}, 1) == (3, "assisted 2 on 6")
+        assert encode_event({"type": "ELITE_MONSTER_KILL", "killerTeamId": 200, "monsterType": "BARON_NASHOR"}, 1) == (4, "BARON_NASHOR by team 200")
+        assert encode_event({"type": "WARD_PLACED"}, 1) is None
+
+    def test_count_tokens_estimate(self):
+        with patch("backend.python_legacy.prompt_compaction.tiktoken", None):
+            assert count_tokens("m12 killed 6") == 5
+            assert count_tokens("") == 0
+
+@pytest.mark.prompt_compaction
+class TestCompactPlayerSummary:
+    """
+    Test suite for the compact_playerSummary function.
+    """
+    def test_merges_repeats(self):
+        compacted = compact_playerSummary(make_summary(), token_budget=10000)
+
+        assert "m1-30 plate TOP_LANE x30" in compacted["text"].splitlines()
+        assert "m1-30 died to 7 x30" in compacted["text"].splitlines()
+        assert compacted["lines_kept"] == compacted["lines_total"]
+
+    def test_budget_keeps_most_informative(self):
+        summary = make_summary()
+        budget = count_tokens(encode_playerStats(summary["player_stats"])) + 40
+
+        compacted = compact_playerSummary(summary, token_budget=budget)
+        lines = compacted["text"].splitlines()
+
+        assert compacted["tokens"] <= budget
+        assert lines[0].startswith("stats:")
+        assert compacted["lines_kept"] < compacted["lines_total"]
+        # kills and deaths are kept before dragons, plates and snapshots
+        assert any("killed" in line for line in lines[1:])
+        assert "m1-30 died to 7 x30" in lines
+        assert not any("plate" in line or "gold" in line or "DRAGON" in line for line in lines[1:])
+
+    def test_chronological_order(self):
+        lines = compact_playerSummary(make_summary(), token_budget=150)["text"].splitlines()[1:]
+
+        minutes = [int(line.split()[0][1:].split("-")[0]) for line in lines]
+        assert minutes == sorted(minutes)
+
+    def test_empty_timeline(self):
+        compacted = compact_playerSummary({"player_stats": {}, "player_timeline": []}, token_budget=100)
+
+        assert compacted["text"] == "stats: unknown"
+        assert compacted["lines_total"] == 0
+
+@pytest.mark.prompt_compaction
+class TestPreparePrompt:
+    """
+    Test suite for the prepare_prompt function.
+    """
+    def test_reports_token_counts(self):
+        prepared = prepare_prompt(make_summary(), token_budget=200)
+
+        assert prepared["tokens_after"] < prepared["tokens_before"]
+        assert prepared["tokens_after"] == count_tokens(prepared["prompt"])
+        assert "Identify misplays" in prepared["prompt"]
+        assert "stats: Ahri MIDDLE loss" in prepared["prompt"]
@@ -0,0 +1,46 @@
+# Test suite for the quantile sketch of the running aggregates.
+
+import json
+import numpy as np
+import pytest
+
+from backend.python_legacy.quantile_sketch import QuantileSketch
+
+@pytest.mark.quantile_sketch
+class TestQuantileSketch:
+    """
+    Test suite for the QuantileSketch class.
+    """
+    def setup_method(self):
+        self.values = np.random.default_rng(7).lognormal(1.0, 0.8, 5000)
+
+    def test_relative_accuracy(self):
+        sketch = QuantileSketch(relative_accuracy=0.01).add(self.values)
+
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+            exact = np.quantile(self.values, q, method="lower")
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+    def test_merge_matches_single_sketch(self):
+        merged = QuantileSketch().add(self.values[:1000]).merge(QuantileSketch().add(self.values[1000:]))
+        single = QuantileSketch().add(self.values)
+
+        assert merged.buckets == single.buckets
+        assert merged.count == single.count == 5000
+
+    def test_round_trip(self):
+        sketch = QuantileSketch().add(self.values).add([0.0, -1.0, np.nan])
+
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+        assert restored.count == 5002
+        assert restored.zero_count == 2
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+        assert restored.quantile(0.0) == 0.0
+
+    def test_empty(self):
+        assert QuantileSketch().quantile(0.5) is None
+
+    def test_merge_different_accuracy(self):
+        with pytest.raises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.05))
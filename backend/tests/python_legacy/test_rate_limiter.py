@@ -0,0 +1,149 @@
+# Test suite for the Riot API rate limiter.
+
+import pytest
+from unittest.mock import patch, Mock
+from requests.exceptions import HTTPError
+
+from backend.python_legacy.rate_limiter import RiotRateLimiter, budget_share, parse_limits, endpoint_keys
+from backend.python_legacy.riot_client import get_matchDetails, RiotAPIError
+
+match_url = "https://americas.api.riotgames.com/lol/match/v5/matches/matchId_1"
+timeline_url = "https://americas.api.riotgames.com/lol/match/v5/matches/matchId_1/timeline"
+
+@pytest.mark.rate_limiter
+class TestRateLimiter:
+    """
+    Test suite for the RiotRateLimiter class.
+    """
+    def test_parse_limits(self):
+        assert parse_limits("20:1,100:120") == [(20, 1), (100, 120)]
+        assert parse_limits("") == []
+
+    def test_endpoint_keys(self):
+        assert endpoint_keys(match_url) == ("americas.api.riotgames.com", "americas.api.riotgames.com:match-v5.getMatch")
+        assert endpoint_keys(timeline_url)[1] == "americas.api.riotgames.com:match-v5.getTimeline"
+        assert endpoint_keys(
+            "https://americas.api.riotgames.com/lol/match/v5/matches/by-puuid/1234/ids?count=5"
+        )[1] == "americas.api.riotgames.com:match-v5.getMatchIdsByPUUID"
+
+    @patch("backend.python_legacy.rate_limiter.time.monotonic")
+    def test_reserve_app_limit(self, mock_monotonic):
+        limiter = RiotRateLimiter("2:1,3:10", "")
+
+        mock_monotonic.return_value = 100.0
+        assert limiter.reserve(match_url) == 0
+        assert limiter.reserve(timeline_url) == 0
+        # the app limit is shared by every endpoint of the region
+        assert limiter.reserve(match_url) == pytest.approx(1.0)
+
+        mock_monotonic.return_value = 101.0
+        assert limiter.reserve(match_url) == 0
+        assert limiter.reserve(match_url) == pytest.approx(9.0)
+
+        mock_monotonic.return_value = 110.0
+        assert limiter.reserve(match_url) == 0
+        assert limiter.waits == 2
+
+    @patch("backend.python_legacy.rate_limiter.time.monotonic")
+    def test_budget_share(self, mock_monotonic):
+        limiter = RiotRateLimiter("4:1,10:10", "")
+        mock_monotonic.return_value = 100.0
+
+        token = budget_share.set(0.5)
+        try:
+            assert limiter.reserve(match_url) == 0
+            assert limiter.reserve(match_url) == 0
+            # background callers stop at half of the window
+            assert limiter.reserve(match_url) == pytest.approx(1.0)
+        finally:
+            budget_share.reset(token)
+
+        # the other half is left for foreground callers
+        assert limiter.reserve(match_url) == 0
+        assert limiter.reserve(match_url) == 0
+        assert limiter.reserve(match_url) == pytest.approx(1.0)
+
+    @patch("backend.python_legacy.rate_limiter.time.monotonic")
+    def test_update_from_headers(self, mock_monotonic):
+        limiter = RiotRateLimiter("100:1", "")
+        mock_monotonic.return_value = 100.0
+
+        # Riot reports 2 requests in the method window although this process sent none
+        limiter.update(match_url, {
+            "X-App-Rate-Limit": "100:1",
+            "X-App-Rate-Limit-Count": "1:1",
+            "X-Method-Rate-Limit": "3:10",
+            "X-Method-Rate-Limit-Count": "2:10",
+        })
+
+        assert limiter.reserve(match_url) == 0
+        assert limiter.reserve(match_url) == pytest.approx(10.0)
+        # other endpoints keep their own method limits
+        assert limiter.reserve(timeline_url) == 0
+
+    @patch("backend.python_legacy.rate_limiter.time.monotonic")
+    def test_backoff(self, mock_monotonic):
+        limiter = RiotRateLimiter("100:1", "")
+        mock_monotonic.return_value = 100.0
+
+        assert limiter.backoff(match_url, {"Retry-After": "5", "X-Rate-Limit-Type": "method"}) is True
+        assert limiter.reserve(match_url) == pytest.approx(5.0)
+        assert limiter.reserve(timeline_url) == 0
+
+        assert limiter.backoff(match_url, {"Retry-After": "3", "X-Rate-Limit-Type": "application"}) is True
+        assert limiter.reserve(timeline_url) == pytest.approx(3.0)
+
+        # service limits come without Retry-After and are not retried
+        assert limiter.backoff(match_url, {"X-Rate-Limit-Type": "service"}) is False
+
+@pytest.mark.riot_client_rate_limit
+class TestRiotClientRateLimit:
+    """
+    Test suite for rate limited riot_client requests.
+    """
+    def mock_response(self, status_code, headers, json=None):
+        response = Mock()
+        response.status_code = status_code
+        response.headers = headers
+        response.text = "Rate limit exceeded"
+        response.json.return_value = json
+        if status_code >= 400:
+            response.raise_for_status.side_effect = HTTPError(f"HTTP Error: {status_code}", response=response)
+        return response
+
+    def fake_clock(self, mock_monotonic, mock_sleep):
+        # sleeping advances the mocked clock instead of waiting
+        clock = {"now": 100.0}
+        mock_monotonic.side_effect = lambda: clock["now"]
+        mock_sleep.side_effect = lambda seconds: clock.update(now=clock["now"] + seconds)
+
+    @patch("backend.python_legacy.rate_limiter.time.sleep")
+    @patch("backend.python_legacy.rate_limiter.time.monotonic")
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_429_queued_and_retried(self, mock_get, mock_monotonic, mock_sleep):
+        self.fake_clock(mock_monotonic, mock_sleep)
+        rate_limited = self.mock_response(429, {"Retry-After": "2", "X-Rate-Limit-Type": "application"})
+        mock_get.side_effect = [rate_limited, self.mock_response(200, {"X-App-Rate-Limit": "20:1"}, json={"info": "details"})]
+
+        with patch("backend.python_legacy.riot_client.rate_limiter", RiotRateLimiter("20:1", "")):
+            assert get_matchDetails("matchId_1") == {"info": "details"}
+
+        assert mock_get.call_count == 2
+        mock_sleep.assert_called_once_with(pytest.approx(2.0))
+        # the discarded 429 releases its pooled connection
+        rate_limited.close.assert_called_once()
+
+    @patch("backend.python_legacy.rate_limiter.time.sleep")
+    @patch("backend.python_legacy.rate_limiter.time.monotonic")
+    @patch("backend.python_legacy.riot_client.RIOT_RATE_LIMIT_MAX_RETRIES", 1)
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_429_retries_exhausted(self, mock_get, mock_monotonic, mock_sleep):
+        self.fake_clock(mock_monotonic, mock_sleep)
+        mock_get.return_value = self.mock_response(429, {"Retry-After": "1", "X-Rate-Limit-Type": "method"})
+
+        with patch("backend.python_legacy.riot_client.rate_limiter", RiotRateLimiter("20:1", "")):
+            with pytest.raises(RiotAPIError) as exc_info:
+                get_matchDetails("matchId_1")
+
+        assert exc_info.value.status_code == 429
+        assert mock_get.call_count == 2
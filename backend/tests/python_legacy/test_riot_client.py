@@ -2,9 +2,12 @@
 
 import pytest
 from unittest.mock import patch, Mock, ANY
-from requests.exceptions import HTTPError
+from requests.exceptions import HTTPError, ReadTimeout
 
-from backend.python_legacy.riot_client import get_PUUID, get_recentMatches, get_matchDetails, get_matchTimeline, RiotAPIError
+from backend.python_legacy.riot_client import get_PUUID, get_recentMatches, get_matchDetails, get_matchTimeline, RiotAPIError, create_session
+from backend.python_legacy.riot_client import open_matchTimeline
+from backend.python_legacy.match_cache import MatchCache
+from backend.python_legacy.memo_cache import MemoCache
 
 @pytest.mark.riot_client_puuid
 class TestGetPUUID:
@@ -17,7 +20,7 @@ class TestGetPUUID:
         self.region = "americas"
 
     # Test for successful PUUID retrieval
-    @patch("src.riot_api.riot_client.requests.get")
+    @patch("backend.python_legacy.riot_client.session.get")
     def test_get_PUUID(self, mock_get):
         response = { "puuid": "1234-5678-8765-4321" }
         mock_get.return_value.status_code = 200
@@ -28,10 +31,10 @@ class TestGetPUUID:
         assert puuid == response["puuid"] # Expected PUUID from mock response
 
         expected_url = f"https://{self.region}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{self.gameName}/{self.tagLine}"
-        mock_get.assert_called_once_with(expected_url, headers={"X-Riot-Token": ANY})
+        mock_get.assert_called_once_with(expected_url, headers={"X-Riot-Token": ANY}, timeout=ANY)
 
     # Test for get_PUUID error handling 
-    @patch("src.riot_api.riot_client.requests.get")
+    @patch("backend.python_legacy.riot_client.session.get")
     @pytest.mark.parametrize("status_code, error_message", [
         (400, "Bad request"),
         (401, "Unauthorized"),
@@ -71,7 +74,7 @@ class TestGetRecentMatches:
         self.count = 3
 
     # Test for successful recent matches retrieval
-    @patch("src.riot_api.riot_client.requests.get")
+    @patch("backend.python_legacy.riot_client.session.get")
     def test_get_recentMatches(self, mock_get):
         response = ["matchId_1", "matchId_2", "matchId_3"]
         mock_get.return_value.status_code = 200
@@ -82,10 +85,10 @@ class TestGetRecentMatches:
         assert matches == response # Expected matches from mock response
 
         expected_url = f"https://{self.region}.api.riotgames.com/lol/match/v5/matches/by-puuid/{self.puuid}/ids?count={self.count}"
-        mock_get.assert_called_once_with(expected_url, headers={"X-Riot-Token": ANY})
+        mock_get.assert_called_once_with(expected_url, headers={"X-Riot-Token": ANY}, timeout=ANY)
 
     # Test for get_PUUID error handling 
-    @patch("src.riot_api.riot_client.requests.get")
+    @patch("backend.python_legacy.riot_client.session.get")
     @pytest.mark.parametrize("status_code, error_message", [
         (400, "Bad request"),
         (401, "Unauthorized"),
@@ -124,7 +127,7 @@ class TestGetMatchDetails:
         self.matchId = "matchId_1"
 
     # Test for successful match details retrieval
-    @patch("src.riot_api.riot_client.requests.get")
+    @patch("backend.python_legacy.riot_client.session.get")
     def test_get_matchDetails(self, mock_get):
         response = {
             "metadata": {"dataVersion": "1", "matchId": "matchId_1", "participants": []},
@@ -138,10 +141,10 @@ class TestGetMatchDetails:
         assert match_details == response # Expected match details from mock response
 
         expected_url = f"https://americas.api.riotgames.com/lol/match/v5/matches/{self.matchId}"
-        mock_get.assert_called_once_with(expected_url, headers={"X-Riot-Token": ANY})
+        mock_get.assert_called_once_with(expected_url, headers={"X-Riot-Token": ANY}, timeout=ANY)
 
     # Test for get_match_details error handling 
-    @patch("src.riot_api.riot_client.requests.get")
+    @patch("backend.python_legacy.riot_client.session.get")
     @pytest.mark.parametrize("status_code, error_message", [
         (400, "Bad request"),
         (401, "Unauthorized"),
@@ -178,7 +181,7 @@ class TestGetMatchTimeline:
         self.matchId = "matchId_1"
 
     # Test for successful match details retrieval
-    @patch("src.riot_api.riot_client.requests.get")
+    @patch("backend.python_legacy.riot_client.session.get")
     def test_get_matchTimeLine(self, mock_get):
         response = {
             "metadata": {"dataVersion": "1", "matchId": "matchId_1", "participants": []},
@@ -192,10 +195,10 @@ class TestGetMatchTimeline:
         assert match_timeline == response # Expected match details from mock response
 
         expected_url = f"https://americas.api.riotgames.com/lol/match/v5/matches/{self.matchId}/timeline"
-        mock_get.assert_called_once_with(expected_url, headers={"X-Riot-Token": ANY})
+        mock_get.assert_called_once_with(expected_url, headers={"X-Riot-Token": ANY}, timeout=ANY)
 
     # Test for get_match_details error handling 
-    @patch("src.riot_api.riot_client.requests.get")
+    @patch("backend.python_legacy.riot_client.session.get")
     @pytest.mark.parametrize("status_code, error_message", [
         (400, "Bad request"),
         (401, "Unauthorized"),
@@ -222,3 +225,125 @@ class TestGetMatchTimeline:
         
         assert str(exc_info.value) == f"API request failed: {status_code} - {error_message}"
         mock_get.assert_called_once()
+
+@pytest.mark.riot_client_session
+class TestSession:
+    """
+    Test suite for the pooled HTTP session.
+    """
+    @patch("backend.python_legacy.riot_client.RIOT_MAX_RETRIES", 3)
+    @patch("backend.python_legacy.riot_client.RIOT_POOL_SIZE", 7)
+    def test_create_session(self):
+        session = create_session()
+        adapter = session.get_adapter("https://americas.api.riotgames.com")
+
+        assert adapter._pool_maxsize == 7
+        assert adapter.max_retries.total == 3
+        assert 503 in adapter.max_retries.status_forcelist
+
+    def test_retries_are_rate_limited(self):
+        retry = create_session().get_adapter("https://americas.api.riotgames.com").max_retries
+        pool = Mock(scheme="https", host="americas.api.riotgames.com")
+        response = Mock(status=503, headers={}, get_redirect_location=Mock(return_value=False))
+
+        with patch("backend.python_legacy.riot_client.rate_limiter") as mock_limiter:
+            retry.increment("GET", "/lol/match/v5/matches/matchId_1", response=response, _pool=pool)
+
+        mock_limiter.acquire.assert_called_once_with("https://americas.api.riotgames.com/lol/match/v5/matches/matchId_1")
+        # 429s are left to the rate limiter's backoff, even with a Retry-After header
+        assert not retry.is_retry("GET", 429, has_retry_after=True)
+
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_stream_error_without_response(self, mock_get):
+        mock_get.return_value.raise_for_status.side_effect = HTTPError("HTTP Error")
+
+        with pytest.raises(RiotAPIError) as exc_info:
+            with open_matchTimeline("matchId_1"):
+                pass
+
+        assert exc_info.value.status_code is None
+
+    @patch("backend.python_legacy.riot_client.RIOT_READ_TIMEOUT", 4.0)
+    @patch("backend.python_legacy.riot_client.RIOT_CONNECT_TIMEOUT", 1.5)
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_timeout_passed(self, mock_get):
+        mock_get.return_value.json.return_value = ["matchId_1"]
+
+        get_recentMatches("1234-5678-8765-4321", count=1)
+
+        assert mock_get.call_args.kwargs["timeout"] == (1.5, 4.0)
+
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_timeout_error(self, mock_get):
+        mock_get.side_effect = ReadTimeout("Read timed out")
+
+        with pytest.raises(RiotAPIError) as exc_info:
+            get_matchDetails("matchId_1")
+
+        assert str(exc_info.value) == "Network error occurred: Read timed out"
+
+@pytest.mark.riot_client_cache
+class TestRiotClientCache:
+    """
+    Test suite for serving riot_client requests from the on-disk cache.
+    """
+    def setup_method(self):
+        self.matchId = "matchId_1"
+        self.puuid = "1234-5678-8765-4321"
+
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_get_matchDetails_cached(self, mock_get, tmp_path):
+        response = {"metadata": {"matchId": "matchId_1"}, "info": {"gameId": 123456789}}
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = response
+
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+        with patch("backend.python_legacy.riot_client.match_cache", cache):
+            assert get_matchDetails(self.matchId) == response
+            assert get_matchDetails(self.matchId) == response
+
+        mock_get.assert_called_once()
+        assert cache.metrics()["hits"] == 1
+
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_get_matchDetails_memoized(self, mock_get):
+        response = {"metadata": {"matchId": "matchId_1"}, "info": {"gameId": 123456789}}
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = response
+
+        memo = MemoCache(max_entries=8)
+        with patch("backend.python_legacy.riot_client.memo_cache", memo):
+            assert get_matchDetails(self.matchId) == response
+            assert get_matchDetails(self.matchId) == response
+
+        mock_get.assert_called_once()
+        assert memo.metrics()["hits"] == 1
+
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_get_recentMatches_ttl(self, mock_get, tmp_path):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = ["matchId_1"]
+
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+        with patch("backend.python_legacy.riot_client.match_cache", cache), \
+                patch("backend.python_legacy.riot_client.RECENT_MATCHES_TTL", 0):
+            get_recentMatches(self.puuid, count=1)
+            get_recentMatches(self.puuid, count=1)
+
+        # an expired entry goes back to the network
+        assert mock_get.call_count == 2
+
+    @patch("backend.python_legacy.riot_client.session.get")
+    def test_errors_not_cached(self, mock_get, tmp_path):
+        mock_response = Mock()
+        mock_response.status_code = 404
+        mock_response.text = "Data not found"
+        mock_response.raise_for_status.side_effect = HTTPError("HTTP Error: 404", response=mock_response)
+        mock_get.return_value = mock_response
+
+        cache = MatchCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+        with patch("backend.python_legacy.riot_client.match_cache", cache):
+            with pytest.raises(RiotAPIError):
+                get_matchTimeline(self.matchId)
+
+        assert cache.metrics()["entries"] == 0
@@ -1,9 +1,13 @@
 # Test suite for the FastAPI server endpoints.
 
+import asyncio
+import json
+import httpx
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 from fastapi.testclient import TestClient
 
+from backend.python_legacy import async_riot_client, server
 from backend.python_legacy.riot_client import RiotAPIError
 from backend.python_legacy.server import app
 
@@ -16,7 +20,7 @@ class TestServerPUUID:
     This includes tests for fetching PUUID.
     """
 
-    @patch("src.riot_api.riot_client.get_PUUID")
+    @patch("backend.python_legacy.async_riot_client.get_PUUID")
     def test_fetch_puuid_success(self, mock_get_PUUID):
         mock_puuid = "test-puuid-123"
         mock_get_PUUID.return_value = mock_puuid
@@ -27,7 +31,7 @@ class TestServerPUUID:
         assert response.json() == {"puuid": mock_puuid}
         mock_get_PUUID.assert_called_once_with("testGameName", "testTagLine")
     
-    @patch("src.riot_api.riot_client.get_PUUID")
+    @patch("backend.python_legacy.async_riot_client.get_PUUID")
     def test_fetch_puuid_failure_404(self, mock_get_PUUID):
         mock_get_PUUID.side_effect = RiotAPIError("PUUID fetch error - API failure")
 
@@ -37,7 +41,7 @@ class TestServerPUUID:
         assert response.json() == {"detail": "PUUID fetch error - API failure"}
         mock_get_PUUID.assert_called_once_with("testGameName", "testTagLine")
     
-    @patch("src.riot_api.riot_client.get_PUUID")
+    @patch("backend.python_legacy.async_riot_client.get_PUUID")
     def test_fetch_puuid_failure_500(self, mock_get_PUUID):
         mock_get_PUUID.side_effect = Exception("PUUID fetch error - unexpected")
 
@@ -53,7 +57,7 @@ class TestServerMatches:
     This includes tests for fetching recent matches.
     """
 
-    @patch("src.riot_api.riot_client.get_recentMatches")
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
     def test_fetch_recent_matches_success(self, mock_get_recentMatches):
         mock_matches = ["match1", "match2", "match3"]
         mock_get_recentMatches.return_value = mock_matches
@@ -64,7 +68,7 @@ class TestServerMatches:
         assert response.json() == {"matches": mock_matches}
         mock_get_recentMatches.assert_called_once_with("test-puuid-123", 3)
     
-    @patch("src.riot_api.riot_client.get_recentMatches")
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
     def test_fetch_recent_matches_failure_404(self, mock_get_recentMatches):
         mock_get_recentMatches.side_effect = RiotAPIError("Recent matches fetch error - API failure")
 
@@ -74,7 +78,7 @@ class TestServerMatches:
         assert response.json() == {"detail": "Recent matches fetch error - API failure"}
         mock_get_recentMatches.assert_called_once_with("test-puuid-123", 3)
 
-    @patch("src.riot_api.riot_client.get_recentMatches")
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
     def test_fetch_recent_matches_failure_500(self, mock_get_recentMatches):
         mock_get_recentMatches.side_effect = Exception("Recent matches fetch error - unexpected")
 
@@ -90,7 +94,7 @@ class TestServerDetails:
     This includes tests for fetching match details.
     """
 
-    @patch("src.riot_api.riot_client.get_matchDetails")
+    @patch("backend.python_legacy.async_riot_client.get_matchDetails")
     def test_fetch_match_details_success(self, mock_get_matchDetails):
         mock_details = {"match_id": "test-match-id", "info": "details"}
         mock_get_matchDetails.return_value = mock_details
@@ -101,7 +105,7 @@ class TestServerDetails:
         assert response.json() == {"match_details": mock_details}
         mock_get_matchDetails.assert_called_once_with("test-match-id")
     
-    @patch("src.riot_api.riot_client.get_matchDetails")
+    @patch("backend.python_legacy.async_riot_client.get_matchDetails")
     def test_fetch_match_details_failure_404(self, mock_get_matchDetails):
         mock_get_matchDetails.side_effect = RiotAPIError("Match details fetch error - API failure")
 
@@ -111,7 +115,7 @@ class TestServerDetails:
         assert response.json() == {"detail": "Match details fetch error - API failure"}
         mock_get_matchDetails.assert_called_once_with("test-match-id")
 
-    @patch("src.riot_api.riot_client.get_matchDetails")
+    @patch("backend.python_legacy.async_riot_client.get_matchDetails")
     def test_fetch_match_details_failure_500(self, mock_get_matchDetails):
         mock_get_matchDetails.side_effect = Exception("Match details fetch error - unexpected")
 
@@ -127,7 +131,7 @@ class TestServerTimeline:
     This includes tests for fetching match timeline.
     """
 
-    @patch("src.riot_api.riot_client.get_matchTimeline")
+    @patch("backend.python_legacy.async_riot_client.get_matchTimeline")
     def test_fetch_match_timeline_success(self, mock_get_matchTimeline):
         mock_details = {"match_id": "test-match-id", "info": "details"}
         mock_get_matchTimeline.return_value = mock_details
@@ -137,8 +141,20 @@ class TestServerTimeline:
         assert response.status_code == 200
         assert response.json() == {"match_timeline": mock_details}
         mock_get_matchTimeline.assert_called_once_with("test-match-id")
+
+    @patch("backend.python_legacy.async_riot_client.get_matchTimeline")
+    def test_fetch_match_timeline_encoded_off_loop(self, mock_get_matchTimeline):
+        mock_get_matchTimeline.return_value = {"info": {"frames": [{"timestamp": 60000, "events": []}]}, "name": "é"}
+
+        with patch("backend.python_legacy.server.asyncio.to_thread", wraps=asyncio.to_thread) as mock_to_thread:
+            response = client.get("/match-timeline/test-match-id")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"match_timeline": mock_get_matchTimeline.return_value}
+        mock_to_thread.assert_called_once_with(server._encode_json, {"match_timeline": mock_get_matchTimeline.return_value})
     
-    @patch("src.riot_api.riot_client.get_matchTimeline")
+    @patch("backend.python_legacy.async_riot_client.get_matchTimeline")
     def test_fetch_match_timeline_failure_404(self, mock_get_matchTimeline):
         mock_get_matchTimeline.side_effect = RiotAPIError("Match timeline fetch error - API failure")
 
@@ -148,7 +164,7 @@ class TestServerTimeline:
         assert response.json() == {"detail": "Match timeline fetch error - API failure"}
         mock_get_matchTimeline.assert_called_once_with("test-match-id")
 
-    @patch("src.riot_api.riot_client.get_matchTimeline")
+    @patch("backend.python_legacy.async_riot_client.get_matchTimeline")
     def test_fetch_match_timeline_failure_500(self, mock_get_matchTimeline):
         mock_get_matchTimeline.side_effect = Exception("Match timeline fetch error - unexpected")
 
@@ -164,7 +180,7 @@ class TestServerSummary:
     This includes tests for fetching player summary.
     """
 
-    @patch("src.analysis.player_summary.get_playerSummary")
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
     def test_fetch_player_summary_success(self, mock_get_playerSummary):
         mock_summary = {
             "player_stats": {"champion": "Ahri", "kills": 10, "deaths": 2, "assists": 5},
@@ -179,7 +195,7 @@ class TestServerSummary:
         assert response.json() == {"player_summary": mock_summary}
         mock_get_playerSummary.assert_called_once_with("test-puuid-123", "test-match-id")
 
-    @patch("src.analysis.player_summary.get_playerSummary")
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
     def test_fetch_player_summary_failure_500(self, mock_get_playerSummary):
         mock_get_playerSummary.side_effect = Exception("Player summary fetch error - unexpected")
 
@@ -188,4 +204,418 @@ class TestServerSummary:
         assert response.status_code == 500
         assert response.json() == {"detail": "Internal Server Error: Player summary fetch error - unexpected"}
         mock_get_playerSummary.assert_called_once_with("test-puuid-123", "test-match-id")
-    
\ No newline at end of file
+
+@pytest.mark.server_insights
+class TestServerInsights:
+    """
+    This includes tests for streaming the LLM coaching feedback of a player.
+    """
+
+    @patch("backend.python_legacy.llm_analysis.stream_insights_async")
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
+    def test_stream_player_insights(self, mock_get_playerSummary, mock_stream_insights):
+        mock_summary = {"player_stats": {"champion": "Ahri"}, "player_timeline": []}
+        mock_get_playerSummary.return_value = mock_summary
+
+        async def stream(summary):
+            for text in ("Ward ", "more\noften."):
+                yield text
+        mock_stream_insights.side_effect = stream
+
+        response = client.get("/player-insights/test-puuid-123/test-match-id")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [event for event in response.text.split("\n\n") if event]
+        assert events == [
+            'event: token\ndata: "Ward "',
+            'event: token\ndata: "more\\noften."',
+            "event: done\ndata: {}"
+        ]
+        mock_stream_insights.assert_called_once_with(mock_summary)
+
+    @patch("backend.python_legacy.llm_analysis.stream_insights_async")
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
+    def test_stream_player_insights_llm_error(self, mock_get_playerSummary, mock_stream_insights):
+        mock_get_playerSummary.return_value = {"player_stats": {"champion": "Ahri"}, "player_timeline": []}
+
+        async def stream(summary):
+            yield "Ward "
+            raise TimeoutError("LLM timed out")
+        mock_stream_insights.side_effect = stream
+
+        response = client.get("/player-insights/test-puuid-123/test-match-id")
+
+        events = [event for event in response.text.split("\n\n") if event]
+        assert events[-1].startswith("event: error\n")
+        assert json.loads(events[-1].split("data: ", 1)[1]) == {"status_code": 500, "detail": "Internal Server Error: LLM timed out"}
+
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
+    def test_stream_player_insights_unknown_player(self, mock_get_playerSummary):
+        mock_get_playerSummary.return_value = {"player_stats": {}, "player_timeline": []}
+
+        response = client.get("/player-insights/test-puuid-123/test-match-id")
+
+        assert response.status_code == 404
+
+    @patch("backend.python_legacy.player_summary.get_playerSummary_async")
+    def test_stream_player_insights_failure_404(self, mock_get_playerSummary):
+        mock_get_playerSummary.side_effect = RiotAPIError("Match not found", status_code=404)
+
+        response = client.get("/player-insights/test-puuid-123/test-match-id")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Match not found"}
+
+@pytest.mark.server_insights
+class TestServerMultiInsights:
+    """
+    This includes tests for the multi-match LLM review of a player.
+    """
+
+    @patch("backend.python_legacy.llm_analysis.generate_multiInsights_async")
+    @patch("backend.python_legacy.player_summary.get_playerSummaries_async")
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_fetch_player_insights(self, mock_get_recentMatches, mock_get_playerSummaries, mock_generate_multiInsights):
+        mock_get_recentMatches.return_value = ["matchId_1", "matchId_2"]
+        mock_get_playerSummaries.return_value = [
+            {"match_id": "matchId_1", "player_summary": {"player_stats": {"kills": 1}, "player_timeline": []}},
+            {"match_id": "matchId_2", "error": {"status_code": 404, "detail": "Data not found"}}
+        ]
+        mock_insights = {"matches": [{"match_id": "matchId_1", "feedback": "Ward more."}], "overall": "Good games."}
+        mock_generate_multiInsights.return_value = mock_insights
+
+        response = client.get("/player-insights/test-puuid-123?count=2")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "player_insights": mock_insights,
+            "failed_matches": [{"match_id": "matchId_2", "error": {"status_code": 404, "detail": "Data not found"}}]
+        }
+        mock_generate_multiInsights.assert_called_once_with({"matchId_1": {"player_stats": {"kills": 1}, "player_timeline": []}})
+
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_fetch_player_insights_failure_404(self, mock_get_recentMatches):
+        mock_get_recentMatches.side_effect = RiotAPIError("Player not found", status_code=404)
+
+        response = client.get("/player-insights/test-puuid-123")
+
+        assert response.status_code == 404
+
+@pytest.mark.server_frame_series
+class TestServerFrameSeries:
+    """
+    This includes tests for fetching the columnar frame stats of a player.
+    """
+
+    @patch("backend.python_legacy.async_riot_client.get_matchTimeline")
+    def test_fetch_player_frame_series_success(self, mock_get_matchTimeline):
+        mock_get_matchTimeline.return_value = {
+            "info": {
+                "frames": [
+                    {"timestamp": minute * 60000, "participantFrames": {"1": {"level": 1, "totalGold": 500 + 300 * minute, "minionsKilled": 8 * minute}}}
+                    for minute in range(3)
+                ],
+                "participants": [{"participantId": 1, "puuid": "test-puuid-123"}]
+            }
+        }
+
+        response = client.get("/player-frame-series/test-puuid-123/test-match-id")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["frame_series"]["minute"] == [0, 1, 2]
+        assert body["frame_series"]["totalGold"] == [500, 800, 1100]
+        assert body["gold_deltas"] == [0, 300, 300]
+        assert body["cs_per_minute"] == [0.0, 8.0, 8.0]
+        mock_get_matchTimeline.assert_called_once_with("test-match-id")
+
+    @patch("backend.python_legacy.async_riot_client.get_matchTimeline")
+    def test_fetch_player_frame_series_unknown_player(self, mock_get_matchTimeline):
+        mock_get_matchTimeline.return_value = {"info": {"frames": [], "participants": []}}
+
+        response = client.get("/player-frame-series/test-puuid-123/test-match-id")
+
+        assert response.status_code == 404
+
+@pytest.mark.server_match_summary
+class TestServerMatchSummary:
+    """
+    This includes tests for fetching the summary of every participant of a match.
+    """
+
+    @patch("backend.python_legacy.player_summary.get_matchSummary_async")
+    def test_fetch_match_summary_success(self, mock_get_matchSummary):
+        mock_summary = [
+            {"puuid": f"puuid-{index}", "participantId": index, "player_stats": {"kills": index}, "player_timeline": []}
+            for index in range(1, 11)
+        ]
+        mock_get_matchSummary.return_value = mock_summary
+
+        response = client.get("/match-summary/test-match-id")
+
+        assert response.status_code == 200
+        assert response.json() == {"match_summary": mock_summary}
+        mock_get_matchSummary.assert_called_once_with("test-match-id")
+
+    @patch("backend.python_legacy.player_summary.get_matchSummary_async")
+    def test_fetch_match_summary_failure_404(self, mock_get_matchSummary):
+        mock_get_matchSummary.side_effect = RiotAPIError("Match not found", status_code=404)
+
+        response = client.get("/match-summary/test-match-id")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Match not found"}
+
+@pytest.mark.server_aggregate
+class TestServerAggregate:
+    """
+    This includes tests for fetching the multi-match aggregates of a player.
+    """
+
+    @patch("backend.python_legacy.player_aggregate.get_playerAggregate_async")
+    def test_fetch_player_aggregate_success(self, mock_get_playerAggregate):
+        mock_aggregate = {"matches": 50, "wins": 27, "win_rate": 0.54, "by_champion": {}, "by_role": {}, "failed_matches": []}
+        mock_get_playerAggregate.return_value = mock_aggregate
+
+        response = client.get("/player-aggregate/test-puuid-123?count=50")
+
+        assert response.status_code == 200
+        assert response.json() == {"player_aggregate": mock_aggregate}
+        mock_get_playerAggregate.assert_called_once_with("test-puuid-123", 50)
+
+    @patch("backend.python_legacy.player_aggregate.get_playerAggregate_incremental_async")
+    def test_fetch_player_aggregate_incremental(self, mock_get_playerAggregate):
+        mock_get_playerAggregate.return_value = {"matches": 120, "new_matches": 1, "failed_matches": []}
+
+        response = client.get("/player-aggregate/test-puuid-123?count=20&incremental=true")
+
+        assert response.status_code == 200
+        assert response.json()["player_aggregate"]["new_matches"] == 1
+        mock_get_playerAggregate.assert_called_once_with("test-puuid-123", 20)
+
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_fetch_player_aggregate_failure_404(self, mock_get_recentMatches):
+        mock_get_recentMatches.side_effect = RiotAPIError("Player not found", status_code=404)
+
+        response = client.get("/player-aggregate/test-puuid-123")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Player not found"}
+
+@pytest.mark.server_match_history
+class TestServerMatchHistory:
+    """
+    This includes tests for crawling the match history of a player.
+    """
+
+    @patch("backend.python_legacy.match_history.crawl_matchHistory_async")
+    def test_crawl_match_history_success(self, mock_crawl):
+        mock_history = {"match_ids": ["NA1_2", "NA1_1"], "fetched": 1, "skipped": 1, "failed_matches": []}
+        mock_crawl.return_value = mock_history
+
+        response = client.get("/match-history/test-puuid-123?queue=420&startTime=1700000000&limit=2")
+
+        assert response.status_code == 200
+        assert response.json() == {"match_history": mock_history}
+        mock_crawl.assert_called_once_with("test-puuid-123", 0, 420, 1700000000, None, 2)
+
+    @patch("backend.python_legacy.match_history.crawl_matchHistory_async")
+    def test_crawl_match_history_limit_bounded(self, mock_crawl):
+        assert client.get("/match-history/test-puuid-123?limit=1000000").status_code == 422
+        assert client.get("/match-history/test-puuid-123?limit=0").status_code == 422
+        mock_crawl.assert_not_called()
+
+    @patch("backend.python_legacy.async_riot_client.get_matchIds")
+    def test_crawl_match_history_failure_404(self, mock_get_matchIds):
+        mock_get_matchIds.side_effect = RiotAPIError("Player not found", status_code=404)
+
+        response = client.get("/match-history/test-puuid-123")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Player not found"}
+
+@pytest.mark.server_player_matches
+class TestServerPlayerMatches:
+    """
+    This includes tests for querying the matches of a player in the local warehouse.
+    """
+
+    def test_fetch_player_matches_success(self):
+        mock_warehouse = Mock()
+        mock_warehouse.query_playerMatches.return_value = [{"match_id": "NA1_2", "champion": "Jinx", "patch": "14.20"}]
+
+        with patch("backend.python_legacy.match_warehouse.warehouse", mock_warehouse):
+            response = client.get("/player-matches/test-puuid-123?champion=Jinx&patch=latest")
+
+        assert response.status_code == 200
+        assert response.json() == {"player_matches": [{"match_id": "NA1_2", "champion": "Jinx", "patch": "14.20"}]}
+        mock_warehouse.query_playerMatches.assert_called_once_with("test-puuid-123", "Jinx", None, "latest", None, 100)
+
+    def test_fetch_player_matches_disabled(self):
+        with patch("backend.python_legacy.match_warehouse.warehouse", None):
+            response = client.get("/player-matches/test-puuid-123")
+
+        assert response.status_code == 503
+        assert response.json() == {"detail": "Match warehouse is disabled"}
+
+@pytest.mark.server_summaries
+class TestServerSummaries:
+    """
+    This includes tests for fetching the player summaries of recent matches.
+    """
+
+    @patch("backend.python_legacy.player_summary.get_playerSummaries_async")
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_fetch_player_summaries_success(self, mock_get_recentMatches, mock_get_playerSummaries):
+        mock_summaries = [
+            {"match_id": "match1", "player_summary": {"player_stats": {"champion": "Ahri"}, "player_timeline": []}},
+            {"match_id": "match2", "error": {"status_code": 404, "detail": "Data not found"}}
+        ]
+        mock_get_recentMatches.return_value = ["match1", "match2"]
+        mock_get_playerSummaries.return_value = mock_summaries
+
+        response = client.get("/player-summaries/test-puuid-123?count=2")
+
+        assert response.status_code == 200
+        assert response.json() == {"player_summaries": mock_summaries}
+        mock_get_recentMatches.assert_called_once_with("test-puuid-123", 2)
+        mock_get_playerSummaries.assert_called_once_with("test-puuid-123", ["match1", "match2"])
+
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_fetch_player_summaries_failure_404(self, mock_get_recentMatches):
+        mock_get_recentMatches.side_effect = RiotAPIError("Recent matches fetch error - API failure")
+
+        response = client.get("/player-summaries/test-puuid-123?count=2")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Recent matches fetch error - API failure"}
+
+@pytest.mark.server_summaries_stream
+class TestServerSummariesStream:
+    """
+    This includes tests for streaming the player summaries of recent matches.
+    """
+
+    def setup_method(self):
+        self.entries = [
+            {"match_id": "match2", "player_summary": {"player_stats": {"champion": "Ahri"}, "player_timeline": []}},
+            {"match_id": "match1", "error": {"status_code": 404, "detail": "Data not found"}}
+        ]
+
+    def mock_iter(self, entries):
+        async def iter_summaries(puuid, match_ids):
+            for entry in entries:
+                yield entry
+        return iter_summaries
+
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_stream_player_summaries_ndjson(self, mock_get_recentMatches):
+        mock_get_recentMatches.return_value = ["match1", "match2"]
+
+        with patch("backend.python_legacy.player_summary.iter_playerSummaries_async", self.mock_iter(self.entries)):
+            response = client.get("/player-summaries/test-puuid-123/stream?count=2")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in response.text.splitlines()] == self.entries
+
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_stream_player_summaries_sse(self, mock_get_recentMatches):
+        mock_get_recentMatches.return_value = ["match1", "match2"]
+
+        with patch("backend.python_legacy.player_summary.iter_playerSummaries_async", self.mock_iter(self.entries)):
+            response = client.get("/player-summaries/test-puuid-123/stream?count=2&format=sse")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = response.text.strip().split("\n\n")
+        assert events[0] == f"event: player_summary\ndata: {json.dumps(self.entries[0])}"
+        assert events[1] == f"event: player_summary\ndata: {json.dumps(self.entries[1])}"
+        assert events[2] == "event: done\ndata: {}"
+
+    @patch("backend.python_legacy.async_riot_client.get_recentMatches")
+    def test_stream_player_summaries_failure_404(self, mock_get_recentMatches):
+        mock_get_recentMatches.side_effect = RiotAPIError("Recent matches fetch error - API failure")
+
+        response = client.get("/player-summaries/test-puuid-123/stream")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Recent matches fetch error - API failure"}
+
+@pytest.mark.server_transport
+class TestServerMockedTransport:
+    """
+    This includes tests that run the async endpoints end to end against a mocked Riot transport.
+    """
+
+    def setup_method(self):
+        self.create_client = async_riot_client.create_client
+
+    def mock_transport(self, handler):
+        return patch(
+            "backend.python_legacy.async_riot_client.create_client",
+            lambda: self.create_client(transport=httpx.MockTransport(handler))
+        )
+
+    def test_fetch_player_summary(self):
+        match_details = {"info": {"participants": [{
+            "puuid": "test-puuid-123", "championName": "Ahri", "teamPosition": "MIDDLE",
+            "totalMinionsKilled": 200, "neutralMinionsKilled": 30, "challenges": {"kda": 7.5}, "win": True
+        }]}}
+        match_timeline = {"info": {
+            "participants": [{"participantId": 1, "puuid": "test-puuid-123"}],
+            "frames": [{"timestamp": 60000, "events": [{"type": "FEAT_UPDATE", "teamId": 100}], "participantFrames": {"1": {"level": 2}}}]
+        }}
+        paths = []
+
+        def handler(request):
+            paths.append(request.url.path)
+            if request.url.path.endswith("/timeline"):
+                return httpx.Response(200, json=match_timeline)
+            return httpx.Response(200, json=match_details)
+
+        with self.mock_transport(handler):
+            response = client.get("/player-summary/test-puuid-123/test-match-id")
+
+        assert response.status_code == 200
+        summary = response.json()["player_summary"]
+        assert summary["player_stats"]["champion"] == "Ahri"
+        assert summary["player_stats"]["cs"] == 230
+        assert summary["player_timeline"] == [{"timestamp": 1, "events": [{"type": "FEAT_UPDATE", "teamId": 100}], "participantFrames": {"level": 2}}]
+        assert sorted(paths) == ["/lol/match/v5/matches/test-match-id", "/lol/match/v5/matches/test-match-id/timeline"]
+
+    def test_fetch_match_details_upstream_error(self):
+        with self.mock_transport(lambda request: httpx.Response(404, text="Data not found")):
+            response = client.get("/match-details/test-match-id")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "API request failed: 404 - Data not found"}
+
+@pytest.mark.server_cache
+class TestServerCacheMetrics:
+    """
+    This includes tests for fetching cache metrics.
+    """
+
+    @patch("backend.python_legacy.riot_client.memo_cache", None)
+    @patch("backend.python_legacy.riot_client.match_cache", None)
+    def test_fetch_cache_metrics_disabled(self):
+        response = client.get("/cache-metrics")
+
+        assert response.status_code == 200
+        assert response.json() == {"cache_metrics": {"enabled": False}, "memo_metrics": {"enabled": False}}
+
+    @patch("backend.python_legacy.riot_client.memo_cache")
+    @patch("backend.python_legacy.riot_client.match_cache")
+    def test_fetch_cache_metrics_success(self, mock_cache, mock_memo):
+        mock_cache.metrics.return_value = {"hits": 3, "misses": 1, "hit_rate": 0.75, "bytes_used": 2048}
+        mock_memo.metrics.return_value = {"hits": 5, "misses": 2, "coalesced": 3}
+
+        response = client.get("/cache-metrics")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "cache_metrics": {"enabled": True, "hits": 3, "misses": 1, "hit_rate": 0.75, "bytes_used": 2048},
+            "memo_metrics": {"enabled": True, "hits": 5, "misses": 2, "coalesced": 3}
+        }